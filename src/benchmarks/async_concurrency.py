@@ -0,0 +1,74 @@
+import asyncio
+import concurrent.futures
+import os
+import sys
+import time
+
+os.environ.setdefault("SQLALCHEMY_SILENCE_UBER_WARNING", "1")
+
+import questdb_connect as qdbc
+import sqlalchemy as sqla
+
+# Needs a running QuestDB (pg wire 8812), or a local stand-in, and asyncpg:
+#   python3 -m benchmarks.async_concurrency [queries] [concurrency] [host] [port]
+# Runs the same queries with the sync engine pushed to a thread pool sized
+# like asyncio.to_thread's default executor, as asyncio services do today, and
+# with the questdb+asyncpg engine, all of them concurrent on one event loop.
+
+QUERY = "SELECT count() FROM long_sequence(100000)"
+
+
+def run_threads(host, port, queries, concurrency):
+    workers = min(concurrency, 32, (os.cpu_count() or 1) + 4)
+    engine = qdbc.create_engine(
+        host, port, "admin", "quest", pool_size=workers, max_overflow=0
+    )
+
+    def query(_):
+        with engine.connect() as conn:
+            return conn.execute(sqla.text(QUERY)).scalar()
+
+    try:
+        with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+            list(executor.map(query, range(workers)))  # warm up
+            start = time.perf_counter()
+            list(executor.map(query, range(queries)))
+            return time.perf_counter() - start
+    finally:
+        engine.dispose()
+
+
+async def run_async(host, port, queries, concurrency):
+    engine = qdbc.create_async_engine(
+        host, port, "admin", "quest", pool_size=concurrency, max_overflow=0
+    )
+
+    async def query(_):
+        async with engine.connect() as conn:
+            return (await conn.execute(sqla.text(QUERY))).scalar()
+
+    try:
+        await asyncio.gather(*(query(idx) for idx in range(concurrency)))  # warm up
+        start = time.perf_counter()
+        await asyncio.gather(*(query(idx) for idx in range(queries)))
+        return time.perf_counter() - start
+    finally:
+        await engine.dispose()
+
+
+def main(
+    queries: int = 2000, concurrency: int = 200, host: str = "localhost", port=8812
+):
+    print(f"{queries} queries, {concurrency} concurrent: {QUERY}")
+    timings = {
+        "threads": run_threads(host, port, queries, concurrency),
+        "asyncio": asyncio.run(run_async(host, port, queries, concurrency)),
+    }
+    for name, elapsed in timings.items():
+        print(f"{name:>8}: {elapsed:8.2f} s, {queries / elapsed:10,.0f} queries/s")
+    print(f"speedup x{timings['threads'] / timings['asyncio']:.1f}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(*(int(arg) for arg in args[:2]), *args[2:3], *(int(arg) for arg in args[3:4]))
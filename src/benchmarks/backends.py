@@ -0,0 +1,81 @@
+import datetime
+import sys
+import time
+
+import questdb_connect as qdbc
+
+# Needs a running QuestDB (pg wire 8812), or a local stand-in, and psycopg 3:
+#   python3 -m benchmarks.backends [rows] [host] [port]
+# Fetch and insert throughput of the psycopg2 backend (text results, one
+# round trip per INSERT) and of the psycopg 3 backend (text and binary results,
+# pipelined INSERTs).
+
+TABLE_NAME = "bench_backends"
+INSERT_ROWS = 10_000
+
+
+def fetch_query(rows):
+    return (
+        "SELECT x, rnd_double() value, timestamp_sequence(0, 1000000) ts "
+        f"FROM long_sequence({rows})"
+    )
+
+
+def time_fetch(conn, rows):
+    with conn.cursor() as cursor:
+        start = time.perf_counter()
+        cursor.execute(fetch_query(rows))
+        cursor.fetchall()
+        return time.perf_counter() - start
+
+
+def time_insert(conn, rows):
+    now = datetime.datetime(2023, 4, 12)
+    with conn.cursor() as cursor:
+        cursor.execute(f"TRUNCATE TABLE {TABLE_NAME}")
+        conn.commit()
+        start = time.perf_counter()
+        cursor.executemany(
+            f"INSERT INTO {TABLE_NAME} (x, value, ts) VALUES (%s, %s, %s)",
+            [
+                (idx, idx * 0.5, now + datetime.timedelta(seconds=idx))
+                for idx in range(rows)
+            ],
+        )
+        conn.commit()
+        return time.perf_counter() - start
+
+
+def main(rows: int = 1_000_000, host: str = "localhost", port: int = 8812):
+    from questdb_connect import psycopg3
+
+    connections = {
+        "psycopg2": qdbc.connect(host=host, port=port),
+        "psycopg3 text": psycopg3.connect(binary=False, host=host, port=port),
+        "psycopg3 binary": psycopg3.connect(host=host, port=port),
+    }
+    try:
+        with connections["psycopg2"].cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {TABLE_NAME} "
+                "(x LONG, value DOUBLE, ts TIMESTAMP) TIMESTAMP(ts) PARTITION BY DAY"
+            )
+        connections["psycopg2"].commit()
+        print(f"fetch {rows:,} rows (LONG, DOUBLE, TIMESTAMP):")
+        for name, conn in connections.items():
+            elapsed = time_fetch(conn, rows)
+            print(f"{name:>16}: {elapsed:8.2f} s, {rows / elapsed:12,.0f} rows/s")
+        print(f"executemany INSERT, {INSERT_ROWS:,} rows:")
+        for name in ("psycopg2", "psycopg3 binary"):
+            elapsed = time_insert(connections[name], INSERT_ROWS)
+            print(
+                f"{name:>16}: {elapsed:8.2f} s, {INSERT_ROWS / elapsed:12,.0f} rows/s"
+            )
+    finally:
+        for conn in connections.values():
+            conn.close()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(*(int(arg) for arg in args[:1]), *args[1:2], *(int(arg) for arg in args[2:3]))
@@ -0,0 +1,61 @@
+import os
+import sys
+import time
+
+os.environ.setdefault("SQLALCHEMY_SILENCE_UBER_WARNING", "1")
+
+import numpy as np
+import pandas as pd
+import questdb_connect as qdbc
+
+# Needs a running QuestDB, pg wire (8812) and ILP (9009) ports:
+#   python3 -m benchmarks.dataframe_writer [rows] [host]
+
+
+def build_frame(rows):
+    rng = np.random.default_rng(42)
+    return pd.DataFrame(
+        {
+            "source": pd.Categorical.from_codes(
+                rng.integers(0, 16, rows), [f"NODE{idx}" for idx in range(16)]
+            ),
+            "attr_value": rng.random(rows),
+            "attr_count": rng.integers(0, 1000, rows),
+            "ts": pd.date_range("2023-04-12", periods=rows, freq="ms"),
+        }
+    )
+
+
+def main(rows: int = 1_000_000, host: str = "localhost"):
+    engine = qdbc.create_engine(host, 8812, "admin", "quest")
+    frame = build_frame(rows)
+    try:
+        timings = {}
+        for name in ("to_sql", "write_dataframe"):
+            table_name = f"bench_{name}"
+            with engine.begin() as conn:
+                if engine.dialect.has_table(conn, table_name):
+                    conn.exec_driver_sql(f"DROP TABLE {table_name}")
+            # same table for both: empty frame creates it, HOUR partitions
+            qdbc.write_dataframe(
+                frame.iloc[:0], table_name, engine, "ts", qdbc.PartitionBy.HOUR
+            )
+            start = time.perf_counter()
+            if name == "to_sql":
+                frame.to_sql(
+                    table_name, engine, if_exists="append", index=False, chunksize=10000
+                )
+            else:
+                qdbc.write_dataframe(frame, table_name, engine)
+            timings[name] = time.perf_counter() - start
+            print(
+                f"{name:>15}: {timings[name]:8.2f} s, "
+                f"{rows / timings[name]:12,.0f} rows/s"
+            )
+        print(f"speedup x{timings['to_sql'] / timings['write_dataframe']:.1f}")
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) if idx == 0 else arg for idx, arg in enumerate(sys.argv[1:])))
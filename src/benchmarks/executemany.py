@@ -0,0 +1,68 @@
+import datetime
+import os
+import sys
+import time
+
+os.environ.setdefault("SQLALCHEMY_SILENCE_UBER_WARNING", "1")
+
+import questdb_connect as qdbc
+import sqlalchemy as sqla
+
+# Needs a running QuestDB (pg wire 8812), or a local stand-in:
+#   python3 -m benchmarks.executemany [rows] [host] [port]
+# Rows/s of conn.execute(insert(table), rows) with one INSERT per row, with
+# psycopg2's execute_values pages of 1000 rows, and with the dialect's
+# default pages, bounded by row count and size.
+
+TABLE_NAME = "bench_executemany"
+SETTINGS = {
+    "one per row": {"executemany_mode": None},
+    "1,000 rows/page": {
+        "executemany_values_page_size": 1000,
+        "executemany_values_page_bytes": qdbc.MAX_QUERY_BYTES,
+    },
+    "default pages": {},
+}
+
+
+def make_table(metadata):
+    return sqla.Table(
+        TABLE_NAME,
+        metadata,
+        sqla.Column("source", qdbc.Symbol),
+        sqla.Column("value", qdbc.Double),
+        sqla.Column("ts", qdbc.Timestamp),
+        qdbc.QDBTableEngine(TABLE_NAME, "ts", qdbc.PartitionBy.DAY, is_wal=True),
+    )
+
+
+def main(rows: int = 100_000, host: str = "localhost", port: int = 8812):
+    start_ts = datetime.datetime(2023, 4, 12)
+    params = [
+        {
+            "source": f"NODE{idx % 10}",
+            "value": idx * 0.5,
+            "ts": start_ts + datetime.timedelta(microseconds=idx),
+        }
+        for idx in range(rows)
+    ]
+    table = make_table(sqla.MetaData())
+    print(f"INSERT {rows:,} rows:")
+    for name, settings in SETTINGS.items():
+        engine = qdbc.create_engine(host, port, "admin", "quest", **settings)
+        try:
+            with engine.begin() as conn:
+                table.drop(conn, checkfirst=True)
+                table.create(conn)
+            start = time.perf_counter()
+            with engine.begin() as conn:
+                conn.execute(sqla.insert(table), params)
+            elapsed = time.perf_counter() - start
+        finally:
+            engine.dispose()
+        print(f"{name:>16}: {elapsed:8.2f} s, {rows / elapsed:12,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(*(int(arg) for arg in args[:1]), *args[1:2], *(int(arg) for arg in args[2:3]))
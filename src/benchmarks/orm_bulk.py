@@ -0,0 +1,63 @@
+import datetime
+import os
+import sys
+import time
+
+os.environ.setdefault("SQLALCHEMY_SILENCE_UBER_WARNING", "1")
+
+import questdb_connect as qdbc
+import sqlalchemy as sqla
+from sqlalchemy.orm import Session, declarative_base
+
+# Needs a running QuestDB (pg wire 8812), or a local stand-in:
+#   python3 -m benchmarks.orm_bulk [rows] [host] [port]
+# Rows/s of session.add() of mapped objects, then commit(), with a Session and
+# with a BulkSession.
+
+Base = declarative_base()
+
+
+class Sample(Base):
+    __tablename__ = "bench_orm_bulk"
+    __table_args__ = (
+        qdbc.QDBTableEngine("bench_orm_bulk", "ts", qdbc.PartitionBy.HOUR),
+    )
+    source = sqla.Column(qdbc.Symbol)
+    value = sqla.Column(qdbc.Double)
+    ts = sqla.Column(qdbc.Timestamp, primary_key=True)
+
+
+def run(engine, session_cls, rows):
+    start_ts = datetime.datetime(2023, 4, 12)
+    start = time.perf_counter()
+    with session_cls(engine) as session:
+        for idx in range(rows):
+            session.add(
+                Sample(
+                    source=f"NODE{idx % 10}",
+                    value=idx * 0.5,
+                    ts=start_ts + datetime.timedelta(microseconds=idx),
+                )
+            )
+        session.commit()
+    return time.perf_counter() - start
+
+
+def main(rows: int = 100_000, host: str = "localhost", port: int = 8812):
+    engine = qdbc.create_engine(host, port, "admin", "quest")
+    try:
+        print(f"session.add() {rows:,} objects, then commit():")
+        for session_cls in (Session, qdbc.BulkSession):
+            Base.metadata.drop_all(engine)
+            Base.metadata.create_all(engine)
+            elapsed = run(engine, session_cls, rows)
+            print(
+                f"{session_cls.__name__:>12}: {elapsed:8.2f} s, {rows / elapsed:10,.0f} rows/s"
+            )
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(*(int(arg) for arg in args[:1]), *args[1:2], *(int(arg) for arg in args[2:3]))
@@ -0,0 +1,69 @@
+import re
+import time
+
+from questdb_connect import common
+
+# remove_public_schema as it was before literals were skipped and results cached
+_OLD_PUBLIC_SCHEMA_FILTER = re.compile(
+    r"(')?(public(?(1)\1|)\.)", re.IGNORECASE | re.MULTILINE
+)
+
+
+def old_remove_public_schema(query):
+    if isinstance(query, str) and query and "public" in query:
+        return re.sub(_OLD_PUBLIC_SCHEMA_FILTER, "", query)
+    return query
+
+
+def uncached_remove_public_schema(query):
+    if isinstance(query, str) and query and "public" in query:
+        return common._remove_public_schema.__wrapped__(query)
+    return query
+
+
+def build_corpus(num_queries=20, num_columns=150):
+    # large generated queries, like those of Superset's charts and dashboards
+    corpus = []
+    for query_idx in range(num_queries):
+        columns = ",\n  ".join(
+            f"CASE WHEN public.metrics_{query_idx}.attr_{col} IN ('a', 'b', 'public.c') "
+            f'THEN avg(attr_{col}) ELSE NULL END AS "attr_{col} avg"'
+            for col in range(num_columns)
+        )
+        filters = " OR ".join(
+            f"source = 'NODE{idx}' /* node {idx} */" for idx in range(num_columns)
+        )
+        corpus.append(
+            f"SELECT\n  {columns}\nFROM public.metrics_{query_idx}\n"
+            f"JOIN public.nodes ON public.nodes.id = public.metrics_{query_idx}.node\n"
+            f"WHERE ts IN '2023-04-12' AND ({filters})\n"
+            "SAMPLE BY 1h ALIGN TO CALENDAR\n"
+            "LIMIT 10000 -- public.limit"
+        )
+    return corpus
+
+
+def time_ms(function, corpus, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in corpus:
+            function(query)
+    return (time.perf_counter() - start) * 1e3 / (repeat * len(corpus))
+
+
+def main(repeat: int = 50):
+    corpus = build_corpus()
+    size = sum(len(query) for query in corpus) // len(corpus)
+    print(f"{len(corpus)} queries, {size:,} chars on average, {repeat} repeats")
+    before = time_ms(old_remove_public_schema, corpus, repeat)
+    tokenizer = time_ms(uncached_remove_public_schema, corpus, repeat)
+    cached = time_ms(common.remove_public_schema, corpus, repeat)
+    print(f"      regex (before): {before:8.4f} ms/query")
+    print(f"  tokenizer, no cache: {tokenizer:8.4f} ms/query")
+    print(
+        f"   tokenizer, cached: {cached:8.4f} ms/query, speedup x{before / cached:.0f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import os
+import time
+
+os.environ.setdefault("SQLALCHEMY_SILENCE_UBER_WARNING", "1")
+
+import questdb_connect as qdbc
+import sqlalchemy as sqla
+from sqlalchemy.util import LRUCache
+
+
+class NoCacheQuestDBDialect(qdbc.QuestDBDialect):
+    # the dialect as it was before the statement cache was enabled
+    supports_statement_cache = False
+
+
+def build_statements():
+    metadata = sqla.MetaData()
+    table = sqla.Table(
+        "node_metrics",
+        metadata,
+        sqla.Column("source", qdbc.Symbol(capacity=128, cache=True)),
+        sqla.Column("attr_name", qdbc.Symbol),
+        sqla.Column("attr_value", qdbc.Double),
+        sqla.Column("ts", qdbc.Timestamp),
+        qdbc.QDBTableEngine("node_metrics", "ts", qdbc.PartitionBy.HOUR),
+    )
+    return {
+        "select": lambda: sqla.select(table)
+        .where(table.c.source == "NODE0")
+        .where(table.c.attr_value.between(0.1, 0.9))
+        .order_by(table.c.ts)
+        .limit(100)
+        .offset(10),
+        "insert": lambda: sqla.insert(table).values(
+            source="NODE0", attr_name="CPU", attr_value=0.5, ts=None
+        ),
+        "text": lambda: sqla.text(
+            "SELECT * FROM public.node_metrics WHERE source = :source LIMIT 10"
+        ),
+    }
+
+
+def compile_time_us(dialect, statement_factory, iterations, repeat=5):
+    compiled_cache = LRUCache(500)
+    best = None
+    for _ in range(repeat):
+        # a new statement object each time, as an application would build it
+        statements = [statement_factory() for _ in range(iterations)]
+        start = time.perf_counter()
+        for statement in statements:
+            statement._compile_w_cache(
+                dialect, compiled_cache=compiled_cache, column_keys=[]
+            )
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1e6 / iterations
+
+
+def main(iterations: int = 2000):
+    print(f"SqlAlchemy {sqla.__version__}, {iterations} iterations")
+    before = NoCacheQuestDBDialect()
+    after = qdbc.QuestDBDialect()
+    for name, statement_factory in build_statements().items():
+        no_cache = compile_time_us(before, statement_factory, iterations)
+        cached = compile_time_us(after, statement_factory, iterations)
+        print(
+            f"{name:>8}: no cache {no_cache:8.2f} us/stmt, "
+            f"cached {cached:8.2f} us/stmt, speedup x{no_cache / cached:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
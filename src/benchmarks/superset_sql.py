@@ -0,0 +1,60 @@
+import sys
+
+from questdb_connect import common
+
+from benchmarks.public_schema import build_corpus, time_ms
+
+try:
+    from superset import sql_parse as _sql_parse
+except ImportError:  # pragma: no cover
+    _sql_parse = None
+
+# QuestDbEngineSpec.execute's preprocessing of the queries of Superset's charts:
+# before, superset.sql_parse.strip_comments_from_sql, a sqlparse token tree,
+# then remove_public_schema in the cursor, now common.strip_comments, one pass.
+#   python3 -m benchmarks.superset_sql [repeat]
+
+
+def build_chart_corpus(num_queries=20, num_columns=150):
+    # chart queries of a virtual dataset, with its comments, and with the
+    # comment SQL_QUERY_MUTATOR adds to every query in many deployments
+    return [
+        f"-- user: admin, dashboard: 12, chart: {idx}\n"
+        "SELECT * FROM (\n"
+        "  -- virtual dataset: metrics of the last day\n"
+        f"  {query}\n"
+        ") AS virtual_table\n"
+        "/* Superset row limit */ LIMIT 10000"
+        for idx, query in enumerate(build_corpus(num_queries, num_columns))
+    ]
+
+
+def superset_strip_comments(query):
+    return common.remove_public_schema(_sql_parse.strip_comments_from_sql(query))
+
+
+def uncached_strip_comments(query):
+    return common._strip_comments.__wrapped__(query)
+
+
+def main(repeat: int = 50):
+    corpus = build_chart_corpus()
+    size = sum(len(query) for query in corpus) // len(corpus)
+    print(f"{len(corpus)} queries, {size:,} chars on average, {repeat} repeats")
+    one_pass = time_ms(uncached_strip_comments, corpus, repeat)
+    cached = time_ms(common.strip_comments, corpus, repeat)
+    if _sql_parse is not None:
+        # about a second per query, once is enough
+        common._remove_public_schema.cache_clear()
+        before = time_ms(superset_strip_comments, corpus, 1)
+        print(f"   sqlparse (before): {before:10.4f} ms/query")
+    else:
+        print("apache-superset is not installed, sqlparse is not measured")
+    print(f"  one pass, no cache: {one_pass:10.4f} ms/query")
+    print(f"    one pass, cached: {cached:10.4f} ms/query")
+    if _sql_parse is not None:
+        print(f"  speedup x{before / one_pass:.0f}, cached x{before / cached:.0f}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
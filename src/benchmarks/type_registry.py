@@ -0,0 +1,80 @@
+import random
+import time
+
+from questdb_connect import types
+
+# resolve_type_from_name as it was before the registry: a linear scan over
+# QUESTDB_TYPES on a miss, geohash names were parsed again on every call
+_OLD_TYPE_CACHE = {}
+
+
+def old_resolve_type_from_name(type_name):
+    if not type_name:
+        return None
+    type_class = _OLD_TYPE_CACHE.get(type_name)
+    if not type_class:
+        for candidate_class in types.QUESTDB_TYPES:
+            type_class = candidate_class.matches_type_name(type_name)
+            if type_class:
+                _OLD_TYPE_CACHE[type_name] = type_class
+                break
+            elif (
+                "GEOHASH" in type_name.upper() and "(" in type_name and ")" in type_name
+            ):
+                open_p = type_name.index("(")
+                close_p = type_name.index(")")
+                description = type_name[open_p + 1 : close_p]
+                g_size = int(description[:-1])
+                if description[-1] in ("C", "c"):
+                    g_size *= 5
+                type_class = types.geohash_class(g_size)
+                break
+    return type_class
+
+
+# type names as in table_columns(), weighted like a fleet of metrics tables
+CATALOG_TYPES = (
+    ("TIMESTAMP", 10),
+    ("SYMBOL", 20),
+    ("DOUBLE", 25),
+    ("LONG", 10),
+    ("INT", 5),
+    ("VARCHAR", 8),
+    ("BOOLEAN", 3),
+    ("IPV4", 3),
+    ("UUID", 3),
+    ("LONG256", 1),
+    ("GEOHASH(8c)", 4),
+    ("GEOHASH(5c)", 2),
+    ("GEOHASH(12c)", 2),
+    ("GEOHASH(16b)", 2),
+    ("DOUBLE[]", 2),
+)
+
+
+def build_catalog(num_columns=10_000, seed=42):
+    names, weights = zip(*CATALOG_TYPES)
+    return random.Random(seed).choices(names, weights, k=num_columns)
+
+
+def time_ns(function, catalog, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for type_name in catalog:
+            function(type_name)
+    return (time.perf_counter() - start) * 1e9 / (repeat * len(catalog))
+
+
+def main(repeat: int = 20):
+    catalog = build_catalog()
+    print(f"{len(catalog):,} columns, {repeat} reflections")
+    before = time_ns(old_resolve_type_from_name, catalog, repeat)
+    registry = time_ns(types.resolve_type_from_name, catalog, repeat)
+    print(f"     scan (before): {before:8.1f} ns/column")
+    print(
+        f"          registry: {registry:8.1f} ns/column, speedup x{before / registry:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
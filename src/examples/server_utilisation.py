@@ -8,7 +8,7 @@ os.environ.setdefault("SQLALCHEMY_SILENCE_UBER_WARNING", "1")
 
 import questdb_connect as qdbc
 from sqlalchemy import Column, MetaData, create_engine
-from sqlalchemy.orm import Session, declarative_base
+from sqlalchemy.orm import declarative_base
 
 
 class BaseEnum(enum.Enum):
@@ -47,7 +47,8 @@ class NodeMetrics(Base):
 def main(duration_sec: float = 10.0):
     end_time = time.time() + max(duration_sec - 0.5, 2.0)
     engine = create_engine("questdb://localhost:8812/main")
-    session = Session(engine)
+    # metric samples are append only, they are not tracked by the session
+    session = qdbc.BulkSession(engine)
     max_batch_size = 3000
     try:
         Base.metadata.drop_all(engine)
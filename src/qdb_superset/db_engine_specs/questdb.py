@@ -1,16 +1,29 @@
 from __future__ import annotations
 
 import re
+import threading
+import time
 from datetime import datetime
-from typing import Any
+from typing import Any, ClassVar
 
 import questdb_connect.types as qdbc_types
 from flask_babel import gettext as __
 from marshmallow import fields, Schema
-from questdb_connect.common import remove_public_schema
+from questdb_connect.common import remove_public_schema, strip_comments
+from questdb_connect.compilers import QDBSQLCompiler
+from questdb_connect.explain import explain
+from questdb_connect.sample_by import SampleBy, SampleByBucket
 from sqlalchemy.engine.base import Engine
 from sqlalchemy.engine.reflection import Inspector
-from sqlalchemy.sql.expression import text, TextClause
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import (
+    column,
+    ColumnClause,
+    literal_column,
+    Select,
+    text,
+    TextClause,
+)
 from sqlalchemy.types import TypeEngine
 import logging
 
@@ -22,8 +35,9 @@ from superset.db_engine_specs.base import (
     BaseEngineSpec,
     BasicParametersMixin,
     BasicParametersType,
+    TimestampExpression,
+    compile_timegrain_expression,
 )
-from superset import sql_parse
 from superset.utils import core as utils
 from superset.utils.core import GenericDataType
 
@@ -56,6 +70,26 @@ class QuestDbParametersSchema(Schema):
     )
 
 
+class SampleByTimestampExpression(TimestampExpression, SampleByBucket):
+    """Time grain of a column, rendered as SAMPLE BY when the column is the
+    designated timestamp of the queried table, as DATE_TRUNC otherwise."""
+
+    def __init__(
+        self, expr: str, col: ColumnClause, sample_by: SampleBy, **kwargs: Any
+    ) -> None:
+        super().__init__(expr, col, **kwargs)
+        self.sample_by = sample_by
+
+
+@compiles(SampleByTimestampExpression)
+def compile_sample_by_timestamp(
+    element: SampleByTimestampExpression, compiler: Any, **kwargs: Any
+) -> str:
+    if isinstance(compiler, QDBSQLCompiler) and compiler.is_sample_by_bucket(element):
+        return compiler.process(element.col, **kwargs)
+    return compile_timegrain_expression(element, compiler, **kwargs)
+
+
 class QuestDbEngineSpec(BaseEngineSpec, BasicParametersMixin):
     engine = "questdb"
     engine_name = "QuestDB"
@@ -83,6 +117,16 @@ class QuestDbEngineSpec(BaseEngineSpec, BasicParametersMixin):
         "P1Y": "DATE_TRUNC('year', {col})",
         "P3M": "DATE_TRUNC('quarter', {col})",
     }
+    # time grains whose SAMPLE BY ... ALIGN TO CALENDAR buckets are those of
+    # DATE_TRUNC, SAMPLE BY does not align weeks to Mondays nor 3M to quarters
+    _sample_by_time_grains: ClassVar[dict[str | None, SampleBy]] = {
+        "PT1S": SampleBy("1s"),
+        "PT1M": SampleBy("1m"),
+        "PT1H": SampleBy("1h"),
+        "P1D": SampleBy("1d"),
+        "P1M": SampleBy("1M"),
+        "P1Y": SampleBy("1y"),
+    }
     column_type_mappings = (
         (
             re.compile("^BOOLEAN$", re.IGNORECASE),
@@ -179,6 +223,28 @@ class QuestDbEngineSpec(BaseEngineSpec, BasicParametersMixin):
         """
         return "{col} * 1000000"
 
+    @classmethod
+    def get_timestamp_expr(
+        cls,
+        col: ColumnClause,
+        pdf: str | None,
+        time_grain: str | None,
+    ) -> TimestampExpression:
+        """Construct a TimestampExpression to be used in a SQLAlchemy query,
+        aggregated with SAMPLE BY when the column is the designated timestamp.
+        :param col: Target column for the TimestampExpression
+        :param pdf: date format (seconds or milliseconds)
+        :param time_grain: time grain, e.g. P1Y for 1 year
+        :return: TimestampExpression object
+        """
+        time_expr = super().get_timestamp_expr(col, pdf, time_grain)
+        sample_by = cls._sample_by_time_grains.get(time_grain)
+        if sample_by is None or pdf in ("epoch_s", "epoch_ms") or col.is_literal:
+            return time_expr
+        return SampleByTimestampExpression(
+            time_expr.name, col, sample_by, type_=time_expr.type
+        )
+
     @classmethod
     def convert_dttm(
         cls, target_type: str, dttm: datetime, db_extra: dict[str, Any] | None = None
@@ -219,35 +285,24 @@ class QuestDbEngineSpec(BaseEngineSpec, BasicParametersMixin):
         :param source: Type coming from the database table or cursor description
         :return: ColumnSpec object
         """
-        sqla_type = qdbc_types.resolve_type_from_name(native_type)
-        if not sqla_type:
+        column_spec = _column_spec(native_type)
+        if column_spec is None:
             return BaseEngineSpec.get_column_spec(native_type, db_extra, source)
-        name_u = sqla_type.__visit_name__
-        generic_type = GenericDataType.STRING
-        if name_u == "BOOLEAN":
-            generic_type = GenericDataType.BOOLEAN
-        elif name_u in ("BYTE", "SHORT", "INT", "LONG", "FLOAT", "DOUBLE"):
-            generic_type = GenericDataType.NUMERIC
-        elif name_u in (
-            "SYMBOL",
-            "STRING",
-            "VARCHAR",
-            "CHAR",
-            "LONG256",
-            "UUID",
-            "LONG128",
-            "IPV4",
-        ):
-            generic_type = GenericDataType.STRING
-        elif name_u in ("DATE", "TIMESTAMP"):
-            generic_type = GenericDataType.TEMPORAL
-        elif "GEOHASH" in name_u and "(" in name_u and ")" in name_u:
-            generic_type = GenericDataType.STRING
-        return utils.ColumnSpec(
-            sqla_type,
-            generic_type,
-            generic_type == GenericDataType.TEMPORAL,
-        )
+        return column_spec
+
+    @classmethod
+    def get_column_types(
+        cls,
+        column_type: str | None,
+    ) -> tuple[TypeEngine, GenericDataType] | None:
+        """Return the sqlalchemy and generic types of a native column type.
+        :param column_type: Column type returned by inspector
+        :return: SQLAlchemy and generic Superset column types
+        """
+        column_spec = _column_spec(column_type)
+        if column_spec is None:
+            return BaseEngineSpec.get_column_types(column_type)
+        return column_spec.sqla_type, column_spec.generic_type
 
     @classmethod
     def get_sqla_column_type(
@@ -262,8 +317,8 @@ class QuestDbEngineSpec(BaseEngineSpec, BasicParametersMixin):
         :param source: Type coming from the database table or cursor description
         :return: ColumnSpec object
         """
-        resolved = qdbc_types.resolve_type_from_name(native_type)
-        return resolved.impl if resolved else None
+        column_spec = _column_spec(native_type)
+        return column_spec.sqla_type.impl if column_spec else None
 
     @classmethod
     def select_star(  # pylint: disable=too-many-arguments
@@ -290,6 +345,11 @@ class QuestDbEngineSpec(BaseEngineSpec, BasicParametersMixin):
         :param cols: Columns to include in query
         :return: SQL query
         """
+        if latest_partition and limit:
+            ts_col_name, lower_bound = _latest_partition(database, table_name)
+            if ts_col_name is not None and lower_bound is None:
+                # not partitioned, LIMIT -n is the last n rows, by designated timestamp
+                limit, latest_partition = -limit, False
         return super().select_star(
             database,
             table_name,
@@ -302,9 +362,57 @@ class QuestDbEngineSpec(BaseEngineSpec, BasicParametersMixin):
             cols,
         )
 
+    @classmethod
+    def where_latest_partition(  # pylint: disable=too-many-arguments
+        cls,
+        table_name: str,
+        schema: str | None,
+        database: Any,
+        query: Select,
+        columns: list[dict[str, Any]] | None = None,
+    ) -> Select | None:
+        """Restrict a query to the newest partition of a table, by designated
+        timestamp. select_star limits queries of tables which are not
+        partitioned to their last rows instead.
+        :param table_name: Table name
+        :param schema: Schema name
+        :param database: Database instance
+        :param query: SqlAlchemy query
+        :param columns: List of TableColumns
+        :return: SqlAlchemy query, None for tables without partitions
+        """
+        ts_col_name, lower_bound = _latest_partition(database, table_name)
+        if ts_col_name is None or lower_bound is None:
+            return None
+        return query.where(
+            column(ts_col_name)
+            >= literal_column(cls.convert_dttm("TIMESTAMP", lower_bound))
+        )
+
     @classmethod
     def get_allow_cost_estimate(cls, extra: dict[str, Any]) -> bool:
-        return False
+        return True
+
+    @classmethod
+    def estimate_statement_cost(cls, statement: str, cursor: Any) -> dict[str, Any]:
+        """Summarize what a statement reads, from its EXPLAIN plan: the tables
+        scanned whole or over intervals of their designated timestamp, how many
+        of their partitions, and the symbol indexes used.
+        :param statement: A single SQL statement
+        :param cursor: Cursor instance
+        :return: Dictionary of the summary's parts
+        """
+        return explain(cursor, statement).describe()
+
+    @classmethod
+    def query_cost_formatter(
+        cls, raw_cost: list[dict[str, Any]]
+    ) -> list[dict[str, str]]:
+        """Format cost estimate.
+        :param raw_cost: Raw estimate from `estimate_query_cost`
+        :return: Human readable cost estimate
+        """
+        return [{k: str(v) for k, v in row.items()} for row in raw_cost]
 
     @classmethod
     def get_view_names(
@@ -341,11 +449,85 @@ class QuestDbEngineSpec(BaseEngineSpec, BasicParametersMixin):
         :return:
         """
         try:
-            sql = sql_parse.strip_comments_from_sql(query)
-            cursor.execute(sql)
+            # one pass over the text, comments and public schema together,
+            # the cursor then finds no public schema left to remove
+            cursor.execute(strip_comments(query))
         except Exception as ex:
             # Log the exception with traceback
             logger.exception(
                 "An error occurred, query(%s): %s\nerror: %s", type(query), query, ex
             )
             raise cls.get_dbapi_mapped_exception(ex) from ex
+
+
+def _column_spec(native_type: str | None) -> utils.ColumnSpec | None:
+    """ColumnSpec of a QuestDB type name, None for names of other types."""
+    try:
+        return _COLUMN_SPECS[native_type]
+    except (KeyError, TypeError):
+        pass
+    sqla_type = qdbc_types.resolve_type_from_name(native_type)
+    column_spec = None
+    if sqla_type is not None:
+        generic_type = _GENERIC_TYPES.get(sqla_type, GenericDataType.STRING)
+        column_spec = utils.ColumnSpec(
+            sqla_type, generic_type, generic_type == GenericDataType.TEMPORAL
+        )
+    if isinstance(native_type, str) and len(_COLUMN_SPECS) < _COLUMN_SPECS_MAX_SIZE:
+        _COLUMN_SPECS[native_type] = column_spec
+    return column_spec
+
+
+def _latest_partition(
+    database: Any, table_name: str
+) -> tuple[str | None, datetime | None]:
+    """Designated timestamp and lowest timestamp of the newest partition of a
+    table, kept for _LATEST_PARTITION_TTL seconds. (None, None) when they cannot
+    be loaded, the preview is then not restricted."""
+    key = (database.id, table_name)
+    now = time.monotonic()
+    with _LATEST_PARTITIONS_LOCK:
+        entry = _LATEST_PARTITIONS.get(key)
+    if entry is None or entry[0] < now:
+        try:
+            with database.get_inspector_with_context() as inspector:
+                latest_partition = inspector.get_latest_partition(table_name)
+        except Exception:  # pylint: disable=broad-except
+            logger.warning(
+                "Could not load the latest partition of %s", table_name, exc_info=True
+            )
+            return None, None
+        entry = (time.monotonic() + _LATEST_PARTITION_TTL, latest_partition)
+        with _LATEST_PARTITIONS_LOCK:
+            # expired entries are evicted on insert, the dict holds the tables
+            # browsed within the last _LATEST_PARTITION_TTL seconds
+            for stale in [k for k, e in _LATEST_PARTITIONS.items() if e[0] < now]:
+                del _LATEST_PARTITIONS[stale]
+            _LATEST_PARTITIONS[key] = entry
+    return entry[1]
+
+
+# (database id, table name) to (expiry, latest partition), shared by the
+# threads of a Superset worker
+_LATEST_PARTITIONS: dict[tuple[Any, str], tuple[float, tuple]] = {}
+_LATEST_PARTITIONS_LOCK = threading.Lock()
+_LATEST_PARTITION_TTL = 60.0
+
+_GENERIC_TYPES = {
+    qdbc_types.Boolean: GenericDataType.BOOLEAN,
+    qdbc_types.Byte: GenericDataType.NUMERIC,
+    qdbc_types.Short: GenericDataType.NUMERIC,
+    qdbc_types.Int: GenericDataType.NUMERIC,
+    qdbc_types.Long: GenericDataType.NUMERIC,
+    qdbc_types.Float: GenericDataType.NUMERIC,
+    qdbc_types.Double: GenericDataType.NUMERIC,
+    qdbc_types.Date: GenericDataType.TEMPORAL,
+    qdbc_types.Timestamp: GenericDataType.TEMPORAL,
+}
+# type name to ColumnSpec, or None for names of other types, filled with the
+# names of all QuestDB types at import and with those Superset asks for since
+_COLUMN_SPECS: dict[str | None, utils.ColumnSpec | None] = {None: None, "": None}
+_COLUMN_SPECS_MAX_SIZE = 4096
+for _type_class in qdbc_types.QUESTDB_TYPES:
+    for _name in (_type_class.__visit_name__, _type_class.__visit_name__.lower()):
+        _column_spec(_name)
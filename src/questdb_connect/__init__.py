@@ -1,19 +1,63 @@
 import os
+import re
 import time
+import warnings
 
 import psycopg2
 
-from questdb_connect.common import PartitionBy, remove_public_schema
+from questdb_connect.asyncpg_dialect import (
+    QuestDBDialect_asyncpg,
+    async_connection_uri,
+    create_async_engine,
+)
+from questdb_connect.bulk_session import BulkSession
+from questdb_connect.capabilities import ServerCapabilities, detect_capabilities
+from questdb_connect.columnar import (
+    DEFAULT_BATCH_SIZE,
+    RAW_TIMESTAMP,
+    DictionaryArray,
+    fetch_arrow,
+    fetch_numpy,
+)
+from questdb_connect.common import PartitionBy, remove_public_schema, strip_comments
 from questdb_connect.compilers import QDBDDLCompiler, QDBSQLCompiler
+from questdb_connect.csv_import import CSVImportError, ImportResult, import_csv
+from questdb_connect.dataframe import to_sql_method, write_dataframe
 from questdb_connect.dialect import (
+    QDBDialectMixin,
+    QDBExecutionContext,
     QuestDBDialect,
     connection_uri,
     create_engine,
     create_superset_engine,
 )
+from questdb_connect.executemany import MAX_QUERY_BYTES, execute_values_pages
+from questdb_connect.explain import PlanSummary, TableScan, explain, parse_plan
 from questdb_connect.identifier_preparer import QDBIdentifierPreparer
+from questdb_connect.ilp import ILPError, ILPSender
 from questdb_connect.inspector import QDBInspector
-from questdb_connect.keywords_functions import get_functions_list, get_keywords_list
+from questdb_connect.keywords_functions import (
+    KeywordRegistry,
+    get_functions_list,
+    get_keywords_list,
+)
+from questdb_connect.keywords_functions import registry as keywords_registry
+from questdb_connect.metadata_cache import MetadataCache
+from questdb_connect.pool import PoolMetrics, QDBPool, is_alive
+from questdb_connect.result_cache import (
+    CachedResult,
+    ResultCache,
+    cache_key,
+    referenced_tables,
+)
+from questdb_connect.sample_by import (
+    DesignatedTimestamps,
+    QDBSelect,
+    SampleBy,
+    SampleByBucket,
+    designated_timestamps,
+    select,
+)
 from questdb_connect.table_engine import QDBTableEngine
 from questdb_connect.types import (
     QUESTDB_TYPES,
@@ -23,16 +67,19 @@ from questdb_connect.types import (
     Char,
     Date,
     Double,
+    DoubleArray,
     Float,
     GeohashByte,
     GeohashInt,
     GeohashLong,
+    GeohashMixin,
     GeohashShort,
     Int,
     IPv4,
     Long,
     Long128,
     Long256,
+    QDBNativeTypeMixin,
     QDBTypeMixin,
     Short,
     String,
@@ -42,6 +89,7 @@ from questdb_connect.types import (
     geohash_class,
     geohash_type_name,
     resolve_type_from_name,
+    type_from_name,
 )
 
 # ===== DBAPI =====
@@ -61,6 +109,312 @@ class Cursor(psycopg2.extensions.cursor):
         """execute(query, vars=None) -- Execute query with bound vars."""
         return super().execute(remove_public_schema(query), vars)
 
+    def executemany(self, query, vars_list):
+        """executemany(query, vars_list) -- Execute query once per set of vars."""
+        return super().executemany(remove_public_schema(query), vars_list)
+
+    def fetch_numpy(self, symbols=(), batch_size=DEFAULT_BATCH_SIZE):
+        """Fetches the remaining rows into a dict of NumPy arrays, see columnar.fetch_numpy."""
+        return fetch_numpy(self, symbols, batch_size)
+
+    def fetch_arrow(self, symbols=(), batch_size=DEFAULT_BATCH_SIZE):
+        """Fetches the remaining rows into a pyarrow.Table, see columnar.fetch_arrow."""
+        return fetch_arrow(self, symbols, batch_size)
+
+
+class StreamingCursor(Cursor):
+    """Cursor that fetches a SELECT result set in pages of ``itersize`` rows.
+
+    QuestDB does not support DECLARE/FETCH, which is what psycopg2's named
+    (server side) cursors use, and psycopg2 has no single row mode, so each
+    page is requested with QuestDB's own ``LIMIT lo, hi`` pagination and only
+    one page is held in memory at a time. psycopg 3's ``Cursor.stream()``, see
+    questdb_connect.psycopg3, streams a result set in one query instead.
+
+    Each page runs the query again, up to its page: pages are consistent only
+    when the SELECT has an ORDER BY of unique values, e.g. the designated
+    timestamp of a table without duplicates, and no rows are written meanwhile,
+    and the server's work grows with the square of the number of pages. A
+    SELECT without a top level ORDER BY of the columns (or ``*``) of a single
+    table, with no other clause than WHERE, is ordered by the designated
+    timestamp of the table, looked up in ``tables()``. Other SELECTs without
+    ORDER BY, whose row order may differ between runs, are executed as with a
+    plain Cursor, with a warning, their whole result set is fetched, and so are
+    the other statements. ``rowcount`` is the number of rows of the pages
+    fetched so far.
+    """
+
+    tables_name_column = "table_name"
+    _page_query = None
+    _page_rows = 0
+
+    def execute(self, query, vars=None):
+        """execute(query, vars=None) -- Execute query with bound vars, paginated."""
+        # a trailing -- comment would swallow the LIMIT of the page query
+        query = strip_comments(query)
+        self._page_query = None
+        self._page_vars = vars
+        self._page_lo = 0
+        self._page_rows = 0
+        self._page_exhausted = True
+        if isinstance(query, str) and _PAGEABLE_STATEMENT.match(query):
+            query = query.strip().rstrip(";")
+            top_level = _top_level(query)
+            ordered_query = (
+                query
+                if _ORDER_BY.search(top_level)
+                else self._order_by_designated_timestamp(query, top_level)
+            )
+            if ordered_query is not None:
+                self._page_query = f"SELECT * FROM ({ordered_query}) LIMIT "
+                self._next_page()
+                return None
+            warnings.warn(
+                "StreamingCursor pages a SELECT without ORDER BY only from a "
+                "single table with a designated timestamp, the whole result "
+                "set is fetched",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+        return psycopg2.extensions.cursor.execute(self, query, vars)
+
+    @property
+    def rowcount(self):
+        if self._page_query is not None:
+            return self._page_rows
+        return super().rowcount
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is None and self._next_page():
+            row = super().fetchone()
+        return row
+
+    def fetchmany(self, size=None):
+        size = size or self.arraysize
+        rows = super().fetchmany(size)
+        while len(rows) < size and self._next_page():
+            rows.extend(super().fetchmany(size - len(rows)))
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        while self._next_page():
+            rows.extend(super().fetchall())
+        return rows
+
+    def __iter__(self):
+        while True:
+            rows = self.fetchmany(self.itersize)
+            if not rows:
+                return
+            yield from rows
+
+    def _order_by_designated_timestamp(self, query, top_level):
+        match = _SINGLE_TABLE_SELECT.match(top_level)
+        if match is None or _UNPAGEABLE_CLAUSES.search(top_level):
+            return None
+        table_name = _unquote(match.group("table"))
+        psycopg2.extensions.cursor.execute(
+            self,
+            f"SELECT designatedTimestamp FROM tables() "
+            f"WHERE lower({self.tables_name_column}) = lower(%s)",
+            (table_name,),
+        )
+        row = super().fetchone()
+        if row is None or not row[0]:
+            return None
+        ts_col_name = _quote(row[0])
+        qualifier = match.group("alias") or match.group("table")
+        return f"{query} ORDER BY {qualifier}.{ts_col_name}"
+
+    def _next_page(self):
+        if self._page_query is None or (self._page_lo and self._page_exhausted):
+            return False
+        page_size = max(int(self.itersize), 1)
+        hi = self._page_lo + page_size
+        psycopg2.extensions.cursor.execute(
+            self, f"{self._page_query}{self._page_lo}, {hi}", self._page_vars
+        )
+        page_rows = super().rowcount
+        self._page_lo = hi
+        self._page_rows += page_rows
+        self._page_exhausted = page_rows < page_size
+        return True
+
+
+def _top_level(query: str) -> str:
+    """The query, without comments, with its string literals emptied and the
+    contents of its parentheses removed."""
+    parts = []
+    depth = 0
+    pos = 0
+    for match in _NESTING_TOKENS.finditer(query):
+        text = match.group()
+        if depth == 0:
+            parts.append(query[pos : match.start()])
+        if text == "(":
+            depth += 1
+            if depth == 1:
+                parts.append(text)
+        elif text == ")":
+            depth = max(depth - 1, 0)
+            if depth == 0:
+                parts.append(text)
+        elif depth == 0:
+            parts.append("''" if text[0] == "'" else text)
+        pos = match.end()
+    if depth == 0:
+        parts.append(query[pos:])
+    return "".join(parts)
+
+
+def _unquote(identifier: str) -> str:
+    if identifier.startswith('"'):
+        return identifier[1:-1].replace('""', '"')
+    return identifier
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+_PAGEABLE_STATEMENT = re.compile(r"^\s*SELECT\b", re.IGNORECASE)
+_NESTING_TOKENS = re.compile(r"""'[^']*(?:''[^']*)*'?|"[^"]*(?:""[^"]*)*"?|[()]""")
+_ORDER_BY = re.compile(r"\bORDER\s+BY\b", re.IGNORECASE)
+_IDENTIFIER = r'(?:"(?:[^"]|"")+"|[A-Za-z_]\w*)'
+_COLUMN = (
+    rf"(?:\*|{_IDENTIFIER}(?:\.{_IDENTIFIER})?(?:\.\*)?"
+    rf"(?:\s+(?:AS\s+)?{_IDENTIFIER})?)"
+)
+_SINGLE_TABLE_SELECT = re.compile(
+    rf"^\s*SELECT\s+{_COLUMN}(?:\s*,\s*{_COLUMN})*\s+FROM\s+(?P<table>{_IDENTIFIER})"
+    rf"(?:\s+(?:AS\s+)?(?P<alias>{_IDENTIFIER}))?(?:\s+WHERE\s.*)?$",
+    re.IGNORECASE | re.DOTALL,
+)
+_UNPAGEABLE_CLAUSES = re.compile(
+    r"\b(?:DISTINCT|JOIN|GROUP|SAMPLE|LATEST|UNION|EXCEPT|INTERSECT|LIMIT)\b",
+    re.IGNORECASE,
+)
+
+
+class CachingCursor(Cursor):
+    """Cursor that serves SELECT result sets from the connection's ResultCache.
+
+    A lookup costs a ``wal_tables()`` query, whose txns tell whether the cached
+    result set is still valid. On a miss the query is executed and its whole
+    result set is fetched, to be cached when all the tables it reads are WAL
+    tables, otherwise the query is executed directly from then on. Other
+    statements are executed as with a plain Cursor.
+    """
+
+    _cached = None
+    _cached_pos = 0
+
+    def execute(self, query, vars=None):
+        """execute(query, vars=None) -- Execute query with bound vars, or hit the cache."""
+        query = remove_public_schema(query)
+        self._cached = None
+        cache = getattr(self.connection, "result_cache", None)
+        key = None
+        if (
+            cache is not None
+            and isinstance(query, str)
+            and _PAGEABLE_STATEMENT.match(query)
+        ):
+            key = cache_key(query, vars)
+        if key is None or not cache.is_cacheable(key):
+            return psycopg2.extensions.cursor.execute(self, query, vars)
+        wal_txns = self._wal_txns()
+        entry = cache.get(key, wal_txns)
+        if entry is None:
+            psycopg2.extensions.cursor.execute(self, query, vars)
+            description = self.description
+            rows = psycopg2.extensions.cursor.fetchall(self)
+            entry = CachedResult(description, rows, {}, 0)
+            tables = referenced_tables(query, self._table_names())
+            if tables and tables.issubset(wal_txns):
+                cache.put(
+                    key,
+                    description,
+                    rows,
+                    {table: wal_txns[table] for table in tables},
+                )
+            else:
+                cache.set_uncacheable(key)
+        self._cached = entry
+        self._cached_pos = 0
+        return None
+
+    @property
+    def description(self):
+        if self._cached is not None:
+            return self._cached.description
+        return super().description
+
+    @property
+    def rowcount(self):
+        if self._cached is not None:
+            return len(self._cached.rows)
+        return super().rowcount
+
+    def fetchone(self):
+        if self._cached is None:
+            return super().fetchone()
+        if self._cached_pos >= len(self._cached.rows):
+            return None
+        self._cached_pos += 1
+        return self._cached.rows[self._cached_pos - 1]
+
+    def fetchmany(self, size=None):
+        if self._cached is None:
+            return super().fetchmany(size or self.arraysize)
+        lo = self._cached_pos
+        self._cached_pos = min(lo + (size or self.arraysize), len(self._cached.rows))
+        return self._cached.rows[lo : self._cached_pos]
+
+    def fetchall(self):
+        if self._cached is None:
+            return super().fetchall()
+        lo, self._cached_pos = self._cached_pos, len(self._cached.rows)
+        return self._cached.rows[lo:]
+
+    def __iter__(self):
+        if self._cached is None:
+            return super().__iter__()
+        return iter(self.fetchall())
+
+    def _wal_txns(self):
+        with self.connection.cursor(cursor_factory=Cursor) as cursor:
+            cursor.execute("SELECT name, writerTxn, sequencerTxn FROM wal_tables()")
+            return {
+                name.lower(): (writer, sequencer) for name, writer, sequencer in cursor
+            }
+
+    def _table_names(self):
+        with self.connection.cursor(cursor_factory=Cursor) as cursor:
+            cursor.execute("SHOW TABLES")
+            return {row[0].lower() for row in cursor}
+
+
+class Connection(psycopg2.extensions.connection):
+    def fetch_numpy(self, query, vars=None, symbols=(), batch_size=DEFAULT_BATCH_SIZE):
+        """Executes query and returns its result set as a dict of NumPy arrays."""
+        with self._columnar_cursor(query, vars) as cursor:
+            return cursor.fetch_numpy(symbols, batch_size)
+
+    def fetch_arrow(self, query, vars=None, symbols=(), batch_size=DEFAULT_BATCH_SIZE):
+        """Executes query and returns its result set as a pyarrow.Table."""
+        with self._columnar_cursor(query, vars) as cursor:
+            return cursor.fetch_arrow(symbols, batch_size)
+
+    def _columnar_cursor(self, query, vars):
+        cursor = self.cursor(cursor_factory=Cursor)
+        # timestamps are parsed in bulk, no datetime objects needed
+        psycopg2.extensions.register_type(RAW_TIMESTAMP, cursor)
+        cursor.execute(query, vars)
+        return cursor
+
 
 def cursor_factory(*args, **kwargs):
     return Cursor(*args, **kwargs)
@@ -73,6 +427,7 @@ def connect(**kwargs):
     password = kwargs.get("password") or "quest"
     database = kwargs.get("database") or "main"
     conn = psycopg2.connect(
+        connection_factory=Connection,
         cursor_factory=cursor_factory,
         host=host,
         port=port,
@@ -80,7 +435,4 @@ def connect(**kwargs):
         password=password,
         database=database,
     )
-    # retrieve and cache function names and keywords lists
-    get_keywords_list(conn)
-    get_functions_list(conn)
     return conn
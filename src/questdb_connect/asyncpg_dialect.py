@@ -0,0 +1,90 @@
+import asyncio
+
+import sqlalchemy
+from sqlalchemy.dialects.postgresql.asyncpg import (
+    PGDialect_asyncpg,
+    PGExecutionContext_asyncpg,
+)
+
+from .common import remove_public_schema
+from .dialect import QDBDialectMixin, invalidate_metadata_cache
+
+# ===== SQLAlchemy asyncio Dialect ======
+# questdb+asyncpg:// for create_async_engine, needs the asyncpg package
+# https://docs.sqlalchemy.org/en/14/orm/extensions/asyncio.html
+
+
+def async_connection_uri(
+    host: str, port: str, username: str, password: str, database: str = "main"
+):
+    return f"questdb+asyncpg://{username}:{password}@{host}:{port}/{database}"
+
+
+def create_async_engine(
+    host: str,
+    port: str,
+    username: str,
+    password: str,
+    database: str = "main",
+    **kwargs,
+):
+    """Extra keyword arguments go to sqlalchemy's create_async_engine, e.g.
+    pool_size and max_overflow, which cap the number of concurrent queries."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    return create_async_engine(
+        async_connection_uri(host, port, username, password, database),
+        hide_parameters=False,
+        implicit_returning=False,
+        **kwargs,
+    )
+
+
+class QDBAsyncExecutionContext(PGExecutionContext_asyncpg):
+    def post_exec(self):
+        super().post_exec()
+        invalidate_metadata_cache(self)
+
+
+class QuestDBDialect_asyncpg(QDBDialectMixin, PGDialect_asyncpg):
+    """QuestDB over asyncpg, same compilers, inspector and types as QuestDBDialect.
+
+    Queries run concurrently on the event loop, one per pooled connection.
+    The result cache needs psycopg2 cursors and is not available.
+    """
+
+    execution_ctx_cls = QDBAsyncExecutionContext
+    supports_statement_cache = True
+
+    def __init__(self, result_cache_bytes=None, **kwargs):
+        if result_cache_bytes:
+            raise sqlalchemy.exc.ArgumentError(
+                "result_cache_bytes is not supported by questdb+asyncpg"
+            )
+        super().__init__(**kwargs)
+
+    def on_connect(self):
+        def connect(conn):
+            # QuestDB has neither isolation levels nor JSON types: transactions
+            # start with a plain BEGIN and asyncpg's JSON codecs are not set up
+            conn.isolation_level = None
+
+        return connect
+
+    def _run_ilp_send(self, send):
+        # the ILP socket I/O blocks, and the shared sender's lock may be held by
+        # another connection's send: both run in a thread, off the event loop
+        sqlalchemy.util.await_only(
+            asyncio.get_running_loop().run_in_executor(None, send)
+        )
+
+    def do_execute(self, cursor, statement, parameters, context=None):
+        super().do_execute(cursor, remove_public_schema(statement), parameters, context)
+
+    def do_execute_no_params(self, cursor, statement, context=None):
+        super().do_execute_no_params(cursor, remove_public_schema(statement), context)
+
+    def do_executemany(self, cursor, statement, parameters, context=None):
+        return super().do_executemany(
+            cursor, remove_public_schema(statement), parameters, context
+        )
@@ -0,0 +1,106 @@
+import weakref
+
+import sqlalchemy
+from sqlalchemy.orm import Session, attributes
+
+from .table_engine import QDBTableEngine
+
+# ===== ORM bulk mode =====
+# Time series rows are append only and have no identity worth tracking, the
+# unit of work's bookkeeping (identity map, flush order, primary keys, expiry
+# after commit) is most of the cost of session.add() for them.
+
+
+class BulkSession(Session):
+    """Session that does not track new objects of QDBTableEngine tables.
+
+    ``add()`` and ``add_all()`` copy the column attributes of such objects into
+    columnar buffers, one per table and set of attributes, which are inserted
+    on ``flush()`` and so on ``commit()``, with one executemany INSERT per
+    buffer. The dialect sends it with ILP when the table's engine has
+    ``use_ilp=True``, otherwise in multi-row VALUES pages.
+
+    The objects are not attached to the session: they are never refreshed,
+    expired nor returned by queries of this session. Mappers with
+    relationships, persistent objects and objects of other tables go through
+    the unit of work as with a plain Session. ``rollback()`` and ``close()``
+    discard the buffers.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._bulk_buffers = {}
+        super().__init__(*args, **kwargs)
+
+    def add(self, instance, _warn=True):
+        state = attributes.instance_state(instance)
+        columns = _bulk_columns(state.class_)
+        if columns is None or state.key is not None or state.session_id is not None:
+            return super().add(instance, _warn)
+        values = state.dict
+        keys = tuple(filter(values.__contains__, columns))
+        if not keys:
+            return super().add(instance, _warn)
+        buffer = self._bulk_buffers.get((state.mapper, keys))
+        if buffer is None:
+            buffer = self._bulk_buffers[(state.mapper, keys)] = [[] for _ in keys]
+        for key, column in zip(keys, buffer):
+            column.append(values[key])
+        return None
+
+    def flush(self, objects=None):
+        super().flush(objects)
+        self._flush_bulk()
+
+    def commit(self):
+        self._flush_bulk()
+        super().commit()
+
+    def rollback(self):
+        self._bulk_buffers = {}
+        super().rollback()
+
+    def expunge_all(self):
+        self._bulk_buffers = {}
+        super().expunge_all()
+
+    @property
+    def bulk_pending(self) -> int:
+        """Number of buffered rows, to be inserted by the next flush."""
+        return sum(len(buffer[0]) for buffer in self._bulk_buffers.values())
+
+    def _flush_bulk(self):
+        buffers, self._bulk_buffers = self._bulk_buffers, {}
+        for (mapper, keys), buffer in buffers.items():
+            columns = _bulk_columns(mapper.class_)
+            names = [columns[key] for key in keys]
+            self.connection(bind_arguments={"mapper": mapper}).execute(
+                sqlalchemy.insert(mapper.local_table),
+                [dict(zip(names, row)) for row in zip(*buffer)],
+            )
+
+
+def _bulk_columns(cls):
+    """Attribute key to column key map of a bulk mapped class, None otherwise."""
+    try:
+        return _BULK_COLUMNS[cls]
+    except KeyError:
+        pass
+    mapper = sqlalchemy.inspect(cls)
+    table = mapper.local_table
+    columns = None
+    if (
+        isinstance(getattr(table, "engine", None), QDBTableEngine)
+        and not mapper.relationships
+        and not mapper.inherits
+        and len(mapper.tables) == 1
+    ):
+        columns = {
+            prop.key: prop.columns[0].key
+            for prop in mapper.column_attrs
+            if getattr(prop.columns[0], "table", None) is table
+        }
+    _BULK_COLUMNS[cls] = columns
+    return columns
+
+
+_BULK_COLUMNS = weakref.WeakKeyDictionary()
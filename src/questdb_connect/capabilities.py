@@ -0,0 +1,83 @@
+import re
+import typing
+
+# ===== Server capabilities =====
+# Detected once per engine, when its first connection is made, so that the
+# catalog queries fit the server instead of failing and being retried.
+
+
+class ServerCapabilities(typing.NamedTuple):
+    """QuestDB version and catalog schema of the server an engine connects to.
+
+    ``version`` is None when the server does not report it. The column names
+    are those of tables() and table_columns(), empty when the server lacks
+    them: tables() named its table name column ``name`` before 7.3, and older
+    servers have no ``walEnabled`` nor ``upsertKey``.
+    """
+
+    version: typing.Optional[typing.Tuple[int, int, int]] = None
+    tables_name_column: str = "table_name"
+    wal_column: str = "walEnabled"
+    upsert_key_column: str = "upsertKey"
+
+    @property
+    def table_attributes_select(self):
+        """Designated timestamp, partitioning and WAL flag, from tables()."""
+        wal = self.wal_column or "false"
+        return f"designatedTimestamp, partitionBy, {wal} FROM tables()"
+
+    @property
+    def table_columns_select(self):
+        """Name, type and upsert key flag, from table_columns()."""
+        upsert_key = (
+            f'"{self.upsert_key_column}"' if self.upsert_key_column else "false"
+        )
+        return f'"column", "type", {upsert_key} FROM table_columns'
+
+
+def detect_capabilities(dbapi_conn, cursor_factory=None) -> ServerCapabilities:
+    """Probes the server through a DBAPI connection, three short queries."""
+    if cursor_factory is not None:
+        cursor = dbapi_conn.cursor(cursor_factory=cursor_factory)
+    else:
+        cursor = dbapi_conn.cursor()
+    try:
+        return _detect_capabilities(dbapi_conn, cursor)
+    finally:
+        cursor.close()
+
+
+def _detect_capabilities(dbapi_conn, cursor):
+    try:
+        cursor.execute("SELECT build()")
+        build = (cursor.fetchone() or ("",))[0]
+    except Exception:
+        # before build() there was no version to report, any driver's error
+        dbapi_conn.rollback()
+        build = ""
+    version = _BUILD_VERSION.search(build or "")
+    version = tuple(int(part) for part in version.groups()) if version else None
+    cursor.execute("SELECT * FROM tables() LIMIT 1")
+    tables_columns = [column[0] for column in cursor.description]
+    table = cursor.fetchone()
+    name_column = _first_of(tables_columns, "table_name", "name")
+    if table is not None and name_column:
+        table_name = table[tables_columns.index(name_column)].replace("'", "''")
+        cursor.execute(f"SELECT * FROM table_columns('{table_name}') LIMIT 1")
+        has_upsert_key = "upsertKey" in [column[0] for column in cursor.description]
+    else:
+        # no table to look at, dedup upsert keys came with 7.3
+        has_upsert_key = version is None or version >= (7, 3, 0)
+    return ServerCapabilities(
+        version=version,
+        tables_name_column=name_column or "table_name",
+        wal_column="walEnabled" if "walEnabled" in tables_columns else "",
+        upsert_key_column="upsertKey" if has_upsert_key else "",
+    )
+
+
+def _first_of(names, *candidates):
+    return next((name for name in candidates if name in names), "")
+
+
+_BUILD_VERSION = re.compile(r"QuestDB (\d+)\.(\d+)\.(\d+)")
@@ -0,0 +1,191 @@
+import typing
+
+import psycopg2
+
+# ===== Columnar fetch =====
+# Result sets decoded into NumPy arrays or Arrow tables, one typed buffer per
+# column. numpy, and pyarrow for fetch_arrow, are optional dependencies.
+
+DEFAULT_BATCH_SIZE = 65536
+
+# PostgreSQL type OIDs QuestDB uses in row descriptions
+_BOOL_OID = 16
+_INT8_OID = 20
+_INT2_OID = 21
+_INT4_OID = 23
+_FLOAT4_OID = 700
+_FLOAT8_OID = 701
+_TIMESTAMPTZ_OID = 1184
+_TIMESTAMP_OIDS = (1114, _TIMESTAMPTZ_OID)
+
+# TIMESTAMP values are kept as text and parsed in bulk by numpy, instead of
+# being turned into one datetime object per value by psycopg2
+RAW_TIMESTAMP = psycopg2.extensions.new_type(
+    _TIMESTAMP_OIDS, "QDB_RAW_TIMESTAMP", lambda value, _cursor: value
+)
+
+
+class DictionaryArray(typing.NamedTuple):
+    """Dictionary encoded column, SYMBOL values are ``categories[codes]``, -1 is null."""
+
+    codes: typing.Any
+    categories: typing.Any
+
+    def decode(self):
+        import numpy as np
+
+        values = np.append(self.categories, None)  # codes -1 point to None
+        return values[self.codes]
+
+
+def fetch_numpy(cursor, symbols=(), batch_size=DEFAULT_BATCH_SIZE):
+    """Fetches the remaining rows of an executed cursor into NumPy arrays.
+
+    Columns are decoded into int64 (LONG), int32 (INT), int16 (SHORT, BYTE),
+    float64 (DOUBLE), float32 (FLOAT), bool (BOOLEAN), datetime64[us]
+    (TIMESTAMP, DATE) and object arrays for everything else. Nulls follow
+    QuestDB's conventions: the minimum value for integers, NaN and NaT.
+    Columns named in ``symbols`` are dictionary encoded, QuestDB reports SYMBOL
+    and STRING columns with the same type in row descriptions.
+
+    :param cursor: a cursor on which a query was executed
+    :param symbols: names of the columns to return as DictionaryArray
+    :param batch_size: rows fetched and converted at once, bounds the number of
+        Python row tuples alive at any time
+    :return: dict column name -> np.ndarray, or DictionaryArray
+    """
+    import numpy as np
+
+    builders = _column_builders(np, cursor.description, set(symbols))
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        for builder, column in zip(builders, zip(*rows)):
+            builder.append(column)
+    return {builder.name: builder.finish() for builder in builders}
+
+
+def fetch_arrow(cursor, symbols=(), batch_size=DEFAULT_BATCH_SIZE):
+    """Fetches the remaining rows of an executed cursor into a pyarrow.Table.
+
+    Same decoding as fetch_numpy, with QuestDB's null sentinels turned into
+    Arrow nulls and ``symbols`` columns returned as Arrow dictionary arrays.
+    """
+    import numpy as np
+    import pyarrow as pa
+
+    arrays, names = [], []
+    for name, column in fetch_numpy(cursor, symbols, batch_size).items():
+        names.append(name)
+        if isinstance(column, DictionaryArray):
+            arrays.append(
+                pa.DictionaryArray.from_arrays(
+                    pa.array(column.codes, mask=column.codes < 0),
+                    pa.array(column.categories, type=pa.string()),
+                )
+            )
+        elif column.dtype.kind == "i":
+            arrays.append(pa.array(column, mask=column == np.iinfo(column.dtype).min))
+        elif column.dtype.kind in ("f", "M"):
+            arrays.append(pa.array(column, from_pandas=True))
+        else:
+            arrays.append(pa.array(column))
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+def _column_builders(np, description, symbols):
+    if description is None:
+        raise psycopg2.ProgrammingError("no results to fetch")
+    builders = []
+    for column in description:
+        if column.name in symbols:
+            builders.append(_DictionaryBuilder(np, column.name))
+            continue
+        type_code = column.type_code
+        if type_code == _INT8_OID:
+            dtype = np.int64
+        elif type_code == _INT4_OID:
+            dtype = np.int32
+        elif type_code == _INT2_OID:
+            dtype = np.int16
+        elif type_code == _FLOAT8_OID:
+            dtype = np.float64
+        elif type_code == _FLOAT4_OID:
+            dtype = np.float32
+        elif type_code == _BOOL_OID:
+            dtype = np.bool_
+        elif type_code in _TIMESTAMP_OIDS:
+            dtype = np.dtype("datetime64[us]")
+        else:
+            dtype = object
+        convert = _utc_naive if type_code == _TIMESTAMPTZ_OID else None
+        builders.append(_ArrayBuilder(np, column.name, np.dtype(dtype), convert))
+    return builders
+
+
+class _ArrayBuilder:
+    def __init__(self, np, name, dtype, convert=None):
+        self.np = np
+        self.name = name
+        self.dtype = dtype
+        self.convert = convert
+        self.null = np.iinfo(dtype).min if dtype.kind == "i" else None
+        self.chunks = []
+
+    def append(self, values):
+        if self.null is not None and None in values:
+            values = [self.null if value is None else value for value in values]
+        elif self.dtype.kind == "b" and None in values:
+            values = [bool(value) for value in values]
+        elif self.convert is not None:
+            values = [self.convert(value) for value in values]
+        if self.dtype.kind == "O":
+            chunk = self.np.empty(len(values), dtype=object)
+            chunk[:] = values
+        else:
+            chunk = self.np.array(values, dtype=self.dtype)
+        self.chunks.append(chunk)
+
+    def finish(self):
+        if not self.chunks:
+            return self.np.empty(0, dtype=self.dtype)
+        if len(self.chunks) == 1:
+            return self.chunks[0]
+        return self.np.concatenate(self.chunks)
+
+
+class _DictionaryBuilder:
+    def __init__(self, np, name):
+        self.np = np
+        self.name = name
+        self.lookup = {None: -1}
+        self.chunks = []
+
+    def append(self, values):
+        lookup = self.lookup
+        codes = [lookup.setdefault(value, len(lookup) - 1) for value in values]
+        self.chunks.append(self.np.array(codes, dtype=self.np.int32))
+
+    def finish(self):
+        np = self.np
+        categories = np.empty(len(self.lookup) - 1, dtype=object)
+        for value, code in self.lookup.items():
+            if code >= 0:
+                categories[code] = value
+        if not self.chunks:
+            codes = np.empty(0, dtype=np.int32)
+        elif len(self.chunks) == 1:
+            codes = self.chunks[0]
+        else:
+            codes = np.concatenate(self.chunks)
+        return DictionaryArray(codes, categories)
+
+
+def _utc_naive(value):
+    # numpy does not parse timestamptz, QuestDB's are always UTC
+    if isinstance(value, str):
+        return value.rstrip("Z").split("+", 1)[0]
+    if value is not None and value.tzinfo is not None:
+        return value.replace(tzinfo=None) - value.utcoffset()
+    return value
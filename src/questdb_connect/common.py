@@ -1,5 +1,7 @@
+import collections
 import enum
 import re
+import threading
 
 
 class PartitionBy(enum.Enum):
@@ -13,10 +15,80 @@ class PartitionBy(enum.Enum):
 
 def remove_public_schema(query):
     if isinstance(query, str) and query and "public" in query:
-        return re.sub(_PUBLIC_SCHEMA_FILTER, "", query)
+        return _remove_public_schema(query)
     return query
 
 
+class _QueryCache:
+    """LRU cache of a query rewrite, bounded by the chars of the queries and of
+    their rewrites rather than by their number, queries can be MBs long."""
+
+    def __init__(self, rewrite, max_chars):
+        self.__wrapped__ = rewrite
+        self.max_chars = max_chars
+        self.nchars = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, query):
+        with self._lock:
+            result = self._entries.get(query)
+            if result is not None:
+                self._entries.move_to_end(query)
+                return result
+        result = self.__wrapped__(query)
+        nchars = len(query) + len(result)
+        # a single query takes at most an eighth of the cache
+        if nchars <= self.max_chars >> 3:
+            with self._lock:
+                if query not in self._entries:
+                    self._entries[query] = result
+                    self.nchars += nchars
+                    while self.nchars > self.max_chars:
+                        old_query, old_result = self._entries.popitem(last=False)
+                        self.nchars -= len(old_query) + len(old_result)
+        return result
+
+    def __len__(self):
+        return len(self._entries)
+
+    def cache_clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nchars = 0
+
+
+def _query_cache(max_chars):
+    return lambda rewrite: _QueryCache(rewrite, max_chars)
+
+
+@_query_cache(max_chars=4 << 20)
+def _remove_public_schema(query):
+    # string literals, quoted identifiers and comments are matched as a whole
+    # and put back as they are, only the public schema qualifiers are dropped
+    return _PUBLIC_SCHEMA_FILTER.sub(r"\g<keep>", query)
+
+
+def strip_comments(query):
+    """Removes the comments and the public schema qualifiers of a query, in
+    one pass. Hints, /*+ ... */, are kept, block comments become a space."""
+    if isinstance(query, str) and query and ("-" in query or "/" in query):
+        return _strip_comments(query)
+    return remove_public_schema(query)
+
+
+@_query_cache(max_chars=1 << 20)
+def _strip_comments(query):
+    return _COMMENTS_PUBLIC_SCHEMA_FILTER.sub(_strip_comment, query)
+
+
+def _strip_comment(match):
+    keep = match.group("keep")
+    if keep is not None:
+        return keep
+    return " " if match.group("block") is not None else ""
+
+
 def quote_identifier(identifier: str):
     if not identifier:
         return None
@@ -30,6 +102,17 @@ def quote_identifier(identifier: str):
 
 
 _PUBLIC_SCHEMA_FILTER = re.compile(
-    r"(')?(public(?(1)\1|)\.)", re.IGNORECASE | re.MULTILINE
+    # the lookahead lets the scanner skip characters which cannot start a token
+    r"""(?=[-'"/p])(?:'public'\.|"public"\.|\bpublic\."""
+    r"""|(?P<keep>'[^']*(?:''[^']*)*'?|"[^"]*(?:""[^"]*)*"?|--[^\r\n]*"""
+    r"""|/\*(?:[^*]|\*(?!/))*(?:\*/)?))""",
+    re.IGNORECASE,
+)
+_COMMENTS_PUBLIC_SCHEMA_FILTER = re.compile(
+    r"""(?=[-'"/p])(?:'public'\.|"public"\.|\bpublic\.|--[^\r\n]*"""
+    r"""|(?P<block>/\*(?!\+)(?:[^*]|\*(?!/))*(?:\*/)?)"""
+    r"""|(?P<keep>'[^']*(?:''[^']*)*'?|"[^"]*(?:""[^"]*)*"?"""
+    r"""|/\*\+(?:[^*]|\*(?!/))*(?:\*/)?))""",
+    re.IGNORECASE,
 )
 _QUOTES = ("'", '"')
@@ -3,6 +3,8 @@ import abc
 import sqlalchemy
 
 from .common import quote_identifier, remove_public_schema
+from .sample_by import SampleByBucket
+from .table_engine import QDBTableEngine
 from .types import QDBTypeMixin
 
 
@@ -33,12 +35,115 @@ class QDBSQLCompiler(sqlalchemy.sql.compiler.SQLCompiler, abc.ABC):
     # Maximum value for 64-bit signed integer (2^63 - 1)
     BIGINT_MAX = 9223372036854775807
 
+    def __init__(self, *args, **kwargs):
+        # SampleBy of each SELECT being compiled, innermost last, or None
+        self._sample_by_stack = []
+        super().__init__(*args, **kwargs)
+
     def _is_safe_for_fast_insert_values_helper(self):
         return True
 
-    def visit_textclause(self, textclause, add_to_result_map=None, **kw):
-        textclause.text = remove_public_schema(textclause.text)
-        return super().visit_textclause(textclause, add_to_result_map, **kw)
+    def visit_select(self, select_stmt, **kw):
+        sample_by = getattr(select_stmt, "_sample_by", None)
+        if sample_by is not None:
+            self._sample_by_stack.append((None, self._select_sample_by(select_stmt)))
+            # group_by_clause is only called for a SELECT with a GROUP BY, the
+            # marker is not rendered, the SAMPLE BY is in its place
+            select_stmt = select_stmt.group_by(_SAMPLE_BY_MARKER)
+        else:
+            self._sample_by_stack.append(self._bucket_sample_by(select_stmt))
+        try:
+            return super().visit_select(select_stmt, **kw)
+        finally:
+            self._sample_by_stack.pop()
+
+    def is_sample_by_bucket(self, bucket):
+        """True when ``bucket`` is rendered as its column, under SAMPLE BY."""
+        stack = self._sample_by_stack
+        return bool(stack) and stack[-1] is not None and stack[-1][0] is bucket
+
+    def group_by_clause(self, select, **kw):
+        stack = self._sample_by_stack
+        if stack and stack[-1] is not None:
+            return " " + stack[-1][1].clause()
+        return super().group_by_clause(select, **kw)
+
+    def _bucket_sample_by(self, select):
+        """(bucket, SampleBy) when SAMPLE BY can replace the GROUP BY of a bucket."""
+        group_by = [_unlabel(element) for element in select._group_by_clauses]
+        buckets = [
+            element for element in group_by if isinstance(element, SampleByBucket)
+        ]
+        if len(buckets) != 1 or select._having_criteria:
+            return None
+        bucket = buckets[0]
+        froms = (
+            select.get_final_froms()
+            if hasattr(select, "get_final_froms")
+            else select.froms
+        )
+        if len(froms) != 1:
+            return None
+        ts_col_name = self._designated_timestamp(froms[0])
+        col_name = getattr(bucket.col, "name", None)
+        if not ts_col_name or not col_name or ts_col_name.lower() != col_name.lower():
+            return None
+        # the other GROUP BY columns are SAMPLE BY's keys only when selected
+        selected = {id(_unlabel(element)) for element in select._raw_columns}
+        if any(
+            element is not bucket and id(element) not in selected
+            for element in group_by
+        ):
+            return None
+        return bucket, self._with_dialect_defaults(bucket.sample_by)
+
+    def _select_sample_by(self, select):
+        """SampleBy of a QDBSelect, validated against its table."""
+        if select._group_by_clauses or select._having_criteria:
+            raise sqlalchemy.exc.CompileError(
+                "SAMPLE BY cannot be combined with GROUP BY or HAVING"
+            )
+        froms = (
+            select.get_final_froms()
+            if hasattr(select, "get_final_froms")
+            else select.froms
+        )
+        table = froms[0] if len(froms) == 1 else None
+        if isinstance(table, sqlalchemy.sql.expression.Alias):
+            table = table.element
+        if not isinstance(table, sqlalchemy.sql.expression.TableClause):
+            raise sqlalchemy.exc.CompileError(
+                "SAMPLE BY requires a SELECT from a single table"
+            )
+        # only the statement decides, as it is the statement cache key: the
+        # server validates the tables without QDBTableEngine
+        engine = getattr(table, "engine", None)
+        if isinstance(engine, QDBTableEngine) and not engine.ts_col_name:
+            raise sqlalchemy.exc.CompileError(
+                f"SAMPLE BY requires a designated timestamp, "
+                f"table {table.name} has none"
+            )
+        return self._with_dialect_defaults(select._sample_by)
+
+    def _with_dialect_defaults(self, sample_by):
+        if not sample_by.fill and self.dialect.sample_by_fill:
+            sample_by = sample_by._replace(fill=self.dialect.sample_by_fill)
+        if sample_by.align_to == "CALENDAR" and not sample_by.time_zone:
+            sample_by = sample_by._replace(time_zone=self.dialect.sample_by_time_zone)
+        return sample_by
+
+    def _designated_timestamp(self, from_clause):
+        engine = getattr(from_clause, "engine", None)
+        if isinstance(engine, QDBTableEngine):
+            return engine.ts_col_name
+        if isinstance(from_clause, sqlalchemy.sql.expression.TableClause):
+            return self.dialect.designated_timestamp(from_clause.name)
+        return None
+
+    def post_process_text(self, text):
+        # called by visit_textclause, the TextClause itself must not be
+        # modified as its text is part of the statement cache key
+        return super().post_process_text(remove_public_schema(text))
 
     def limit_clause(self, select, **kw):
         """
@@ -69,3 +174,12 @@ class QDBSQLCompiler(sqlalchemy.sql.compiler.SQLCompiler, abc.ABC):
             text += f"{self.process(offset, **kw)},{self.BIGINT_MAX}"
 
         return text
+
+
+_SAMPLE_BY_MARKER = sqlalchemy.literal_column("SAMPLE BY")
+
+
+def _unlabel(element):
+    while isinstance(element, sqlalchemy.sql.expression.Label):
+        element = element.element
+    return element
@@ -0,0 +1,241 @@
+import base64
+import csv
+import datetime
+import http.client
+import io
+import json
+import os
+import typing
+import urllib.parse
+import uuid
+
+import sqlalchemy
+
+from .common import PartitionBy
+from .table_engine import get_table_name
+from .types import QDBTypeMixin, Symbol
+
+# ===== CSV import =====
+# https://questdb.io/docs/reference/api/rest/#imp---import-data
+
+IMP_HTTP_PORT = 9000
+_TIMESTAMP_PATTERN = "yyyy-MM-ddTHH:mm:ss.SSSUUU"
+_DATE_PATTERN = "yyyy-MM-ddTHH:mm:ss.SSS"  # DATE has millisecond precision
+
+
+class CSVImportError(Exception):
+    pass
+
+
+class ImportResult(typing.NamedTuple):
+    table_name: str
+    rows_imported: int
+    rows_rejected: int
+    column_errors: typing.Dict[str, int]
+
+
+def import_csv(
+    table: sqlalchemy.Table,
+    data,
+    host: str = "127.0.0.1",
+    port: int = IMP_HTTP_PORT,
+    username: typing.Optional[str] = None,
+    password: typing.Optional[str] = None,
+    timestamp_pattern: typing.Optional[str] = None,
+    overwrite: bool = False,
+    chunk_size: int = 1 << 16,
+    timeout: typing.Optional[float] = None,
+) -> ImportResult:
+    """Bulk loads CSV data into QuestDB table ``table`` with the HTTP /imp endpoint.
+
+    The column types, designated timestamp and partitioning are taken from the
+    table and its QDBTableEngine. The request body is sent with chunked transfer
+    encoding while ``data`` is being read, so memory use does not depend on its size.
+
+    :param table: SQLAlchemy table, the target of the import
+    :param data: path to a CSV file (with header), a binary or text file object
+        (with header), or an iterable of rows, tuples in column order or dicts
+    :param timestamp_pattern: pattern of the TIMESTAMP values in a CSV file,
+        QuestDB detects it when not specified
+    :param overwrite: replaces the content of the table when True
+    :param chunk_size: approximate size in bytes of each chunk sent
+    :return: ImportResult, counts of imported and rejected rows
+    """
+    table_name = get_table_name(table)
+    if isinstance(data, (str, os.PathLike)):
+        with open(data, "rb") as file:
+            return import_csv(
+                table,
+                file,
+                host,
+                port,
+                username,
+                password,
+                timestamp_pattern,
+                overwrite,
+                chunk_size,
+                timeout,
+            )
+    date_pattern = None
+    if hasattr(data, "read"):
+        chunks = _file_chunks(data, chunk_size)
+    else:
+        chunks = _row_chunks(table, data, chunk_size)
+        timestamp_pattern, date_pattern = _TIMESTAMP_PATTERN, _DATE_PATTERN
+    params = {
+        "name": table_name,
+        "fmt": "json",
+        "forceHeader": "true",
+        "overwrite": "true" if overwrite else "false",
+        "atomicity": "skipRow",
+    }
+    engine = getattr(table, "engine", None)
+    if engine is not None:
+        if engine.ts_col_name:
+            params["timestamp"] = engine.ts_col_name
+        if engine.partition_by and engine.partition_by != PartitionBy.NONE:
+            params["partitionBy"] = engine.partition_by.name
+    boundary = uuid.uuid4().hex
+    headers = {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+    if username is not None:
+        credentials = f"{username}:{password or ''}".encode()
+        headers["Authorization"] = f"Basic {base64.b64encode(credentials).decode()}"
+    conn = http.client.HTTPConnection(host, port, timeout=timeout)
+    try:
+        conn.request(
+            "POST",
+            f"/imp?{urllib.parse.urlencode(params)}",
+            body=_multipart_body(
+                boundary,
+                table_name,
+                _schema(table, timestamp_pattern, date_pattern),
+                chunks,
+            ),
+            headers=headers,
+            encode_chunked=True,
+        )
+        response = conn.getresponse()
+        body = response.read().decode(errors="replace")
+    finally:
+        conn.close()
+    if response.status != http.client.OK:
+        raise CSVImportError(f"import failed [{response.status}]: {body}")
+    try:
+        result = json.loads(body)
+    except ValueError as json_error:
+        raise CSVImportError(f"import failed: {body}") from json_error
+    if result.get("status") != "OK":
+        raise CSVImportError(f"import failed: {result.get('status', body)}")
+    return ImportResult(
+        table_name,
+        int(result.get("rowsImported", 0)),
+        int(result.get("rowsRejected", 0)),
+        {
+            column["name"]: column.get("errors", 0)
+            for column in result.get("columns", ())
+            if column.get("errors")
+        },
+    )
+
+
+def _schema(table, timestamp_pattern, date_pattern):
+    schema = []
+    for column in table.columns:
+        if not isinstance(column.type, QDBTypeMixin):
+            raise sqlalchemy.exc.ArgumentError(
+                f"Column '{column.name}' type is not a valid QuestDB type"
+            )
+        # Symbol's compiled form carries CAPACITY/CACHE, /imp only wants the
+        # name, GEOHASH's its column's precision rather than its container's
+        if isinstance(column.type, Symbol):
+            type_name = column.type.__visit_name__
+        else:
+            type_name = column.type.compile()
+        column_schema = {"name": column.name, "type": type_name}
+        if type_name == "TIMESTAMP" and timestamp_pattern:
+            column_schema["pattern"] = timestamp_pattern
+        elif type_name == "DATE" and date_pattern:
+            column_schema["pattern"] = date_pattern
+        schema.append(column_schema)
+    return json.dumps(schema)
+
+
+def _multipart_body(boundary, table_name, schema, chunks):
+    yield (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="schema"\r\n\r\n'
+        f"{schema}\r\n"
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="data"; filename="{table_name}.csv"\r\n'
+        "Content-Type: text/csv\r\n\r\n"
+    ).encode()
+    yield from chunks
+    yield f"\r\n--{boundary}--\r\n".encode()
+
+
+def _file_chunks(file, chunk_size):
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk if isinstance(chunk, bytes) else chunk.encode()
+
+
+def _row_chunks(table, rows, chunk_size):
+    columns = list(table.columns)
+    column_keys = [column.key for column in columns]
+    # dates and datetimes are written in the pattern declared for the column
+    converters = [
+        _CONVERTERS.get(column.type.__visit_name__, _csv_value) for column in columns
+    ]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow([column.name for column in columns])
+    for row in rows:
+        values = [row.get(key) for key in column_keys] if isinstance(row, dict) else row
+        writer.writerow(
+            [converter(value) for converter, value in zip(converters, values)]
+        )
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, datetime.datetime):
+        return _naive_utc(value).isoformat(sep="T", timespec="microseconds")
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return value
+
+
+def _timestamp_value(value):
+    # _TIMESTAMP_PATTERN, dates at midnight
+    if type(value) is datetime.date:
+        value = datetime.datetime.combine(value, datetime.time())
+    return _csv_value(value)
+
+
+def _date_value(value):
+    # _DATE_PATTERN, datetimes truncated to the millisecond
+    if type(value) is datetime.date:
+        value = datetime.datetime.combine(value, datetime.time())
+    if isinstance(value, datetime.datetime):
+        return _naive_utc(value).isoformat(sep="T", timespec="milliseconds")
+    return _csv_value(value)
+
+
+def _naive_utc(value):
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+
+_CONVERTERS = {"TIMESTAMP": _timestamp_value, "DATE": _date_value}
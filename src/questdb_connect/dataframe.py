@@ -0,0 +1,232 @@
+import typing
+
+import sqlalchemy
+
+from . import types
+from .common import PartitionBy
+from .ilp import _encode_long256, _encode_string, _encode_value, _escape_name
+from .table_engine import QDBTableEngine
+
+# ===== pandas DataFrame writer =====
+# Whole columns are encoded into InfluxDB Line Protocol with NumPy, a batch of
+# rows at a time. pandas is an optional dependency.
+
+DEFAULT_BATCH_ROWS = 100_000
+
+
+def write_dataframe(
+    frame,
+    table_name: str,
+    bind,
+    ts_col_name: typing.Optional[str] = None,
+    partition_by: PartitionBy = PartitionBy.DAY,
+    symbols: typing.Iterable[str] = (),
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+    sender=None,
+) -> int:
+    """Writes pandas.DataFrame ``frame`` to QuestDB table ``table_name`` with ILP.
+
+    A missing table is created from the frame's dtypes, with ``ts_col_name`` as
+    designated timestamp and ``partition_by`` partitioning. Categorical columns
+    and those named in ``symbols`` become SYMBOL columns. An existing table is
+    reflected instead, its column types and designated timestamp drive the
+    encoding. ``ts_col_name`` can also name the frame's index.
+
+    :param bind: Engine or Connection of a questdb dialect
+    :param batch_rows: rows encoded at once, bounds the size of the buffers
+    :param sender: ILPSender used to send the rows, by default one is created
+        with the dialect's ILP settings (see create_engine's ilp_protocol/ilp_port)
+    :return: number of rows written
+    """
+    if ts_col_name is not None and ts_col_name not in frame.columns:
+        if frame.index.name == ts_col_name:
+            frame = frame.reset_index()
+    if isinstance(bind, sqlalchemy.engine.Engine):
+        with bind.begin() as conn:
+            table = _get_or_create_table(
+                conn, frame, table_name, ts_col_name, partition_by, set(symbols)
+            )
+    else:
+        table = _get_or_create_table(
+            bind, frame, table_name, ts_col_name, partition_by, set(symbols)
+        )
+    if sender is not None:
+        _send_frame(sender, frame, table, batch_rows)
+    else:
+        with bind.dialect.create_ilp_sender() as new_sender:
+            _send_frame(new_sender, frame, table, batch_rows)
+    return len(frame)
+
+
+def to_sql_method(pd_table, conn, keys, data_iter):
+    """``DataFrame.to_sql(..., method=to_sql_method)`` callable, see write_dataframe.
+
+    pandas calls it once per ``chunksize`` rows, each call sends its chunk. The
+    table must exist, pandas cannot create QuestDB tables.
+    """
+    import pandas as pd
+
+    frame = pd.DataFrame.from_records(list(data_iter), columns=keys)
+    table = getattr(pd_table, "_questdb_table", None)
+    if table is None:
+        # reflected once per to_sql call, not per chunk
+        table = pd_table._questdb_table = sqlalchemy.Table(
+            pd_table.name, sqlalchemy.MetaData(), autoload_with=conn
+        )
+    with conn.dialect.create_ilp_sender() as sender:
+        _send_frame(sender, frame, table, DEFAULT_BATCH_ROWS)
+    return len(frame)
+
+
+def _get_or_create_table(conn, frame, table_name, ts_col_name, partition_by, symbols):
+    if conn.dialect.has_table(conn, table_name):
+        return sqlalchemy.Table(table_name, sqlalchemy.MetaData(), autoload_with=conn)
+    import pandas as pd
+
+    if ts_col_name is None:
+        partition_by = PartitionBy.NONE
+    table = sqlalchemy.Table(
+        table_name,
+        sqlalchemy.MetaData(),
+        *(
+            sqlalchemy.Column(
+                name, _column_type(pd, frame[name].dtype, name in symbols)
+            )
+            for name in frame.columns
+        ),
+        QDBTableEngine(
+            table_name,
+            ts_col_name,
+            partition_by,
+            is_wal=partition_by != PartitionBy.NONE,
+        ),
+    )
+    table.create(conn)
+    return table
+
+
+def _column_type(pd, dtype, is_symbol):
+    if is_symbol or isinstance(dtype, pd.CategoricalDtype):
+        return types.Symbol
+    if pd.api.types.is_bool_dtype(dtype):
+        return types.Boolean
+    if pd.api.types.is_integer_dtype(dtype):
+        return _INT_TYPES.get(dtype.itemsize, types.Long)
+    if pd.api.types.is_float_dtype(dtype):
+        return _FLOAT_TYPES.get(dtype.itemsize, types.Double)
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return types.Timestamp
+    return types.Varchar
+
+
+_INT_TYPES = {1: types.Byte, 2: types.Short, 4: types.Int}
+_FLOAT_TYPES = {4: types.Float}
+
+
+def _send_frame(sender, frame, table, batch_rows):
+    import numpy as np
+    import pandas as pd
+
+    engine = getattr(table, "engine", None)
+    ts_col_name = engine.ts_col_name if engine is not None else None
+    table_name = _escape_name(engine.name if engine is not None else table.name)
+    symbols, fields, at = [], [], None
+    for name in frame.columns:
+        series = frame[name]
+        column = table.c.get(name)
+        qdb_type = column.type if column is not None else None
+        if name == ts_col_name:
+            at = _epoch_micros(pd, np, series)
+        elif isinstance(qdb_type, types.Symbol) or (
+            qdb_type is None and isinstance(series.dtype, pd.CategoricalDtype)
+        ):
+            symbols.append(_symbol_values(pd, np, name, series))
+        else:
+            fields.append(_field_values(pd, np, name, series, qdb_type))
+    for lo in range(0, len(frame), batch_rows):
+        hi = lo + batch_rows
+        lines = np.full(min(hi, len(frame)) - lo, table_name, dtype=object)
+        for values, present in symbols:
+            _append(lines, values[lo:hi], present[lo:hi])
+        has_field = np.zeros(len(lines), dtype=bool)
+        for values, present in fields:
+            batch_present = present[lo:hi]
+            # the first field is separated from the symbols by a space
+            separators = np.where(has_field, ",", " ").astype(object)
+            _append(lines, separators + values[lo:hi], batch_present)
+            has_field |= batch_present
+        if at is not None:
+            micros, present = at[0][lo:hi], at[1][lo:hi]
+            _append(lines, " " + _to_text(np, micros * 1000), present)
+        lines += "\n"
+        sender.append_lines("".join(lines.tolist()).encode("utf-8"))
+    sender.flush()
+
+
+def _append(lines, values, present):
+    if present.all():
+        lines += values
+    else:
+        lines[present] += values[present]
+
+
+def _to_text(np, values):
+    # faster than ndarray.astype(str), and without its fixed width copy
+    return np.fromiter(map(str, values.tolist()), dtype=object, count=len(values))
+
+
+def _symbol_values(pd, np, name, series):
+    # only the distinct values are escaped, categoricals are already factorized
+    codes, uniques = pd.factorize(series)
+    prefix = f",{_escape_name(str(name))}="
+    encoded = np.array(
+        [prefix + _escape_name(str(value)) for value in uniques] + [""], dtype=object
+    )
+    return encoded[codes], codes >= 0
+
+
+def _field_values(pd, np, name, series, qdb_type):
+    prefix = f"{_escape_name(str(name))}="
+    present = series.notna().to_numpy()
+    dtype = series.dtype
+    if isinstance(qdb_type, types.Boolean) or (
+        qdb_type is None and pd.api.types.is_bool_dtype(dtype)
+    ):
+        values = series.to_numpy(dtype=bool, na_value=False)
+        return np.where(values, prefix + "t", prefix + "f").astype(object), present
+    if isinstance(qdb_type, (types.Byte, types.Short, types.Int, types.Long)) or (
+        qdb_type is None and pd.api.types.is_integer_dtype(dtype)
+    ):
+        values = series.to_numpy(dtype=np.int64, na_value=0)
+        return prefix + _to_text(np, values) + "i", present
+    if isinstance(qdb_type, (types.Float, types.Double)) or (
+        qdb_type is None and pd.api.types.is_float_dtype(dtype)
+    ):
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        text = _to_text(np, values)
+        text[values == np.inf] = "Infinity"
+        text[values == -np.inf] = "-Infinity"
+        return prefix + text, present & ~np.isnan(values)
+    if isinstance(qdb_type, (types.Timestamp, types.Date)) or (
+        qdb_type is None and pd.api.types.is_datetime64_any_dtype(dtype)
+    ):
+        micros, present = _epoch_micros(pd, np, series)
+        return prefix + _to_text(np, micros) + "t", present
+    if isinstance(qdb_type, types.Long256):
+        encode = _encode_long256
+    elif isinstance(qdb_type, types.QDBTypeMixin):
+        encode = _encode_string
+    else:
+        encode = _encode_value
+    values = np.full(len(series), "", dtype=object)
+    values[present] = [prefix + encode(value) for value in series[present]]
+    return values, present
+
+
+def _epoch_micros(pd, np, series):
+    if pd.api.types.is_integer_dtype(series.dtype):
+        # integers are taken as epoch micros, like ILPSender does
+        return series.to_numpy(dtype=np.int64, na_value=0), series.notna().to_numpy()
+    utc = pd.to_datetime(series, utc=True).dt.tz_convert(None)
+    values = utc.to_numpy(dtype="datetime64[us]")
+    return values.view(np.int64), ~np.isnat(values)
@@ -1,12 +1,29 @@
 import abc
+import functools
+import threading
 
 import sqlalchemy
-from sqlalchemy.dialects.postgresql.psycopg2 import PGDialect_psycopg2
+from sqlalchemy.dialects.postgresql.psycopg2 import (
+    EXECUTEMANY_VALUES,
+    PGDialect_psycopg2,
+    PGExecutionContext_psycopg2,
+)
 from sqlalchemy.sql.compiler import GenericTypeCompiler
 
+from .capabilities import ServerCapabilities, detect_capabilities
 from .compilers import QDBDDLCompiler, QDBSQLCompiler
+from .executemany import DEFAULT_PAGE_BYTES, DEFAULT_PAGE_SIZE, execute_values_pages
 from .identifier_preparer import QDBIdentifierPreparer
+from .ilp import ILPSender, insert_key_map
 from .inspector import QDBInspector
+from .metadata_cache import MetadataCache, is_ddl
+from .pool import QDBPool
+from .result_cache import ResultCache
+from .sample_by import (
+    designated_timestamps,
+    fill_values,
+    load_designated_timestamps,
+)
 
 # ===== SQLAlchemy Dialect ======
 # https://docs.sqlalchemy.org/en/14/ apache-superset requires SQLAlchemy 1.4
@@ -19,19 +36,32 @@ def connection_uri(
 
 
 def create_engine(
-    host: str, port: str, username: str, password: str, database: str = "main"
+    host: str,
+    port: str,
+    username: str,
+    password: str,
+    database: str = "main",
+    **kwargs,
 ):
+    """Extra keyword arguments go to sqlalchemy.create_engine, e.g. the
+    QDBPool settings pool_size, max_overflow, pool_timeout and warm_up."""
     return sqlalchemy.create_engine(
         connection_uri(host, port, username, password, database),
         future=True,
         hide_parameters=False,
         implicit_returning=False,
         isolation_level="REPEATABLE READ",
+        **kwargs,
     )
 
 
 def create_superset_engine(
-    host: str, port: str, username: str, password: str, database: str = "main"
+    host: str,
+    port: str,
+    username: str,
+    password: str,
+    database: str = "main",
+    **kwargs,
 ):
     return sqlalchemy.create_engine(
         connection_uri(host, port, username, password, database),
@@ -39,12 +69,43 @@ def create_superset_engine(
         hide_parameters=False,
         implicit_returning=True,
         isolation_level="REPEATABLE READ",
+        **kwargs,
     )
 
 
-class QuestDBDialect(PGDialect_psycopg2, abc.ABC):
+class QDBExecutionContext(PGExecutionContext_psycopg2):
+    def create_server_side_cursor(self):
+        # stream_results/yield_per: QuestDB has no DECLARE CURSOR, the result
+        # set of a SELECT is paged with LIMIT lo, hi in chunks of
+        # max_row_buffer rows, see StreamingCursor for its limits
+        from questdb_connect import StreamingCursor
+
+        cursor = self._dbapi_connection.cursor(cursor_factory=StreamingCursor)
+        cursor.itersize = self.execution_options.get("max_row_buffer", 1000)
+        cursor.tables_name_column = self.dialect.server_capabilities.tables_name_column
+        return cursor
+
+    def post_exec(self):
+        super().post_exec()
+        invalidate_metadata_cache(self)
+
+
+def invalidate_metadata_cache(context):
+    """Drops the cached metadata and designated timestamps after a DDL statement."""
+    if context.isddl or is_ddl(context.statement):
+        # DDL compiled by QDBDDLCompiler names its table, text DDL may not
+        ddl = context.compiled.statement if context.isddl else None
+        table_name = getattr(getattr(ddl, "element", None), "name", None)
+        designated_timestamps.invalidate(context.dialect.server, table_name)
+        if context.dialect.metadata_cache is not None:
+            context.dialect.metadata_cache.invalidate(table_name)
+
+
+class QDBDialectMixin:
+    """QuestDB behaviour shared by the dialects of each driver, comes first
+    in their bases so that it overrides PGDialect's."""
+
     name = "questdb"
-    psycopg2_version = (2, 9)
     default_schema_name = "public"
     statement_compiler = QDBSQLCompiler
     ddl_compiler = QDBDDLCompiler
@@ -52,8 +113,8 @@ class QuestDBDialect(PGDialect_psycopg2, abc.ABC):
     inspector = QDBInspector
     preparer = QDBIdentifierPreparer
     supports_schemas = False
-    supports_statement_cache = False
-    supports_server_side_cursors = False
+    supports_statement_cache = True
+    supports_server_side_cursors = True
     supports_native_boolean = True
     supports_views = False
     supports_empty_insert = False
@@ -66,27 +127,131 @@ class QuestDBDialect(PGDialect_psycopg2, abc.ABC):
     _user_defined_max_identifier_length = 255
     _has_native_hstore = False
     supports_is_distinct_from = False
+    server_capabilities = ServerCapabilities()
 
-    @classmethod
-    def dbapi(cls):
-        import questdb_connect as dbapi
+    def __init__(
+        self,
+        ilp_protocol="tcp",
+        ilp_port=None,
+        result_cache_bytes=None,
+        metadata_cache_ttl=None,
+        sample_by_fill=None,
+        sample_by_time_zone=None,
+        **kwargs,
+    ):
+        """
+        :param ilp_protocol: 'tcp' or 'http', protocol of the ILP sender used to
+            insert into tables with execution option questdb_ilp=True, or with
+            QDBTableEngine(use_ilp=True)
+        :param ilp_port: ILP port, defaults to 9009 for tcp and 9000 for http
+        :param result_cache_bytes: enables the cache of SELECT result sets, shared
+            by all connections and bounded to this many bytes, see ResultCache
+        :param metadata_cache_ttl: enables the cache of table names and columns,
+            which are kept for this many seconds, see MetadataCache
+        :param sample_by_fill: FILL of the SAMPLE BY compiled from time buckets
+            which have none, e.g. Superset's time grains, see SampleByBucket
+        :param sample_by_time_zone: time zone of the calendar alignment of the
+            SAMPLE BY compiled from time buckets which have none
+        """
+        super().__init__(**kwargs)
+        self.ilp_protocol = ilp_protocol
+        self.ilp_port = ilp_port
+        self.result_cache = (
+            ResultCache(result_cache_bytes) if result_cache_bytes else None
+        )
+        self.metadata_cache = (
+            MetadataCache(metadata_cache_ttl) if metadata_cache_ttl else None
+        )
+        self.sample_by_fill = fill_values(sample_by_fill)
+        self.sample_by_time_zone = sample_by_time_zone
+        self.server = None
+        self._ilp_connect_args = {}
+        self._ilp_sender = None
+        self._ilp_lock = threading.Lock()
+
+    def create_connect_args(self, url):
+        self.server = (url.host, url.port, url.database)
+        self._ilp_connect_args = {
+            "host": url.host or "127.0.0.1",
+            "username": url.username,
+            "password": url.password,
+        }
+        return super().create_connect_args(url)
+
+    def initialize(self, connection):
+        super().initialize(connection)
+        self.server_capabilities = self._detect_capabilities(connection.connection)
+        if designated_timestamps.is_stale(self.server):
+            designated_timestamps.update(
+                self.server, self._load_designated_timestamps(connection.connection)
+            )
+
+    def do_executemany(self, cursor, statement, parameters, context=None):
+        sender = self._get_ilp_sender(context)
+        key_map = insert_key_map(context.compiled) if sender is not None else None
+        if key_map is None:
+            return super().do_executemany(cursor, statement, parameters, context)
+        table = context.compiled.statement.table
+        self._run_ilp_send(
+            functools.partial(self._ilp_send, sender, table, parameters, key_map)
+        )
+        return None
 
-        return dbapi
+    def create_ilp_sender(self, **kwargs):
+        """New ILPSender to the engine's host, with the dialect's ILP settings."""
+        return ILPSender(
+            **{
+                "port": self.ilp_port,
+                "protocol": self.ilp_protocol,
+                **self._ilp_connect_args,
+                **kwargs,
+            }
+        )
+
+    def designated_timestamp(self, table_name):
+        """Designated timestamp of a table, None when it has none or is not known
+        yet, as loaded when an engine to the same server first connected."""
+        return designated_timestamps.get(self.server, table_name)
 
     def get_schema_names(self, conn, **kw):
         return ["public"]
 
     def get_table_names(self, conn, schema=None, **kw):
-        return [row.table_name for row in self._exec(conn, "SHOW tables")]
+        if self.metadata_cache is not None:
+            return self.metadata_cache.table_names(lambda: self._show_tables(conn))
+        return self._show_tables(conn)
 
     def has_table(self, conn, table_name, schema=None):
+        if self.metadata_cache is not None:
+            return self.metadata_cache.has_table(
+                table_name, lambda: self._show_tables(conn)
+            )
         return table_name in set(self.get_table_names(conn, schema))
 
+    def search_table_names(self, conn, prefix, limit=None):
+        """Names of the tables starting with ``prefix``, case insensitive, sorted."""
+        if self.metadata_cache is not None:
+            return self.metadata_cache.search(
+                prefix, lambda: self._show_tables(conn), limit
+            )
+        prefix = prefix.lower()
+        matches = sorted(
+            (
+                name
+                for name in self._show_tables(conn)
+                if name.lower().startswith(prefix)
+            ),
+            key=str.lower,
+        )
+        return matches[:limit] if limit is not None else matches
+
     @sqlalchemy.engine.reflection.cache
     def get_columns(self, conn, table_name, schema=None, **kw):
-        return self.inspector.format_table_columns(
-            table_name, self._exec(conn, f"table_columns('{table_name}')")
-        )
+        if self.metadata_cache is not None:
+            return self.metadata_cache.columns(
+                table_name, lambda: self._table_columns(conn, table_name)
+            )
+        return self._table_columns(conn, table_name)
 
     def get_pk_constraint(self, conn, table_name, schema=None, **kw):
         return []
@@ -146,5 +311,134 @@ class QuestDBDialect(PGDialect_psycopg2, abc.ABC):
     def get_isolation_level(self, dbapi_conn):
         return None
 
+    def _ilp_send(self, sender, table, rows, key_map):
+        with self._ilp_lock:
+            sender.insert_rows(table, rows, key_map)
+            sender.flush()
+
+    def _run_ilp_send(self, send):
+        send()
+
+    def _get_ilp_sender(self, context):
+        if context is None or not context.isinsert:
+            return None
+        sender = context.execution_options.get("questdb_ilp")
+        if sender is None:
+            table_engine = getattr(context.compiled.statement.table, "engine", None)
+            sender = getattr(table_engine, "use_ilp", False)
+        if sender is True:
+            if self._ilp_sender is None:
+                with self._ilp_lock:
+                    if self._ilp_sender is None:
+                        self._ilp_sender = self.create_ilp_sender()
+            sender = self._ilp_sender
+        return sender if isinstance(sender, ILPSender) else None
+
+    def _show_tables(self, conn):
+        return [row.table_name for row in self._exec(conn, "SHOW tables")]
+
+    def _table_columns(self, conn, table_name):
+        return self.inspector.format_table_columns(
+            table_name, self._exec(conn, f"table_columns('{table_name}')")
+        )
+
     def _exec(self, conn, sql_query):
         return conn.execute(sqlalchemy.text(sql_query))
+
+    def _detect_capabilities(self, dbapi_conn):
+        return detect_capabilities(dbapi_conn)
+
+    def _load_designated_timestamps(self, dbapi_conn):
+        return load_designated_timestamps(dbapi_conn, self.server_capabilities)
+
+
+class QuestDBDialect(QDBDialectMixin, PGDialect_psycopg2, abc.ABC):
+    psycopg2_version = (2, 9)
+    execution_ctx_cls = QDBExecutionContext
+    supports_statement_cache = True
+    poolclass = QDBPool
+
+    def __init__(
+        self,
+        executemany_values_page_size=DEFAULT_PAGE_SIZE,
+        executemany_values_page_bytes=DEFAULT_PAGE_BYTES,
+        **kwargs,
+    ):
+        """
+        :param executemany_values_page_size: maximum number of rows of each
+            multi-row INSERT sent by executemany
+        :param executemany_values_page_bytes: maximum size of each multi-row
+            INSERT sent by executemany, keep it below the server's maximum
+            query size, pg.recv.buffer.size, see executemany.MAX_QUERY_BYTES
+        """
+        if executemany_values_page_bytes <= 0:
+            raise sqlalchemy.exc.ArgumentError(
+                "executemany_values_page_bytes must be positive"
+            )
+        super().__init__(
+            executemany_values_page_size=executemany_values_page_size, **kwargs
+        )
+        self.executemany_values_page_bytes = executemany_values_page_bytes
+
+    @classmethod
+    def dbapi(cls):
+        import questdb_connect as dbapi
+
+        return dbapi
+
+    @classmethod
+    def engine_created(cls, engine):
+        if isinstance(engine.pool, QDBPool):
+            engine.pool.warm_up()
+
+    def on_connect(self):
+        on_connect = super().on_connect()
+        if self.result_cache is None:
+            return on_connect
+
+        def set_result_cache(dbapi_conn):
+            from questdb_connect import CachingCursor
+
+            if on_connect is not None:
+                on_connect(dbapi_conn)
+            dbapi_conn.result_cache = self.result_cache
+            dbapi_conn.cursor_factory = CachingCursor
+
+        return set_result_cache
+
+    def do_executemany(self, cursor, statement, parameters, context=None):
+        template = self._values_template(statement, context)
+        if template is None or self._get_ilp_sender(context) is not None:
+            return super().do_executemany(cursor, statement, parameters, context)
+        execute_values_pages(
+            cursor,
+            statement,
+            template,
+            parameters,
+            self.executemany_values_page_size,
+            self.executemany_values_page_bytes,
+        )
+        return None
+
+    def _values_template(self, statement, context):
+        # the VALUES row of an INSERT which can be sent as multi-row pages, as
+        # with psycopg2's execute_values, which pages by row count only
+        if (
+            not self.executemany_mode & EXECUTEMANY_VALUES
+            or context is None
+            or not context.isinsert
+            or context.compiled.returning
+            or not context.compiled._is_safe_for_fast_insert_values_helper
+        ):
+            return None
+        template = f"({context.compiled.insert_single_values_expr})"
+        return template if template in statement else None
+
+    def _detect_capabilities(self, dbapi_conn):
+        # plain cursor, the connection's may be a CachingCursor
+        return detect_capabilities(dbapi_conn, self.dbapi.Cursor)
+
+    def _load_designated_timestamps(self, dbapi_conn):
+        return load_designated_timestamps(
+            dbapi_conn, self.server_capabilities, self.dbapi.Cursor
+        )
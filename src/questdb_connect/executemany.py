@@ -0,0 +1,57 @@
+import psycopg2.extensions
+
+from questdb_connect.common import remove_public_schema
+
+# ===== executemany, multi-row VALUES pages =====
+# An INSERT executed with a list of rows goes out as INSERT ... VALUES (..),(..)
+# statements, each one a page of rows. Pages are closed by row count and by
+# size: QuestDB rejects a query larger than its pg wire receive buffer,
+# pg.recv.buffer.size, 1 MiB by default.
+
+MAX_QUERY_BYTES = 1024 * 1024
+DEFAULT_PAGE_BYTES = MAX_QUERY_BYTES // 2
+DEFAULT_PAGE_SIZE = 10_000
+
+
+def execute_values_pages(
+    cursor,
+    statement,
+    template,
+    parameters,
+    page_size=DEFAULT_PAGE_SIZE,
+    page_bytes=DEFAULT_PAGE_BYTES,
+):
+    """Executes ``statement`` for all ``parameters`` in multi-row pages.
+
+    :param cursor: psycopg2 cursor
+    :param statement: INSERT statement containing ``template`` once, as its
+        VALUES, the public schema is removed here, once for all pages
+    :param template: row of placeholders, e.g. ``(%(x)s, %(ts)s)``
+    :param parameters: sequence of rows, dicts or tuples matching ``template``
+    :param page_size: maximum number of rows per page
+    :param page_bytes: maximum size of a page's statement, a row larger than
+        this on its own is still sent, in a page of one row
+    :return: number of statements executed
+    """
+    prefix, _, suffix = remove_public_schema(statement).partition(template)
+    encoding = psycopg2.extensions.encodings[cursor.connection.encoding]
+    prefix = prefix.replace("%%", "%").encode(encoding)
+    suffix = suffix.replace("%%", "%").encode(encoding)
+    budget = page_bytes - len(prefix) - len(suffix)
+    mogrify = cursor.mogrify
+    rows = []
+    size = 0
+    pages = 0
+    for params in parameters:
+        row = mogrify(template, params)
+        if rows and (len(rows) == page_size or size + len(row) > budget):
+            cursor.execute(prefix + b",".join(rows) + suffix)
+            pages += 1
+            rows = []
+            size = 0
+        rows.append(row)
+        size += len(row) + 1  # separator
+    if rows:
+        cursor.execute(prefix + b",".join(rows) + suffix)
+        pages += 1
+    return pages
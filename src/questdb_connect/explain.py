@@ -0,0 +1,149 @@
+import datetime
+import re
+import typing
+
+# ===== EXPLAIN =====
+# What a query reads, from the plan QuestDB returns for EXPLAIN: which tables
+# are scanned whole, which only over intervals of their designated timestamp,
+# which symbol indexes are used, and how many partitions that amounts to.
+
+
+class TableScan(typing.NamedTuple):
+    """Scan of a table in a query plan.
+
+    ``intervals`` are the (lo, hi) bounds, inclusive, of an interval scan of
+    the designated timestamp, None for a full scan, and empty when the bounds
+    are only known at execution time, e.g. computed from now().
+    ``partitions`` and ``total_partitions`` are None until counted.
+    """
+
+    table_name: str
+    intervals: typing.Optional[typing.Tuple[typing.Tuple[str, str], ...]]
+    partitions: typing.Optional[int] = None
+    total_partitions: typing.Optional[int] = None
+
+    @property
+    def is_full_scan(self) -> bool:
+        return self.intervals is None
+
+
+class PlanSummary(typing.NamedTuple):
+    scans: typing.Tuple[TableScan, ...]
+    index_columns: typing.Tuple[str, ...]
+
+    @property
+    def full_scans(self) -> typing.Tuple[TableScan, ...]:
+        return tuple(scan for scan in self.scans if scan.is_full_scan)
+
+    def describe(self) -> typing.Dict[str, str]:
+        """Human readable summary, e.g. for Superset's cost estimate."""
+        description = {}
+        for scan in self.scans:
+            if scan.is_full_scan:
+                text = "full scan"
+            elif scan.intervals:
+                text = "interval scan " + ", ".join(
+                    f"[{lo}, {hi}]" for lo, hi in scan.intervals
+                )
+            else:
+                text = "interval scan, bounds known at execution"
+            if scan.partitions is not None:
+                text += f", {scan.partitions} of {scan.total_partitions} partitions"
+            key = f"Table {scan.table_name}"
+            description[key] = (
+                f"{description[key]}; {text}" if key in description else text
+            )
+        if self.index_columns:
+            description["Symbol indexes"] = ", ".join(self.index_columns)
+        if self.full_scans:
+            description["Warning"] = "full scan of " + ", ".join(
+                sorted({scan.table_name for scan in self.full_scans})
+            )
+        return description
+
+
+def parse_plan(lines: typing.Iterable[str]) -> PlanSummary:
+    """Table scans and symbol indexes of the rows returned by EXPLAIN."""
+    scans = []
+    index_columns = []
+    for line in lines:
+        match = _TABLE_SCAN.search(line)
+        if match is not None:
+            intervals = None if match.group("kind") == "Frame" else ()
+            scans.append(TableScan(match.group("table"), intervals))
+            continue
+        match = _INTERVALS.search(line)
+        if match is not None and scans and scans[-1].intervals == ():
+            # dynamic intervals, e.g. of now() or bind variables, stay unknown
+            if "dynamic" not in match.group("intervals"):
+                scans[-1] = scans[-1]._replace(
+                    intervals=tuple(_INTERVAL.findall(match.group("intervals")))
+                )
+            continue
+        match = _INDEX_SCAN.search(line)
+        if match is not None and match.group("column") not in index_columns:
+            index_columns.append(match.group("column"))
+    return PlanSummary(tuple(scans), tuple(index_columns))
+
+
+def explain(cursor, statement: str, count_partitions: bool = True) -> PlanSummary:
+    """Runs EXPLAIN ``statement`` and summarizes its plan.
+
+    :param cursor: DBAPI cursor
+    :param statement: query, a single statement
+    :param count_partitions: also count the partitions each scan reads, out of
+        the table's, one table_partitions() query per table
+    """
+    cursor.execute("EXPLAIN " + statement.strip().rstrip(";"))
+    summary = parse_plan(row[0] for row in cursor.fetchall())
+    if not count_partitions or not summary.scans:
+        return summary
+    partitions = {}
+    scans = []
+    for scan in summary.scans:
+        if scan.table_name not in partitions:
+            cursor.execute(
+                "SELECT minTimestamp, maxTimestamp FROM table_partitions(%s)",
+                (scan.table_name,),
+            )
+            partitions[scan.table_name] = cursor.fetchall()
+        scans.append(_count_partitions(scan, partitions[scan.table_name]))
+    return summary._replace(scans=tuple(scans))
+
+
+def _count_partitions(scan, partitions):
+    if scan.intervals is None:
+        count = len(partitions)
+    elif not scan.intervals:
+        return scan._replace(total_partitions=len(partitions))
+    else:
+        intervals = [(_timestamp(lo), _timestamp(hi)) for lo, hi in scan.intervals]
+        if any(lo is None or hi is None for lo, hi in intervals):
+            return scan._replace(total_partitions=len(partitions))
+        count = sum(
+            1
+            for min_ts, max_ts in partitions
+            if min_ts is None
+            or any(lo <= max_ts and min_ts <= hi for lo, hi in intervals)
+        )
+    return scan._replace(partitions=count, total_partitions=len(partitions))
+
+
+def _timestamp(text):
+    # plans print timestamps as 2023-04-12T23:55:59.342380Z, in UTC, and open
+    # bounds as MIN and MAX, results come as naive datetimes
+    if text in _OPEN_BOUNDS:
+        return _OPEN_BOUNDS[text]
+    try:
+        return datetime.datetime.strptime(text, "%Y-%m-%dT%H:%M:%S.%fZ")
+    except ValueError:
+        return None
+
+
+_OPEN_BOUNDS = {"MIN": datetime.datetime.min, "MAX": datetime.datetime.max}
+_TABLE_SCAN = re.compile(
+    r"\b(?P<kind>Interval|Frame) (?:forward|backward) scan on: (?P<table>\S+)"
+)
+_INTERVALS = re.compile(r"^\s*intervals: (?P<intervals>.*)$")
+_INTERVAL = re.compile(r'\("([^"]+)","([^"]+)"\)')
+_INDEX_SCAN = re.compile(r"\bIndex (?:forward|backward) scan on: (?P<column>\w+)")
@@ -0,0 +1,319 @@
+import base64
+import datetime
+import http.client
+import math
+import socket
+import typing
+import weakref
+
+import sqlalchemy
+
+from . import types
+from .table_engine import get_table_name
+
+# ===== InfluxDB Line Protocol =====
+# https://questdb.io/docs/reference/api/ilp/overview/
+
+ILP_TCP_PORT = 9009
+ILP_HTTP_PORT = 9000
+
+
+class ILPError(Exception):
+    pass
+
+
+class ILPSender:
+    """Writes rows to QuestDB with the InfluxDB Line Protocol, over TCP or HTTP.
+
+    Rows are encoded into a single reusable buffer, which is sent and cleared by
+    ``flush``, or automatically once it grows past ``auto_flush_bytes``.
+
+    Example usage:
+        with ILPSender("localhost", protocol="http") as sender:
+            sender.insert_rows(table, [{"source": "NODE0", "ts": now}, ...])
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: typing.Optional[int] = None,
+        protocol: str = "tcp",
+        auto_flush_bytes: int = 1 << 20,
+        username: typing.Optional[str] = None,
+        password: typing.Optional[str] = None,
+        timeout: typing.Optional[float] = None,
+    ):
+        if protocol not in ("tcp", "http"):
+            raise sqlalchemy.exc.ArgumentError(
+                f"ILP protocol must be 'tcp' or 'http', not '{protocol}'"
+            )
+        self.host = host
+        self.port = port or (ILP_TCP_PORT if protocol == "tcp" else ILP_HTTP_PORT)
+        self.protocol = protocol
+        self.auto_flush_bytes = auto_flush_bytes
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self._buffer = bytearray()
+        # column encoders of each table, dropped with the table
+        self._encoders = weakref.WeakKeyDictionary()
+        self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        try:
+            self.flush()
+        finally:
+            self.close()
+
+    def row(
+        self,
+        table_name: str,
+        symbols: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        columns: typing.Optional[typing.Dict[str, typing.Any]] = None,
+        at: typing.Optional[typing.Any] = None,
+    ):
+        """Appends one row, column values are encoded after their Python type."""
+        line = [_escape_name(table_name)]
+        if symbols:
+            line.extend(
+                f",{_escape_name(name)}={_escape_name(str(value))}"
+                for name, value in symbols.items()
+                if value is not None
+            )
+        fields = [
+            f"{_escape_name(name)}={_encode_value(value)}"
+            for name, value in (columns or {}).items()
+            if value is not None
+        ]
+        self._append_line(line, fields, at)
+
+    def insert_rows(self, table: sqlalchemy.Table, rows, key_map=None):
+        """Appends rows, given as dicts keyed by column key, to QuestDB table ``table``.
+
+        The type of each column drives its encoding: Symbol columns are sent as
+        ILP symbols, the designated timestamp (taken from the table's
+        QDBTableEngine) as the row's timestamp, and the rest as typed fields.
+        ``key_map`` optionally maps the rows' keys to the table's column keys.
+        """
+        table_name = _escape_name(get_table_name(table))
+        encoders = self._encoders.get(table)
+        if encoders is None:
+            encoders = self._encoders[table] = {}
+        for row in rows:
+            line = [table_name]
+            fields = []
+            at = None
+            for key, value in row.items():
+                if value is None:
+                    continue
+                encoder = encoders.get(key)
+                if encoder is None:
+                    encoder = encoders[key] = _column_encoder(
+                        table, key_map[key] if key_map else key
+                    )
+                kind, name, encode = encoder
+                if kind is _FIELD:
+                    fields.append(f"{name}={encode(value)}")
+                elif kind is _SYMBOL:
+                    line.append(f",{name}={encode(value)}")
+                else:
+                    at = value
+            self._append_line(line, fields, at)
+
+    def append_lines(self, lines: bytes):
+        """Appends already encoded ILP lines, each one ending with a newline."""
+        self._buffer += lines
+        if len(self._buffer) >= self.auto_flush_bytes:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        if self.protocol == "tcp":
+            self._tcp_send()
+        else:
+            self._http_send()
+        del self._buffer[:]  # keeps the allocation
+
+    def close(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            finally:
+                self._conn = None
+
+    def _append_line(self, line, fields, at):
+        if fields:
+            line.append(" ")
+            line.append(",".join(fields))
+        if at is not None:
+            line.append(f" {_timestamp_micros(at) * 1000}")
+        line.append("\n")
+        self.append_lines("".join(line).encode("utf-8"))
+
+    def _tcp_send(self):
+        if self._conn is None:
+            self._conn = socket.create_connection(
+                (self.host, self.port), timeout=self.timeout
+            )
+            self._conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            self._conn.sendall(self._buffer)
+        except OSError:
+            self.close()
+            raise
+
+    def _http_send(self):
+        if self._conn is None:
+            self._conn = http.client.HTTPConnection(
+                self.host, self.port, timeout=self.timeout
+            )
+        headers = {"Content-Type": "text/plain; charset=utf-8"}
+        if self.username is not None:
+            credentials = f"{self.username}:{self.password or ''}".encode()
+            headers["Authorization"] = f"Basic {base64.b64encode(credentials).decode()}"
+        try:
+            self._conn.request(
+                "POST", "/write", body=bytes(self._buffer), headers=headers
+            )
+            response = self._conn.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            raise
+        if response.status not in (http.client.OK, http.client.NO_CONTENT):
+            raise ILPError(
+                f"ILP write failed [{response.status}]: {body.decode(errors='replace')}"
+            )
+
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_EPOCH_TZ = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+_ONE_MICRO = datetime.timedelta(microseconds=1)
+_NAME_ESCAPES = str.maketrans(
+    {" ": "\\ ", ",": "\\,", "=": "\\=", "\n": "\\\n", "\r": "\\\r", "\\": "\\\\"}
+)
+_STRING_ESCAPES = str.maketrans({'"': '\\"', "\\": "\\\\", "\n": "\\\n", "\r": "\\\r"})
+_FIELD, _SYMBOL, _TIMESTAMP = "field", "symbol", "timestamp"
+
+
+def _escape_name(name):
+    return name.translate(_NAME_ESCAPES)
+
+
+def _timestamp_micros(value):
+    if isinstance(value, int):
+        return value
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None:
+            return (value - _EPOCH) // _ONE_MICRO
+        return (value - _EPOCH_TZ) // _ONE_MICRO
+    if isinstance(value, datetime.date):
+        return (
+            datetime.datetime.combine(value, datetime.time()) - _EPOCH
+        ) // _ONE_MICRO
+    raise ILPError(f"cannot encode {value!r} as a timestamp")
+
+
+def _encode_bool(value):
+    return "t" if value else "f"
+
+
+def _encode_int(value):
+    return f"{int(value)}i"
+
+
+def _encode_float(value):
+    value = float(value)
+    if math.isfinite(value):
+        return repr(value)
+    if math.isnan(value):
+        return "NaN"
+    return "Infinity" if value > 0 else "-Infinity"
+
+
+def _encode_string(value):
+    return f'"{str(value).translate(_STRING_ESCAPES)}"'
+
+
+def _encode_symbol(value):
+    return _escape_name(str(value))
+
+
+def _encode_timestamp(value):
+    return f"{_timestamp_micros(value)}t"
+
+
+def _encode_long256(value):
+    if isinstance(value, int):
+        return f"{value:#x}i"
+    return f"{value}i"
+
+
+def _encode_value(value):
+    if isinstance(value, bool):
+        return _encode_bool(value)
+    if isinstance(value, int):
+        return _encode_int(value)
+    if isinstance(value, float):
+        return _encode_float(value)
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return _encode_timestamp(value)
+    return _encode_string(value)
+
+
+_TYPE_ENCODERS = (
+    (types.Boolean, _encode_bool),
+    ((types.Byte, types.Short, types.Int, types.Long), _encode_int),
+    ((types.Float, types.Double), _encode_float),
+    ((types.Timestamp, types.Date), _encode_timestamp),
+    (types.Long256, _encode_long256),
+)
+
+
+def _column_encoder(table, key):
+    column = table.c.get(key)
+    if column is None:
+        raise ILPError(f"table '{table.name}' has no column '{key}'")
+    engine = getattr(table, "engine", None)
+    if engine is not None and engine.ts_col_name == column.name:
+        return _TIMESTAMP, None, None
+    name = _escape_name(column.name)
+    if isinstance(column.type, types.Symbol):
+        return _SYMBOL, name, _encode_symbol
+    for type_classes, encode in _TYPE_ENCODERS:
+        if isinstance(column.type, type_classes):
+            return _FIELD, name, encode
+    if isinstance(column.type, types.QDBNativeTypeMixin):
+        to_text = column.type.to_text
+        return _FIELD, name, lambda value: _encode_string(to_text(value))
+    if isinstance(column.type, types.QDBTypeMixin):
+        return _FIELD, name, _encode_string
+    return _FIELD, name, _encode_value
+
+
+def insert_key_map(compiled):
+    """Maps the parameter keys of an executemany INSERT to the table's column keys.
+
+    Returns None when the statement cannot be sent with ILP, which is the case
+    for anything but a plain ``insert(table)`` fed with parameter sets.
+    """
+    statement = compiled.statement
+    if (
+        getattr(statement, "_values", None)
+        or getattr(statement, "_multi_values", None)
+        or getattr(statement, "select", None) is not None
+        or compiled.returning
+    ):
+        return None
+    table = statement.table
+    escaped_names = getattr(compiled, "escaped_bind_names", None) or {}
+    key_map = {}
+    for bind, name in compiled.bind_names.items():
+        if bind.key not in table.c:
+            return None
+        key_map[escaped_names.get(name, name)] = bind.key
+    return key_map
@@ -5,7 +5,7 @@ import sqlalchemy
 
 from .common import PartitionBy
 from .table_engine import QDBTableEngine
-from .types import resolve_type_from_name
+from .types import type_from_name
 
 
 class QDBInspector(sqlalchemy.engine.reflection.Inspector, abc.ABC):
@@ -22,6 +22,17 @@ class QDBInspector(sqlalchemy.engine.reflection.Inspector, abc.ABC):
             table, include_columns, exclude_columns, resolve_fks, _extend_on
         )
 
+    def get_table_names(self, schema=None, **kw):
+        # MetaData.reflect() lists the tables, then reflects them one at a time
+        # with inspectors sharing this info_cache: the list lets reflect_table
+        # load their columns ahead, in batches
+        table_names = super().get_table_names(schema, **kw)
+        self.info_cache[_BULK_TABLE_NAMES] = {
+            table_name: idx for idx, table_name in enumerate(table_names)
+        }
+        self.info_cache[_BULK_TABLES] = table_names
+        return table_names
+
     def reflect_table(
         self,
         table,
@@ -32,24 +43,21 @@ class QDBInspector(sqlalchemy.engine.reflection.Inspector, abc.ABC):
         _reflect_info=None,
     ):
         table_name = table.name
-        try:
-            result_set = self.bind.execute(
-                sqlalchemy.text(
-                    "SELECT designatedTimestamp, partitionBy, walEnabled FROM tables() WHERE table_name = :tn"
-                ),
-                {"tn": table_name},
-            )
-        except psycopg2.DatabaseError:
-            # older version
-            result_set = self.bind.execute(
-                sqlalchemy.text(
-                    "SELECT designatedTimestamp, partitionBy, walEnabled FROM tables() WHERE name = :tn"
+        entry = None
+        if _extend_on is not None:
+            # only MetaData.reflect() passes _extend_on
+            entry = self._bulk_catalog_entry(table_name)
+        if entry is not None:
+            table_attrs, columns = entry
+        else:
+            table_attrs = self._table_attributes(table_name)
+            columns = self.bind.execute(
+                _literal_text(
+                    f"SELECT {self.dialect.server_capabilities.table_columns_select}(:tn)",
+                    "tn",
                 ),
                 {"tn": table_name},
             )
-        if not result_set:
-            self._panic_table(table_name)
-        table_attrs = result_set.first()
         if table_attrs:
             col_ts_name = table_attrs[0]
             partition_by = PartitionBy[table_attrs[1]]
@@ -59,12 +67,7 @@ class QDBInspector(sqlalchemy.engine.reflection.Inspector, abc.ABC):
             partition_by = PartitionBy.NONE
             is_wal = True
         dedup_upsert_keys = []
-        for row in self.bind.execute(
-            sqlalchemy.text(
-                'SELECT "column", "type", "upsertKey" FROM table_columns(:tn)'
-            ),
-            {"tn": table_name},
-        ):
+        for row in columns:
             col_name = row[0]
             if include_columns and col_name not in include_columns:
                 continue
@@ -72,7 +75,7 @@ class QDBInspector(sqlalchemy.engine.reflection.Inspector, abc.ABC):
                 continue
             if row[2]:  # upsertKey
                 dedup_upsert_keys.append(col_name)
-            col_type = resolve_type_from_name(row[1])
+            col_type = type_from_name(row[1])
             table.append_column(
                 sqlalchemy.Column(
                     col_name,
@@ -91,28 +94,148 @@ class QDBInspector(sqlalchemy.engine.reflection.Inspector, abc.ABC):
         )
         table.metadata = sqlalchemy.MetaData()
 
-    def get_columns(self, table_name, schema=None, **kw):
-        result_set = self.bind.execute(
-            sqlalchemy.text('SELECT "column", "type" FROM table_columns(:tn)'),
+    def _table_attributes(self, table_name, conn=None):
+        capabilities = self.dialect.server_capabilities
+        result_set = (conn or self.bind).execute(
+            sqlalchemy.text(
+                f"SELECT {capabilities.table_attributes_select} "
+                f"WHERE {capabilities.tables_name_column} = :tn"
+            ),
             {"tn": table_name},
         )
-        return self.format_table_columns(table_name, result_set)
+        if not result_set:
+            self._panic_table(table_name)
+        return result_set.first()
+
+    def _bulk_catalog_entry(self, table_name):
+        """(attributes, columns) of a table listed by MetaData.reflect(), None
+        when it is to be loaded on its own.
+
+        The columns of the tables which follow it in the listing are loaded
+        with it, as long as the tables are reflected in listing order, in
+        batches of 1, 2, 4... up to _BULK_COLUMNS_TABLES tables: a reflect()
+        of all the tables takes a few queries, one of ``only`` some of them
+        loads little more than those.
+        """
+        positions = self.info_cache.get(_BULK_TABLE_NAMES)
+        if not positions or table_name not in positions:
+            return None
+        catalog = self.info_cache.setdefault(_BULK_CATALOG, {})
+        if table_name not in catalog:
+            pos = positions[table_name]
+            batch = 1
+            if pos == self.info_cache.get(_BULK_NEXT):
+                batch = self.info_cache.get(_BULK_BATCH, 1)
+            table_names = [
+                name
+                for name in self.info_cache[_BULK_TABLES][pos : pos + batch]
+                if name not in catalog
+            ]
+            loaded = self._load_catalog(table_names)
+            catalog.update(loaded)
+            self.info_cache[_BULK_NEXT] = pos + batch
+            self.info_cache[_BULK_BATCH] = (
+                min(batch * 2, _BULK_COLUMNS_TABLES) if loaded else 1
+            )
+        return catalog.get(table_name)
+
+    def _load_catalog(self, table_names):
+        """Designated timestamp, partitioning, WAL flag and columns of tables.
+
+        Takes one tables() query for all the tables, once per info_cache, plus
+        one query made of the UNION ALL of the tables' table_columns(), instead
+        of two queries per table. Empty when the latter fails, e.g. for a table
+        dropped since it was listed, the tables are then loaded one at a time.
+        """
+        capabilities = self.dialect.server_capabilities
+        table_attrs = self.info_cache.get(_BULK_ATTRIBUTES)
+        if table_attrs is None:
+            result_set = self.bind.execute(
+                sqlalchemy.text(
+                    f"SELECT {capabilities.tables_name_column}, "
+                    f"{capabilities.table_attributes_select}"
+                )
+            )
+            table_attrs = {row[0]: row[1:] for row in result_set}
+            self.info_cache[_BULK_ATTRIBUTES] = table_attrs
+        params = {f"tn{idx}": table_name for idx, table_name in enumerate(table_names)}
+        union = " UNION ALL ".join(
+            f"SELECT :{param} table_name, {capabilities.table_columns_select}(:{param})"
+            for param in params
+        )
+        columns = {table_name: [] for table_name in table_names}
+        try:
+            for row in self.bind.execute(_literal_text(union, *params), params):
+                columns[row[0]].append(row[1:])
+        except _QUERY_ERRORS:
+            return {}
+        return {
+            table_name: (table_attrs.get(table_name), columns[table_name])
+            for table_name in table_names
+        }
 
     def get_schema_names(self):
         return ["public"]
 
-    def format_table_columns(self, table_name, result_set):
+    def get_latest_partition(self, table_name):
+        """Designated timestamp and lowest timestamp of the newest partition.
+
+        The timestamp is None for tables which are not partitioned, and both
+        are None for tables without designated timestamp. Two small catalog
+        queries, tables() and table_partitions(), whatever the table's size.
+        """
+        with self._operation_context() as conn:
+            table_attrs = self._table_attributes(table_name, conn)
+            if not table_attrs or not table_attrs[0]:
+                return None, None
+            if PartitionBy[table_attrs[1]] == PartitionBy.NONE:
+                return table_attrs[0], None
+            lower_bound = conn.execute(
+                _literal_text(
+                    "SELECT max(minTimestamp) FROM table_partitions(:tn)", "tn"
+                ),
+                {"tn": table_name},
+            ).scalar()
+        return table_attrs[0], lower_bound
+
+    # static, the dialect formats the columns of get_columns without an inspector
+    @staticmethod
+    def format_table_columns(table_name, result_set):
         if not result_set:
-            self._panic_table(table_name)
+            QDBInspector._panic_table(table_name)
         return [
             {
                 "name": row[0],
-                "type": resolve_type_from_name(row[1])(),
+                "type": type_from_name(row[1]),
                 "nullable": True,
                 "autoincrement": False,
             }
             for row in result_set
         ]
 
-    def _panic_table(self, table_name):
+    @staticmethod
+    def _panic_table(table_name):
         raise sqlalchemy.orm.exc.NoResultFound(f"Table '{table_name}' does not exist")
+
+
+def _literal_text(sql, *names):
+    # table names are rendered as literals when the statement is executed:
+    # drivers binding on the server side (asyncpg) leave untyped parameters
+    return sqlalchemy.text(sql).bindparams(
+        *(
+            sqlalchemy.bindparam(name, type_=sqlalchemy.String, literal_execute=True)
+            for name in names
+        )
+    )
+
+
+# the questdb dialect's dbapi.Error is not psycopg2's, whose errors are not
+# wrapped in DBAPIError as the asyncpg dialect's are
+_QUERY_ERRORS = (sqlalchemy.exc.DBAPIError, psycopg2.Error)
+_BULK_COLUMNS_TABLES = 256
+_BULK_TABLE_NAMES = "questdb_bulk_table_names"  # name: position in the listing
+_BULK_TABLES = "questdb_bulk_tables"
+_BULK_ATTRIBUTES = "questdb_bulk_attributes"
+_BULK_CATALOG = "questdb_bulk_catalog"
+_BULK_NEXT = "questdb_bulk_next"  # position following the last batch
+_BULK_BATCH = "questdb_bulk_batch"  # size of the next batch
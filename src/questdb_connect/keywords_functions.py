@@ -1,28 +1,196 @@
-def get_keywords_list(conn=None):
-    return __initialize_list(
-        conn, "SELECT keyword FROM keywords()", __keywords, __default_keywords
-    )
+import json
+import os
+import re
+import threading
+import time
+import typing
+import weakref
 
+import psycopg2
 
-def get_functions_list(conn=None):
-    return __initialize_list(
-        conn, "SELECT name FROM functions()", __func_names, __default_func_names
-    )
+# ===== Keywords and function names =====
+# Loaded from each server the first time they are needed, and kept per server
+# (host, port and build), optionally on disk across processes.
+
+_KEYWORDS = "keywords"
+_FUNCTIONS = "functions"
+_QUERIES = {
+    _KEYWORDS: "SELECT keyword FROM keywords()",
+    _FUNCTIONS: "SELECT name FROM functions()",
+}
+
+
+class ServerNames(typing.NamedTuple):
+    names: typing.Tuple[str, ...]  # server order
+    name_set: typing.FrozenSet[str]
+    lower_name_set: typing.FrozenSet[str]  # names are case-insensitive in SQL
+
+
+class KeywordRegistry:
+    """Keywords and function names of each QuestDB server, loaded on first use.
+
+    Set ``cache_dir`` to keep them in one JSON file per server and build, read
+    back by later processes for a cold start without loading them again. Files older than
+    ``max_age`` seconds are loaded again from the server.
+
+    Without a connection, or for ``retry_after`` seconds after they failed to
+    load from a server, the built-in defaults are returned.
+    """
+
+    def __init__(
+        self,
+        cache_dir: typing.Optional[str] = None,
+        max_age: float = 86400,
+        retry_after: float = 60,
+    ):
+        self.cache_dir = cache_dir
+        self.max_age = max_age
+        self.retry_after = retry_after
+        self._entries = {}
+        self._failures = {}  # server key: time.monotonic() of the next attempt
+        self._lock = threading.Lock()
+
+    def keywords(self, conn=None) -> typing.FrozenSet[str]:
+        return self.get(_KEYWORDS, conn).name_set
+
+    def functions(self, conn=None) -> typing.FrozenSet[str]:
+        return self.get(_FUNCTIONS, conn).name_set
+
+    def is_keyword(self, word: str, conn=None) -> bool:
+        return word.lower() in self.get(_KEYWORDS, conn).lower_name_set
+
+    def is_function(self, name: str, conn=None) -> bool:
+        return name.lower() in self.get(_FUNCTIONS, conn).lower_name_set
+
+    def get(self, kind: str, conn=None) -> ServerNames:
+        if conn is None or conn.closed:
+            return _DEFAULTS[kind]
+        key = server_key(conn)
+        entries = self._entries.get(key)
+        if entries is None:
+            if self._failures.get(key, 0) > time.monotonic():
+                return _DEFAULTS[kind]
+            entries = self._read_cache_file(key) or self._load(conn)
+            with self._lock:
+                if entries is None:
+                    self._failures[key] = time.monotonic() + self.retry_after
+                    return _DEFAULTS[kind]
+                self._failures.pop(key, None)
+                self._entries[key] = entries
+        return entries[kind]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._failures.clear()
+
+    def _load(self, conn):
+        entries = {}
+        idle = conn.status == psycopg2.extensions.STATUS_READY
+        try:
+            # plain cursor, the connection's may be a CachingCursor
+            with conn.cursor(cursor_factory=psycopg2.extensions.cursor) as cursor:
+                for kind, sql_stmt in _QUERIES.items():
+                    cursor.execute(sql_stmt)
+                    entries[kind] = _server_names(row[0] for row in cursor.fetchall())
+        except psycopg2.Error:
+            return None
+        finally:
+            if idle:
+                _rollback(conn)
+        self._write_cache_file(server_key(conn), entries)
+        return entries
+
+    def _cache_file(self, key):
+        host, port, build = key
+        name = _UNSAFE_FILE_CHARS.sub("_", f"questdb_{host}_{port}_{build}")
+        return os.path.join(os.path.expanduser(self.cache_dir), f"{name}.json")
 
+    def _read_cache_file(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._cache_file(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age:
+                return None
+            with open(path, encoding="utf-8") as cache_file:
+                content = json.load(cache_file)
+            return {kind: _server_names(content[kind]) for kind in _QUERIES}
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
 
-def __initialize_list(conn, sql_stmt, target_list, default_target_list):
-    if not target_list:
+    def _write_cache_file(self, key, entries):
+        if not self.cache_dir:
+            return
+        path = self._cache_file(key)
+        content = {kind: list(entries[kind].names) for kind in _QUERIES}
         try:
-            with conn.cursor() as functions_cur:
-                functions_cur.execute(sql_stmt)
-                for func_row in functions_cur.fetchall():
-                    target_list.append(func_row[0])
-        except Exception as _ignore:
-            target_list.extend(default_target_list)
-    return target_list
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as cache_file:
+                json.dump(content, cache_file)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+
+
+def server_key(conn):
+    """Identity of the server of a psycopg2 connection, its host, port and
+    QuestDB build, which is queried once per connection."""
+    build = _BUILDS.get(conn)
+    if build is None:
+        build = _BUILDS[conn] = _server_build(conn)
+    return conn.info.host, conn.info.port, build
+
+
+def _server_build(conn):
+    # server_version is the PostgreSQL version QuestDB mimics, it does not
+    # change with QuestDB upgrades
+    idle = conn.status == psycopg2.extensions.STATUS_READY
+    try:
+        with conn.cursor(cursor_factory=psycopg2.extensions.cursor) as cursor:
+            cursor.execute("SELECT build()")
+            build = (cursor.fetchone() or ("",))[0]
+    except psycopg2.Error:
+        build = None  # before build() there was no version to report
+    finally:
+        if idle:
+            _rollback(conn)
+    return build or str(conn.server_version)
+
+
+def _rollback(conn):
+    # leaves the connection as it was found, out of transactions, aborted
+    # ones included
+    try:
+        conn.rollback()
+    except psycopg2.Error:
+        pass
+
+
+def _server_names(names):
+    names = tuple(names)
+    return ServerNames(
+        names, frozenset(names), frozenset(name.lower() for name in names)
+    )
+
+
+_BUILDS = weakref.WeakKeyDictionary()  # psycopg2 connection: build()
+_UNSAFE_FILE_CHARS = re.compile(r"[^\w.-]+")
+
+registry = KeywordRegistry()
+
+
+def get_keywords_list(conn=None):
+    """Keywords of the server of ``conn``, the built-in defaults without one."""
+    return list(registry.get(_KEYWORDS, conn).names)
+
+
+def get_functions_list(conn=None):
+    """Function names of the server of ``conn``, the built-in defaults without one."""
+    return list(registry.get(_FUNCTIONS, conn).names)
 
 
-__func_names = []
 __default_func_names = [
     "abs",
     "acos",
@@ -212,7 +380,6 @@ __default_func_names = [
     "week_of_year",
     "year",
 ]
-__keywords = []
 __default_keywords = [
     "add",
     "all",
@@ -302,3 +469,9 @@ __default_keywords = [
     "with",
     "writer",
 ]
+
+
+_DEFAULTS = {
+    _KEYWORDS: _server_names(__default_keywords),
+    _FUNCTIONS: _server_names(__default_func_names),
+}
@@ -0,0 +1,85 @@
+import bisect
+import re
+import threading
+import time
+import typing
+
+# ===== Schema metadata cache =====
+# Table names and columns, shared by all the connections of an engine.
+
+
+class MetadataCache:
+    """Table names and columns of a QuestDB server, each kept for ``ttl`` seconds.
+
+    The table names are indexed three ways: in server order for
+    get_table_names, as a set for has_table, and sorted by lower case name for
+    prefix searches. Enabled with create_engine's ``metadata_cache_ttl``, and
+    invalidated by the dialect after each DDL statement.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._table_names = None
+        self._table_set = frozenset()
+        self._prefix_index = []
+        self._table_names_expiry = 0.0
+        self._columns = {}
+
+    def table_names(self, load: typing.Callable[[], typing.List[str]]):
+        return list(self._get_table_names(load))
+
+    def has_table(self, table_name: str, load) -> bool:
+        self._get_table_names(load)
+        return table_name in self._table_set
+
+    def search(self, prefix: str, load, limit: typing.Optional[int] = None):
+        """Table names starting with ``prefix``, case insensitive, sorted."""
+        self._get_table_names(load)
+        index = self._prefix_index
+        prefix = prefix.lower()
+        matches = []
+        pos = bisect.bisect_left(index, (prefix,))
+        while pos < len(index) and index[pos][0].startswith(prefix):
+            matches.append(index[pos][1])
+            if limit is not None and len(matches) >= limit:
+                break
+            pos += 1
+        return matches
+
+    def columns(self, table_name: str, load: typing.Callable[[], typing.List[dict]]):
+        entry = self._columns.get(table_name)
+        if entry is None or entry[0] < time.monotonic():
+            entry = (time.monotonic() + self.ttl, load())
+            with self._lock:
+                self._columns[table_name] = entry
+        # callers are free to modify the column dicts they get
+        return [dict(column) for column in entry[1]]
+
+    def invalidate(self, table_name: typing.Optional[str] = None):
+        with self._lock:
+            self._table_names = None
+            if table_name is None:
+                self._columns.clear()
+            else:
+                self._columns.pop(table_name, None)
+
+    def _get_table_names(self, load):
+        table_names = self._table_names
+        if table_names is None or self._table_names_expiry < time.monotonic():
+            table_names = tuple(load())
+            with self._lock:
+                self._table_set = frozenset(table_names)
+                self._prefix_index = sorted(
+                    (table_name.lower(), table_name) for table_name in table_names
+                )
+                self._table_names = table_names
+                self._table_names_expiry = time.monotonic() + self.ttl
+        return table_names
+
+
+def is_ddl(statement: str) -> bool:
+    return isinstance(statement, str) and _DDL_STATEMENT.match(statement) is not None
+
+
+_DDL_STATEMENT = re.compile(r"\s*(CREATE|DROP|ALTER|RENAME|TRUNCATE)\b", re.IGNORECASE)
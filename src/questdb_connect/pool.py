@@ -0,0 +1,163 @@
+import select
+import threading
+import time
+import typing
+
+import sqlalchemy
+
+# ===== Connection pool =====
+# QuestDB serves the PG wire protocol with a small pool of workers, bursts of
+# new connections are expensive: connections are opened ahead of time, checked
+# for liveness without a query and their checkouts capped and measured.
+
+
+class PoolMetrics(typing.NamedTuple):
+    checkouts: int
+    checkout_time: float  # seconds, total
+    max_checkout_time: float
+    waits: int  # checkouts which found the pool exhausted
+    wait_time: float  # seconds, total
+    in_use: int
+    max_in_use: int
+    liveness_failures: int
+
+
+class QDBPool(sqlalchemy.pool.QueuePool):
+    """QueuePool with warm up, liveness checks and metrics.
+
+    Concurrent checkouts are capped at ``pool_size + max_overflow``, beyond
+    that they wait for up to ``pool_timeout`` seconds. ``warm_up`` connections
+    are opened when the engine is created. Pooled connections are checked for
+    liveness on checkout by polling their socket: an idle connection has nothing
+    to read unless the server closed it, no query is sent. The dialect's default
+    pool, its arguments can be passed to create_engine.
+    """
+
+    def __init__(self, creator, warm_up=0, liveness_check=True, **kw):
+        super().__init__(creator, **kw)
+        self.warm_up_size = warm_up
+        self.liveness_check = liveness_check
+        self._metrics_lock = threading.Lock()
+        self.reset_metrics()
+
+    def recreate(self):
+        self.logger.info("Pool recreating")
+        return self.__class__(
+            self._creator,
+            warm_up=self.warm_up_size,
+            liveness_check=self.liveness_check,
+            pool_size=self._pool.maxsize,
+            max_overflow=self._max_overflow,
+            pre_ping=self._pre_ping,
+            use_lifo=self._pool.use_lifo,
+            timeout=self._timeout,
+            recycle=self._recycle,
+            echo=self.echo,
+            logging_name=self._orig_logging_name,
+            reset_on_return=self._reset_on_return,
+            _dispatch=self.dispatch,
+            dialect=self._dialect,
+        )
+
+    def warm_up(self, size: typing.Optional[int] = None):
+        """Opens connections until ``size`` (default ``warm_up``) are pooled."""
+        size = self.warm_up_size if size is None else size
+        size = min(size, self.size() + max(self._max_overflow, 0))
+        connections = []
+        try:
+            while self.checkedin() + len(connections) < size:
+                connections.append(super().connect())
+        finally:
+            for connection in connections:
+                connection.close()
+
+    def connect(self):
+        start = time.perf_counter()
+        connection = super().connect()
+        elapsed = time.perf_counter() - start
+        in_use = self.checkedout()
+        with self._metrics_lock:
+            self._checkouts += 1
+            self._checkout_time += elapsed
+            self._max_checkout_time = max(self._max_checkout_time, elapsed)
+            self._max_in_use = max(self._max_in_use, in_use)
+        return connection
+
+    def metrics(self) -> PoolMetrics:
+        with self._metrics_lock:
+            return PoolMetrics(
+                self._checkouts,
+                self._checkout_time,
+                self._max_checkout_time,
+                self._waits,
+                self._wait_time,
+                self.checkedout(),
+                self._max_in_use,
+                self._liveness_failures,
+            )
+
+    def reset_metrics(self):
+        with self._metrics_lock:
+            self._checkouts = 0
+            self._checkout_time = 0.0
+            self._max_checkout_time = 0.0
+            self._waits = 0
+            self._wait_time = 0.0
+            self._max_in_use = 0
+            self._liveness_failures = 0
+
+    def _do_get(self):
+        exhausted = (
+            self._max_overflow > -1
+            and self._overflow >= self._max_overflow
+            and self._pool.empty()
+        )
+        start = time.perf_counter()
+        record = super()._do_get()
+        if exhausted:
+            elapsed = time.perf_counter() - start
+            with self._metrics_lock:
+                self._waits += 1
+                self._wait_time += elapsed
+        dbapi_conn = record.dbapi_connection
+        if self.liveness_check and dbapi_conn is not None and not is_alive(dbapi_conn):
+            with self._metrics_lock:
+                self._liveness_failures += 1
+            # reconnects on checkout
+            record.invalidate()
+        return record
+
+
+def is_alive(dbapi_conn) -> bool:
+    """Whether an idle psycopg2 connection is usable, without a round trip."""
+    if dbapi_conn.closed:
+        return False
+    try:
+        ready = _readable(dbapi_conn.fileno())
+    except (OSError, ValueError):
+        # the socket could not be probed, which does not make it dead, the
+        # next query would tell
+        return True
+    # an idle connection with data to read was closed by the server (EOF),
+    # or got an error message before being closed
+    return not ready
+
+
+def _readable(fd) -> bool:
+    # poll has no limit on fd numbers, select.select rejects those >= 1024
+    # (FD_SETSIZE), which processes with many open files reach
+    if _POLL is not None:
+        poller = _POLL()
+        poller.register(fd, _POLL_EVENTS)
+        return bool(poller.poll(0))
+    readable, _, _ = select.select([fd], [], [], 0)
+    return bool(readable)
+
+
+_POLL = getattr(select, "poll", None)  # not on Windows, where select has no fd limit
+_POLL_EVENTS = (
+    getattr(select, "POLLIN", 0)
+    | getattr(select, "POLLPRI", 0)
+    | getattr(select, "POLLERR", 0)
+    | getattr(select, "POLLHUP", 0)
+)
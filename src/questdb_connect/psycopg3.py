@@ -0,0 +1,68 @@
+import psycopg
+
+from questdb_connect.common import remove_public_schema
+
+# ===== DBAPI, psycopg 3 backend =====
+# Same connect(), Cursor and public schema semantics as questdb_connect, on
+# psycopg 3 (pip install "psycopg[binary]"): results come in binary format,
+# numbers and timestamps are not parsed from text, and batches of statements
+# are sent in pipeline mode, without waiting for each result.
+# https://www.psycopg.org/psycopg3/docs/advanced/pipeline.html
+
+apilevel = "2.0"
+threadsafety = 2
+paramstyle = "pyformat"
+
+Error = psycopg.Error
+
+
+class Cursor(psycopg.Cursor):
+    def __init__(self, connection, **kwargs):
+        super().__init__(connection, **kwargs)
+        if getattr(connection, "binary", False):
+            self.format = psycopg.pq.Format.BINARY
+
+    def execute(self, query, params=None, **kwargs):
+        """Execute query with bound params."""
+        return super().execute(remove_public_schema(query), params, **kwargs)
+
+    def executemany(self, query, params_seq, **kwargs):
+        """Execute query once per set of params, pipelined."""
+        return super().executemany(remove_public_schema(query), params_seq, **kwargs)
+
+    def stream(self, query, params=None, **kwargs):
+        """Iterate over the rows of query as they arrive, in libpq's single row
+        mode: the result set is never held in memory as a whole."""
+        return super().stream(remove_public_schema(query), params, **kwargs)
+
+
+class Connection(psycopg.Connection):
+    binary = False  # result format of new cursors
+
+    def execute_batch(self, statements):
+        """Runs (query, params) pairs in one pipeline, then waits for all results.
+
+        Statements go out back to back instead of one round trip each, their
+        results are discarded. Raises on the first failed statement.
+        """
+        with self.pipeline(), self.cursor() as cursor:
+            for query, params in statements:
+                cursor.execute(query, params)
+
+
+def connect(binary: bool = True, **kwargs):
+    """New psycopg 3 connection to QuestDB.
+
+    :param binary: binary result format, set to False for text format as with
+        psycopg2, e.g. for types the server cannot send in binary
+    """
+    conn = Connection.connect(
+        host=kwargs.get("host") or "127.0.0.1",
+        port=kwargs.get("port") or 8812,
+        user=kwargs.get("user") or "admin",
+        password=kwargs.get("password") or "quest",
+        dbname=kwargs.get("database") or "main",
+        cursor_factory=Cursor,
+    )
+    conn.binary = binary
+    return conn
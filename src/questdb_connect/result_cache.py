@@ -0,0 +1,142 @@
+import collections
+import re
+import sys
+import threading
+import typing
+
+# ===== Result cache =====
+# SELECT result sets kept in memory and invalidated when the WAL sequencer (or
+# writer) txn of any of the tables they read advances, see wal_tables():
+# https://questdb.io/docs/reference/function/meta/#wal_tables
+
+DEFAULT_RESULT_CACHE_BYTES = 64 << 20
+_MAX_UNCACHEABLE = 1024
+
+
+class CachedResult(typing.NamedTuple):
+    description: typing.Any
+    rows: typing.List[tuple]
+    table_txns: typing.Dict[str, typing.Tuple[int, int]]
+    nbytes: int
+
+
+class ResultCache:
+    """LRU cache of SELECT result sets, bounded by their approximate size in bytes.
+
+    Entries are keyed by query text and parameters. An entry is only valid while
+    the (writer, sequencer) txns of each table it read are the ones seen when it
+    was filled: the sequencer txn advances on commit, the writer txn once the
+    commit is applied and visible. Queries reading non WAL tables, or no table
+    at all, are never cached.
+    Shared by all the connections of an engine, see create_engine's
+    ``result_cache_bytes``.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_RESULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()
+        self._uncacheable = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(
+        self, key, wal_txns: typing.Dict[str, typing.Tuple[int, int]]
+    ) -> typing.Optional[CachedResult]:
+        """Cached result for ``key``, None if missing or stale given ``wal_txns``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if all(
+                    wal_txns.get(table) == txn
+                    for table, txn in entry.table_txns.items()
+                ):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry
+                self._remove(key)
+                self.invalidations += 1
+            self.misses += 1
+            return None
+
+    def is_cacheable(self, key) -> bool:
+        return key not in self._uncacheable
+
+    def set_uncacheable(self, key):
+        """Remembers a query which does not read WAL tables only, to skip lookups."""
+        with self._lock:
+            self._uncacheable[key] = None
+            if len(self._uncacheable) > _MAX_UNCACHEABLE:
+                self._uncacheable.popitem(last=False)
+
+    def put(
+        self,
+        key,
+        description,
+        rows,
+        table_txns: typing.Dict[str, typing.Tuple[int, int]],
+    ):
+        nbytes = _result_size(rows)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = CachedResult(description, rows, table_txns, nbytes)
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._uncacheable.clear()
+            self.nbytes = 0
+
+    def _remove(self, key):
+        self.nbytes -= self._entries.pop(key).nbytes
+
+
+def cache_key(query, vars):
+    """Hashable key for a query and its parameters, None if they are not hashable."""
+    if isinstance(vars, dict):
+        params = tuple(sorted(vars.items()))
+    elif vars is not None:
+        params = tuple(vars)
+    else:
+        params = None
+    key = (query, params)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def referenced_tables(query, table_names) -> typing.Set[str]:
+    """Names in ``table_names`` (lower case) which appear in ``query``."""
+    words = {
+        (quoted or single_quoted or word).lower()
+        for quoted, single_quoted, word in _NAME_TOKENS.findall(query)
+    }
+    return words.intersection(table_names)
+
+
+# identifiers, and table names in double or single quotes
+_NAME_TOKENS = re.compile(r""""([^"]+)"|'([^']+)'|([A-Za-z_][\w$]*)""")
+
+
+def _result_size(rows):
+    nbytes = sys.getsizeof(rows)
+    for row in rows:
+        nbytes += sys.getsizeof(row)
+        for value in row:
+            nbytes += sys.getsizeof(value)
+    return nbytes
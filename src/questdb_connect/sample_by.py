@@ -0,0 +1,264 @@
+import datetime
+import re
+import threading
+import time
+import typing
+
+import sqlalchemy
+from sqlalchemy.sql.base import _generative
+from sqlalchemy.sql.visitors import InternalTraversal
+
+# ===== SAMPLE BY =====
+# QuestDB aggregates time buckets of a table's designated timestamp with
+# SAMPLE BY, on its time ordered, vectorized path. GROUP BY of an expression of
+# the timestamp, e.g. DATE_TRUNC, is a generic hash aggregation instead.
+
+DESIGNATED_TIMESTAMPS_TTL = 60.0
+
+
+class SampleBy(typing.NamedTuple):
+    """SAMPLE BY clause: bucket ``interval``, FILL values and alignment.
+
+    :param interval: bucket size, a number followed by its unit, one of U
+        (microseconds), T (milliseconds), s, m, h, d, M (months) or y
+    :param fill: FILL values, one for all the aggregates or one per aggregate,
+        each of NONE, NULL, PREV, LINEAR or a number
+    :param align_to: 'CALENDAR' or 'FIRST OBSERVATION'
+    :param time_zone: time zone of the calendar alignment, e.g. 'Europe/Berlin'
+    :param offset: offset of the calendar alignment, e.g. '00:15'
+    :param from_: first bucket, inclusive, with ALIGN TO CALENDAR only
+    :param to: bucket bound, exclusive, with ALIGN TO CALENDAR only
+    """
+
+    interval: str
+    fill: typing.Tuple[typing.Union[str, int, float], ...] = ()
+    align_to: str = "CALENDAR"
+    time_zone: typing.Optional[str] = None
+    offset: typing.Optional[str] = None
+    from_: typing.Optional[str] = None
+    to: typing.Optional[str] = None
+
+    @classmethod
+    def create(
+        cls,
+        interval,
+        fill=None,
+        align_to="CALENDAR",
+        time_zone=None,
+        offset=None,
+        from_=None,
+        to=None,
+    ):
+        """Validated SampleBy, ``fill`` may also be a single value, ``from_``
+        and ``to`` strings, dates or datetimes, naive ones in UTC."""
+        if not isinstance(interval, str) or not _INTERVAL.match(interval):
+            raise sqlalchemy.exc.ArgumentError(
+                f"Invalid SAMPLE BY interval: {interval!r}"
+            )
+        fill = fill_values(fill)
+        align_to = " ".join(str(align_to).upper().split())
+        if align_to not in _ALIGNMENTS:
+            raise sqlalchemy.exc.ArgumentError(
+                f"Invalid SAMPLE BY alignment: {align_to!r}"
+            )
+        if align_to != "CALENDAR" and (time_zone or offset):
+            raise sqlalchemy.exc.ArgumentError(
+                "SAMPLE BY time zone and offset require ALIGN TO CALENDAR"
+            )
+        from_, to = _bound(from_), _bound(to)
+        if align_to != "CALENDAR" and (from_ or to):
+            raise sqlalchemy.exc.ArgumentError(
+                "SAMPLE BY FROM and TO require ALIGN TO CALENDAR"
+            )
+        return cls(
+            interval, fill, align_to, time_zone or None, offset or None, from_, to
+        )
+
+    def clause(self) -> str:
+        text = f"SAMPLE BY {self.interval}"
+        if self.from_:
+            text += f" FROM {_string_literal(self.from_)}"
+        if self.to:
+            text += f" TO {_string_literal(self.to)}"
+        if self.fill:
+            text += f" FILL({', '.join(map(str, self.fill))})"
+        text += f" ALIGN TO {self.align_to}"
+        if self.time_zone:
+            text += f" TIME ZONE {_string_literal(self.time_zone)}"
+        if self.offset:
+            text += f" WITH OFFSET {_string_literal(self.offset)}"
+        return text
+
+
+class SampleByBucket:
+    """Mixin of the column expressions which bucket a timestamp column, e.g.
+    DATE_TRUNC, that SAMPLE BY can replace.
+
+    In a SELECT with such a bucket in its GROUP BY, QDBSQLCompiler renders the
+    GROUP BY as SAMPLE BY ``sample_by``, and the bucket as the bare column,
+    when ``col`` is the designated timestamp of the only table of the SELECT,
+    there is no HAVING and all the other GROUP BY columns are selected, as
+    they are SAMPLE BY's keys. Otherwise the bucket is rendered as it is.
+
+    Whether ``col`` is a designated timestamp is known from
+    :data:`designated_timestamps` at compile time, not from the statement, so
+    the statements with a bucket are not cached by SQLAlchemy.
+    """
+
+    col: sqlalchemy.sql.ColumnElement
+    sample_by: SampleBy
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.inherit_cache = False
+
+
+class QDBSelect(sqlalchemy.sql.Select):
+    """SELECT which QDBSQLCompiler renders with a SAMPLE BY clause, see
+    :meth:`sample_by`, created with :func:`select`.
+
+    The SAMPLE BY buckets the designated timestamp of the only table of the
+    SELECT, its selected columns which are not aggregates are the keys. It
+    takes the place of GROUP BY, a SELECT cannot have both, nor HAVING.
+    """
+
+    _sample_by = None
+    _traverse_internals: typing.ClassVar[list] = [
+        *sqlalchemy.sql.Select._traverse_internals,
+        ("_sample_by", InternalTraversal.dp_plain_obj),
+    ]
+
+    @_generative
+    def sample_by(
+        self,
+        interval,
+        fill=None,
+        align_to="CALENDAR",
+        time_zone=None,
+        offset=None,
+        from_=None,
+        to=None,
+    ):
+        """Aggregates buckets of ``interval`` of the designated timestamp, e.g.
+        ``select(t.c.ts, func.avg(t.c.price)).sample_by("1m", fill="PREV")``.
+
+        The arguments are those of :meth:`SampleBy.create`, ``fill`` and
+        ``time_zone`` default to the dialect's ``sample_by_fill`` and
+        ``sample_by_time_zone``. None removes the SAMPLE BY.
+        """
+        self._sample_by = (
+            None
+            if interval is None
+            else SampleBy.create(interval, fill, align_to, time_zone, offset, from_, to)
+        )
+
+
+def select(*entities) -> QDBSelect:
+    """sqlalchemy.select, 2.0 style, of which the result also has
+    :meth:`QDBSelect.sample_by`, for Core and for ORM entities."""
+    return QDBSelect._create_future_select(*entities)
+
+
+class DesignatedTimestamps:
+    """Designated timestamp column of each table, per server, kept ``ttl`` seconds.
+
+    Shared by the engines of a process, as short lived as they may be, so that
+    statements can be compiled to SAMPLE BY before their engine connects. The
+    dialect loads the tables of a server when it first connects, if they are
+    not known or are older than ``ttl``, and forgets them after DDL.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._servers = {}
+
+    def get(self, server, table_name: str) -> typing.Optional[str]:
+        entry = self._servers.get(server)
+        if entry is None or table_name is None:
+            return None
+        return entry[1].get(table_name.lower())
+
+    def is_stale(self, server) -> bool:
+        entry = self._servers.get(server)
+        return entry is None or entry[0] < time.monotonic()
+
+    def update(
+        self, server, rows: typing.Iterable[typing.Tuple[str, typing.Optional[str]]]
+    ):
+        """Replaces the tables of ``server`` with (table name, timestamp) rows."""
+        tables = {
+            table_name.lower(): ts_col_name or None for table_name, ts_col_name in rows
+        }
+        with self._lock:
+            self._servers[server] = (time.monotonic() + self.ttl, tables)
+
+    def invalidate(self, server, table_name: typing.Optional[str] = None):
+        with self._lock:
+            if table_name is None:
+                self._servers.pop(server, None)
+            elif server in self._servers:
+                self._servers[server][1].pop(table_name.lower(), None)
+
+
+designated_timestamps = DesignatedTimestamps(DESIGNATED_TIMESTAMPS_TTL)
+
+
+def load_designated_timestamps(dbapi_conn, capabilities, cursor_factory=None):
+    """(table name, designated timestamp) of all the tables, one tables() query."""
+    if cursor_factory is not None:
+        cursor = dbapi_conn.cursor(cursor_factory=cursor_factory)
+    else:
+        cursor = dbapi_conn.cursor()
+    try:
+        cursor.execute(
+            f"SELECT {capabilities.tables_name_column}, "
+            f"{capabilities.table_attributes_select}"
+        )
+        return [(row[0], row[1]) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+
+
+def fill_values(fill) -> typing.Tuple[typing.Union[str, int, float], ...]:
+    """Validated FILL values, from None, a single value or a sequence of them."""
+    if fill is None:
+        return ()
+    if isinstance(fill, (str, int, float)):
+        fill = (fill,)
+    return tuple(_fill_value(value) for value in fill)
+
+
+def _fill_value(value):
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        raise sqlalchemy.exc.ArgumentError(f"Invalid SAMPLE BY FILL value: {value!r}")
+    if isinstance(value, str):
+        value = value.strip().upper()
+        if value not in _FILL_KEYWORDS:
+            raise sqlalchemy.exc.ArgumentError(
+                f"Invalid SAMPLE BY FILL value: {value!r}"
+            )
+    return value
+
+
+def _bound(value):
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return value.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    if isinstance(value, str):
+        return value
+    raise sqlalchemy.exc.ArgumentError(f"Invalid SAMPLE BY bound: {value!r}")
+
+
+def _string_literal(value: str) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+_INTERVAL = re.compile(r"^[1-9][0-9]*[UTsmhdMy]$")
+_FILL_KEYWORDS = frozenset(("NONE", "NULL", "PREV", "LINEAR"))
+_ALIGNMENTS = frozenset(("CALENDAR", "FIRST OBSERVATION"))
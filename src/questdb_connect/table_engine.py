@@ -15,6 +15,7 @@ class QDBTableEngine(
         partition_by: PartitionBy = PartitionBy.DAY,
         is_wal: bool = True,
         dedup_upsert_keys: typing.Optional[typing.Tuple[str]] = None,
+        use_ilp: bool = False,
     ):
         sqlalchemy.sql.visitors.Traversible.__init__(self)
         self.name = table_name
@@ -22,6 +23,7 @@ class QDBTableEngine(
         self.partition_by = partition_by
         self.is_wal = is_wal
         self.dedup_upsert_keys = dedup_upsert_keys
+        self.use_ilp = use_ilp  # executemany inserts are sent with ILP
         self.compiled = None
 
     def get_table_suffix(self):
@@ -61,3 +63,9 @@ class QDBTableEngine(
 
     def _set_parent(self, parent, **_kwargs):
         parent.engine = self
+
+
+def get_table_name(table: sqlalchemy.Table) -> str:
+    """QuestDB name of a table, its QDBTableEngine's name takes precedence."""
+    engine = getattr(table, "engine", None)
+    return engine.name if engine is not None and engine.name else table.name
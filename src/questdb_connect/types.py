@@ -1,3 +1,7 @@
+import abc
+import ipaddress
+import re
+import uuid
 from typing import Optional
 
 import sqlalchemy
@@ -8,10 +12,6 @@ _GEOHASH_BYTE_MAX = 8
 _GEOHASH_SHORT_MAX = 16
 _GEOHASH_INT_MAX = 32
 _GEOHASH_LONG_BITS = 60
-_TYPE_CACHE = {
-    # key:   '__visit_name__' of the implementor of QDBTypeMixin
-    # value: implementor class itself
-}
 
 
 def geohash_type_name(bits):
@@ -47,6 +47,14 @@ class QDBTypeMixin(sqlalchemy.types.TypeDecorator):
     impl = sqlalchemy.types.String
     cache_ok = True
 
+    def __init_subclass__(cls, **kwargs):
+        # SQLAlchemy reads ``cache_ok`` from the class' own __dict__, it is not
+        # inherited, without it every statement holding a QuestDB type would
+        # skip the compiled statement cache
+        super().__init_subclass__(**kwargs)
+        if "cache_ok" not in cls.__dict__:
+            cls.cache_ok = True
+
     @classmethod
     def matches_type_name(cls, type_name):
         return cls if type_name == cls.__visit_name__ else None
@@ -58,6 +66,49 @@ class QDBTypeMixin(sqlalchemy.types.TypeDecorator):
         return self.__visit_name__
 
 
+class _QDBNativeTypeMeta(abc.ABCMeta, type(sqlalchemy.types.TypeDecorator)):
+    # TypeDecorator has its own metaclass, abstract methods need both
+    pass
+
+
+class QDBNativeTypeMixin(QDBTypeMixin, metaclass=_QDBNativeTypeMeta):
+    """Type sent and received as text, which has a native Python value.
+
+    Parameters can be native values or text. Results are text, as sent by the
+    server, or native values with ``native=True``. to_native_many/to_text_many
+    convert whole arrays.
+    """
+
+    def __init__(self, native: bool = False, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.native = native
+
+    @abc.abstractmethod
+    def to_text(self, value):
+        """Text of a not None native value, or text."""
+
+    @abc.abstractmethod
+    def to_native(self, value):
+        """Native value of a not None text, or native value."""
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else self.to_text(value)
+
+    def process_result_value(self, value, dialect):
+        return self.to_native(value) if self.native and value is not None else value
+
+    def process_literal_param(self, value, dialect):
+        return None if value is None else self.to_text(value)
+
+    def to_text_many(self, values):
+        to_text = self.to_text
+        return [None if value is None else to_text(value) for value in values]
+
+    def to_native_many(self, values):
+        to_native = self.to_native
+        return [None if value is None else to_native(value) for value in values]
+
+
 class Boolean(QDBTypeMixin):
     __visit_name__ = "BOOLEAN"
     impl = sqlalchemy.types.Boolean
@@ -129,14 +180,16 @@ class Symbol(QDBTypeMixin):
     Example usage:
         source = Column(Symbol(capacity=128, cache=True))
     """
+
     __visit_name__ = "SYMBOL"
     type_code = 12
 
     def __init__(
-            self,
-            capacity: Optional[int] = None,
-            cache: Optional[bool] = None,
-            *args, **kwargs
+        self,
+        capacity: Optional[int] = None,
+        cache: Optional[bool] = None,
+        *args,
+        **kwargs,
     ):
         super().__init__(*args, **kwargs)
         self.capacity = capacity
@@ -158,50 +211,145 @@ class Symbol(QDBTypeMixin):
         return f"{quote_identifier(column_name)} {self.compile()}"
 
 
-class Long256(QDBTypeMixin):
+class Long256(QDBNativeTypeMixin):
+    """LONG256, native values are int, text is 0x prefixed hex."""
+
     __visit_name__ = "LONG256"
     type_code = 13
 
+    def to_text(self, value):
+        return _hex_text(value)
 
-class GeohashByte(QDBTypeMixin):
+    def to_native(self, value):
+        return _hex_int(value)
+
+
+class GeohashMixin(QDBNativeTypeMixin):
+    """GEOHASH, native values are the int of the geohash's bits.
+
+    Char precisions are text as base32 chars, bit precisions as ``##`` and
+    binary digits. ``bits`` is the column's precision, by default the largest
+    one of the type, e.g. GeohashInt(bits=25) for a GEOHASH(5c) column, as
+    given by type_from_name.
+    """
+
+    bits = 0
+
+    def __init__(
+        self, native: bool = False, bits: Optional[int] = None, *args, **kwargs
+    ):
+        super().__init__(native, *args, **kwargs)
+        if bits is not None:
+            self.bits = bits
+
+    def to_text(self, value):
+        if isinstance(value, str):
+            return value
+        if self.bits % 5:
+            return f"##{value:0{self.bits}b}"
+        return _geohash_chars(value, self.bits // 5)
+
+    def to_native(self, value):
+        if not isinstance(value, str):
+            return value
+        if value.startswith("##"):
+            return int(value[2:], 2)
+        return _geohash_int(value)
+
+    def compile(self, dialect=None):
+        if self.bits % 5:
+            return f"GEOHASH({self.bits}b)"
+        return f"GEOHASH({self.bits // 5}c)"
+
+    def column_spec(self, column_name):
+        return f"{quote_identifier(column_name)} {self.compile()}"
+
+
+class GeohashByte(GeohashMixin):
     __visit_name__ = geohash_type_name(8)
     type_code = 14
+    bits = 8
 
 
-class GeohashShort(QDBTypeMixin):
+class GeohashShort(GeohashMixin):
     __visit_name__ = geohash_type_name(16)
     type_code = 15
+    bits = 15
 
 
-class GeohashInt(QDBTypeMixin):
+class GeohashInt(GeohashMixin):
     __visit_name__ = geohash_type_name(32)
     type_code = 16
+    bits = 30
 
 
-class GeohashLong(QDBTypeMixin):
+class GeohashLong(GeohashMixin):
     __visit_name__ = geohash_type_name(60)
     type_code = 17
+    bits = 60
+
 
+class UUID(QDBNativeTypeMixin):
+    """UUID, native values are uuid.UUID."""
 
-class UUID(QDBTypeMixin):
     __visit_name__ = "UUID"
     type_code = 19
 
+    def to_text(self, value):
+        return str(value)
+
+    def to_native(self, value):
+        return _uuid(value)
+
+
+class Long128(QDBNativeTypeMixin):
+    """LONG128, native values are int, text is 0x prefixed hex."""
 
-class Long128(QDBTypeMixin):
     __visit_name__ = "LONG128"
     type_code = 24
 
+    def to_text(self, value):
+        return _hex_text(value)
+
+    def to_native(self, value):
+        return _hex_int(value)
+
+
+class IPv4(QDBNativeTypeMixin):
+    """IPV4, native values are ipaddress.IPv4Address, ints are accepted too."""
 
-class IPv4(QDBTypeMixin):
     __visit_name__ = "IPV4"
     type_code = 26
 
+    def to_text(self, value):
+        return _ipv4_text(value)
+
+    def to_native(self, value):
+        return ipaddress.IPv4Address(value)
+
+
 class Varchar(QDBTypeMixin):
     __visit_name__ = "VARCHAR"
     type_code = 27
 
 
+class DoubleArray(QDBTypeMixin):
+    """DOUBLE[], DOUBLE[][] and so on, values are (nested) lists of floats."""
+
+    __visit_name__ = "DOUBLE[]"
+    impl = sqlalchemy.types.ARRAY
+
+    def __init__(self, dimensions: int = 1, *args, **kwargs):
+        super().__init__(sqlalchemy.types.Float, *args, dimensions=dimensions, **kwargs)
+        self.dimensions = dimensions
+
+    def compile(self, dialect=None):
+        return "DOUBLE" + "[]" * self.dimensions
+
+    def column_spec(self, column_name):
+        return f"{quote_identifier(column_name)} {self.compile()}"
+
+
 QUESTDB_TYPES = [
     Boolean,
     Byte,
@@ -227,25 +375,116 @@ QUESTDB_TYPES = [
 ]
 
 
+def _hex_text(value):
+    return value if isinstance(value, str) else f"{value:#x}"
+
+
+def _hex_int(value):
+    # LONG128 may come in UUID layout, dashes are ignored
+    return int(value.replace("-", ""), 16) if isinstance(value, str) else value
+
+
+def _uuid(value):
+    return value if isinstance(value, uuid.UUID) else uuid.UUID(value)
+
+
+def _ipv4_text(value):
+    return value if isinstance(value, str) else str(ipaddress.IPv4Address(value))
+
+
+def _geohash_chars(value, chars):
+    return "".join(
+        _GEOHASH_BASE32[(value >> shift) & 0x1F]
+        for shift in range(5 * (chars - 1), -1, -5)
+    )
+
+
+def _geohash_int(text):
+    value = 0
+    for char in text:
+        value = (value << 5) | _GEOHASH_BASE32_BITS[char]
+    return value
+
+
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_GEOHASH_BASE32_BITS = {char: bits for bits, char in enumerate(_GEOHASH_BASE32)}
+
+
 def resolve_type_from_name(type_name):
+    """QuestDB type class of a type name, as in table_columns(), case insensitive.
+
+    Parametric names resolve too: GEOHASH(<n>b) and GEOHASH(<n>c) to the class
+    of their precision, SYMBOL with CAPACITY/CACHE options to Symbol, and
+    DOUBLE[]... arrays to DoubleArray. Unknown names resolve to None.
+    """
     if not type_name:
         return None
-    type_class = _TYPE_CACHE.get(type_name)
-    if not type_class:
-        for candidate_class in QUESTDB_TYPES:
-            type_class = candidate_class.matches_type_name(type_name)
-            if type_class:
-                _TYPE_CACHE[type_name] = type_class
-                break
-            elif (
-                "GEOHASH" in type_name.upper() and "(" in type_name and ")" in type_name
-            ):
-                open_p = type_name.index("(")
-                close_p = type_name.index(")")
-                description = type_name[open_p + 1 : close_p]
-                g_size = int(description[:-1])
-                if description[-1] in ("C", "c"):
-                    g_size *= 5
-                type_class = geohash_class(g_size)
-                break
+    try:
+        return _TYPE_REGISTRY[type_name]
+    except KeyError:
+        pass
+    type_class = _resolve_type_name(" ".join(type_name.split()).upper())
+    if len(_TYPE_REGISTRY) < _TYPE_REGISTRY_MAX_SIZE:
+        _TYPE_REGISTRY[type_name] = type_class
     return type_class
+
+
+def type_from_name(type_name):
+    """Type of a column from its type name, as in table_columns().
+
+    Like resolve_type_from_name, but an instance: GEOHASH types carry the
+    column's precision, e.g. GeohashShort(bits=12) for GEOHASH(12b), and arrays
+    their dimensions. Unknown names, e.g. of types newer than this package,
+    are NullType, with a warning.
+    """
+    type_class = resolve_type_from_name(type_name)
+    if type_class is None:
+        sqlalchemy.util.warn(f"Did not recognize QuestDB type '{type_name}'")
+        return sqlalchemy.types.NullType()
+    if type_class is DoubleArray:
+        return DoubleArray(type_name.count("["))
+    if issubclass(type_class, GeohashMixin):
+        match = _GEOHASH_NAME.match(" ".join(type_name.split()).upper())
+        if match:
+            bits = int(match.group(1)) * (5 if match.group(2) == "C" else 1)
+            return type_class(bits=bits)
+    return type_class()
+
+
+def _resolve_type_name(name):
+    type_class = _TYPE_REGISTRY.get(name)
+    if type_class is not None:
+        return type_class
+    if name.startswith("SYMBOL "):
+        return Symbol
+    if name.endswith("[]") and name.rstrip("[]").rstrip() == "DOUBLE":
+        return DoubleArray
+    match = _GEOHASH_NAME.match(name)
+    if match:
+        bits = int(match.group(1)) * (5 if match.group(2) == "C" else 1)
+        if 0 < bits <= _GEOHASH_LONG_BITS:
+            return geohash_class(bits)
+    return None
+
+
+def _build_type_registry():
+    registry = {}
+    names = {type_class.__visit_name__: type_class for type_class in QUESTDB_TYPES}
+    for bits in range(1, _GEOHASH_LONG_BITS + 1):
+        names[f"GEOHASH({bits}b)"] = geohash_class(bits)
+        if bits % 5 == 0:
+            names[f"GEOHASH({bits // 5}c)"] = geohash_class(bits)
+    for dimensions in range(1, 5):
+        names["DOUBLE" + "[]" * dimensions] = DoubleArray
+    for name, type_class in names.items():
+        registry[name] = type_class
+        registry[name.upper()] = type_class
+        registry[name.lower()] = type_class
+    return registry
+
+
+_GEOHASH_NAME = re.compile(r"GEOHASH\(\s*(\d+)\s*([BC])\s*\)$")
+# exact names as sent by the server, in upper and lower case, as well as the
+# names resolved since, bounded in case of an endless stream of new names
+_TYPE_REGISTRY = _build_type_registry()
+_TYPE_REGISTRY_MAX_SIZE = len(_TYPE_REGISTRY) + 4096
@@ -0,0 +1,170 @@
+import datetime
+import http.server
+import io
+import json
+import threading
+import urllib.parse
+
+import pytest
+import questdb_connect as qdbc
+import sqlalchemy as sqla
+
+from tests.conftest import METRICS_TABLE_NAME
+
+
+@pytest.fixture(name='imp_server')
+def imp_server_fixture():
+    """Stand-in for QuestDB's HTTP /imp endpoint, records the requests."""
+    requests = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            assert self.headers['Transfer-Encoding'] == 'chunked'
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+                if size == 0:
+                    break
+            url = urllib.parse.urlparse(self.path)
+            requests.append((url.path, dict(urllib.parse.parse_qsl(url.query)), chunks, self.headers))
+            lines = b''.join(chunks).split(b'text/csv\r\n\r\n')[1].split(b'\r\n--')[0].splitlines()
+            body = json.dumps({
+                'status': 'OK',
+                'rowsImported': len(lines) - 2,
+                'rowsRejected': 1,
+                'columns': [{'name': 'attr_value', 'type': 'DOUBLE', 'errors': 1}],
+            }).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *_args):
+            pass
+
+    server = http.server.HTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.requests = requests
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def metrics_table():
+    return sqla.Table(
+        METRICS_TABLE_NAME,
+        sqla.MetaData(),
+        sqla.Column('source', qdbc.Symbol(capacity=16)),
+        sqla.Column('attr_value', qdbc.Double),
+        sqla.Column('ts', qdbc.Timestamp),
+        qdbc.QDBTableEngine(METRICS_TABLE_NAME, 'ts', qdbc.PartitionBy.HOUR),
+    )
+
+
+def test_import_rows(imp_server):
+    ts = datetime.datetime(2023, 4, 12, 23, 55, 59, 342380)
+    rows = [('NODE0', 0.5, ts), {'source': 'NODE1', 'attr_value': None, 'ts': ts}, ('NODE,2', 'oops', ts)]
+    result = qdbc.import_csv(metrics_table(), iter(rows), port=imp_server.server_port, chunk_size=32)
+    assert result == qdbc.ImportResult(METRICS_TABLE_NAME, 2, 1, {'attr_value': 1})
+
+    path, params, chunks, headers = imp_server.requests[0]
+    assert path == '/imp'
+    assert params == {
+        'name': METRICS_TABLE_NAME,
+        'fmt': 'json',
+        'forceHeader': 'true',
+        'overwrite': 'false',
+        'atomicity': 'skipRow',
+        'timestamp': 'ts',
+        'partitionBy': 'HOUR',
+    }
+    assert len(chunks) > 3  # streamed, not sent in one piece
+    body = b''.join(chunks).decode()
+    boundary = headers['Content-Type'].split('boundary=')[1]
+    schema = body.split('name="schema"\r\n\r\n')[1].split(f'\r\n--{boundary}')[0]
+    assert json.loads(schema) == [
+        {'name': 'source', 'type': 'SYMBOL'},
+        {'name': 'attr_value', 'type': 'DOUBLE'},
+        {'name': 'ts', 'type': 'TIMESTAMP', 'pattern': 'yyyy-MM-ddTHH:mm:ss.SSSUUU'},
+    ]
+    csv_data = body.split('text/csv\r\n\r\n')[1].split(f'\r\n--{boundary}--')[0]
+    assert csv_data == (
+        'source,attr_value,ts\n'
+        'NODE0,0.5,2023-04-12T23:55:59.342380\n'
+        'NODE1,,2023-04-12T23:55:59.342380\n'
+        '"NODE,2",oops,2023-04-12T23:55:59.342380\n'
+    )
+
+
+def test_import_geohash_precision(imp_server):
+    table = sqla.Table(
+        'cells',
+        sqla.MetaData(),
+        sqla.Column('g12b', qdbc.type_from_name('GEOHASH(12b)')),
+        sqla.Column('g5c', qdbc.type_from_name('GEOHASH(5c)')),
+        sqla.Column('g6c', qdbc.GeohashInt),
+        qdbc.QDBTableEngine('cells', None),
+    )
+    qdbc.import_csv(table, [('##010101010101', 'u33d8', 'u33d8s')], port=imp_server.server_port)
+    body = b''.join(imp_server.requests[-1][2]).decode()
+    boundary = imp_server.requests[-1][3]['Content-Type'].split('boundary=')[1]
+    schema = body.split('name="schema"\r\n\r\n')[1].split(f'\r\n--{boundary}')[0]
+    # the column's precision, not its container type's
+    assert json.loads(schema) == [
+        {'name': 'g12b', 'type': 'GEOHASH(12b)'},
+        {'name': 'g5c', 'type': 'GEOHASH(5c)'},
+        {'name': 'g6c', 'type': 'GEOHASH(6c)'},
+    ]
+
+
+def test_import_dates(imp_server):
+    table = sqla.Table(
+        'events',
+        sqla.MetaData(),
+        sqla.Column('day', qdbc.Date),
+        sqla.Column('ts', qdbc.Timestamp),
+        qdbc.QDBTableEngine('events', 'ts', qdbc.PartitionBy.DAY),
+    )
+    rows = [
+        (datetime.datetime(2023, 4, 12, 23, 55, 59, 342380), datetime.date(2023, 4, 12)),
+        (datetime.date(2023, 4, 13), datetime.datetime(2023, 4, 13, 1, 2, 3, tzinfo=datetime.timezone.utc)),
+    ]
+    qdbc.import_csv(table, rows, port=imp_server.server_port)
+    body = b''.join(imp_server.requests[-1][2]).decode()
+    boundary = imp_server.requests[-1][3]['Content-Type'].split('boundary=')[1]
+    schema = body.split('name="schema"\r\n\r\n')[1].split(f'\r\n--{boundary}')[0]
+    assert json.loads(schema) == [
+        {'name': 'day', 'type': 'DATE', 'pattern': 'yyyy-MM-ddTHH:mm:ss.SSS'},
+        {'name': 'ts', 'type': 'TIMESTAMP', 'pattern': 'yyyy-MM-ddTHH:mm:ss.SSSUUU'},
+    ]
+    # each value in its column's pattern, whether a date or a datetime
+    csv_data = body.split('text/csv\r\n\r\n')[1].split(f'\r\n--{boundary}--')[0]
+    assert csv_data == (
+        'day,ts\n'
+        '2023-04-12T23:55:59.342,2023-04-12T00:00:00.000000\n'
+        '2023-04-13T00:00:00.000,2023-04-13T01:02:03.000000\n'
+    )
+
+
+def test_import_file(imp_server, tmp_path):
+    content = 'source,attr_value,ts\nNODE0,0.5,2023-04-12T23:55:59.342380Z\nNODE1,1.5,2023-04-12T23:56:00.000000Z\n'
+    csv_file = tmp_path / 'metrics.csv'
+    csv_file.write_text(content)
+    for data in (csv_file, str(csv_file), io.StringIO(content), io.BytesIO(content.encode())):
+        result = qdbc.import_csv(metrics_table(), data, port=imp_server.server_port, chunk_size=16)
+        assert result.rows_imported == 1
+        assert result.rows_rejected == 1
+        body = b''.join(imp_server.requests[-1][2]).decode()
+        assert content in body
+        assert '"pattern"' not in body
+
+
+def test_import_error(imp_server):
+    table = sqla.Table('no_types', sqla.MetaData(), sqla.Column('x', sqla.Integer))
+    with pytest.raises(sqla.exc.ArgumentError):
+        qdbc.import_csv(table, [(1,)], port=imp_server.server_port)
@@ -1,5 +1,12 @@
+import asyncio
 import datetime
+import json
+import os
+import socket
+from unittest import mock
 
+import psycopg2
+import pytest
 import questdb_connect as qdbc
 import sqlalchemy as sqla
 from sqlalchemy.orm import Session
@@ -130,6 +137,64 @@ def test_inspect_2(test_engine, test_metrics):
     ])
 
 
+
+def test_server_capabilities(test_engine, test_model):
+    # detected when the engine connects for the first time
+    with test_engine.connect():
+        capabilities = test_engine.dialect.server_capabilities
+    assert capabilities.version is not None
+    assert capabilities.tables_name_column == 'table_name'
+    assert capabilities.wal_column == 'walEnabled'
+    assert capabilities.upsert_key_column == 'upsertKey'
+
+
+def test_metadata_reflect(test_engine, test_model, test_metrics):
+    statements = []
+
+    def count_statements(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    sqla.event.listen(test_engine, 'before_cursor_execute', count_statements)
+    try:
+        metadata = sqla.MetaData()
+        metadata.reflect(test_engine, only=[ALL_TYPES_TABLE_NAME, METRICS_TABLE_NAME])
+        only_statements, statements = statements, []
+        all_metadata = sqla.MetaData()
+        all_metadata.reflect(test_engine)
+    finally:
+        sqla.event.remove(test_engine, 'before_cursor_execute', count_statements)
+    # SHOW tables, tables() and the table_columns() of each table reflected, no other table's
+    assert len(only_statements) == 4
+    assert sum('table_columns' in statement for statement in only_statements) == 2
+    # all of them: table_columns() in UNION ALL batches of 1, 2, 4... tables
+    batches = 0
+    while 2 ** batches - 1 < len(all_metadata.tables):
+        batches += 1
+    assert len(statements) == 2 + batches
+    assert len(metadata.tables[ALL_TYPES_TABLE_NAME].columns) == 16
+    table = metadata.tables[METRICS_TABLE_NAME]
+    assert str([(col.name, col.type, col.primary_key) for col in table.columns]) == str([
+        ('source', qdbc.Symbol(), False),
+        ('attr_name', qdbc.Symbol(), False),
+        ('attr_value', qdbc.Double(), False),
+        ('ts', qdbc.Timestamp(), True),
+    ])
+    assert table.engine.ts_col_name == 'ts'
+    assert table.engine.partition_by == qdbc.PartitionBy.HOUR
+    assert table.engine.is_wal
+    assert table.engine.dedup_upsert_keys == ('source', 'attr_name', 'ts')
+
+
+def test_metadata_reflect_table_dropped_since_listed(test_engine, test_model, test_metrics):
+    # listed, then dropped before its columns are loaded along with the next table's
+    listing = [METRICS_TABLE_NAME, ALL_TYPES_TABLE_NAME, 'dropped_since_listed']
+    metadata = sqla.MetaData()
+    with mock.patch.object(qdbc.QuestDBDialect, 'get_table_names', return_value=listing):
+        metadata.reflect(test_engine, only=lambda name, _: name != 'dropped_since_listed')
+    assert set(metadata.tables) == {METRICS_TABLE_NAME, ALL_TYPES_TABLE_NAME}
+    assert len(metadata.tables[ALL_TYPES_TABLE_NAME].columns) == 16
+
+
 def test_multiple_insert(test_engine, test_model):
     now = datetime.datetime(2023, 4, 12, 23, 55, 59, 342380)
     now_date = now.date()
@@ -222,6 +287,172 @@ def test_bulk_insert(test_engine, test_model):
         assert collect_select_all_raw_connection(test_engine, expected_rows=num_rows) == expected
 
 
+def test_executemany_pages(test_engine, test_metrics):
+    now = datetime.datetime(2023, 4, 12, 23, 55, 59, 342380)
+    engine = sqla.create_engine(
+        test_engine.url,
+        future=True,
+        executemany_values_page_size=7,
+        executemany_values_page_bytes=512,
+    )
+    rows = [{'source': f'NODE{idx}', 'attr_value': float(idx), 'ts': now} for idx in range(50)]
+    try:
+        with engine.begin() as conn:
+            conn.execute(sqla.insert(test_metrics).values(attr_name='load'), rows)
+            conn.exec_driver_sql(
+                f'INSERT INTO public.{METRICS_TABLE_NAME} (source, attr_name, attr_value, ts) '
+                "VALUES (%(source)s, 'mem', %(attr_value)s, %(ts)s)",
+                rows,
+            )
+        dbapi_conn = engine.raw_connection()
+        try:
+            with dbapi_conn.cursor() as cursor:
+                pages = qdbc.execute_values_pages(
+                    cursor,
+                    f'INSERT INTO public.{METRICS_TABLE_NAME} (source, attr_name, attr_value, ts) '
+                    'VALUES (%s, %s, %s, %s)',
+                    '(%s, %s, %s, %s)',
+                    [(f'NODE{idx}', 'cpu', float(idx), now) for idx in range(50)],
+                    page_size=7,
+                )
+            dbapi_conn.commit()
+        finally:
+            dbapi_conn.close()
+        assert pages == 8
+        assert wait_until_table_is_ready(test_engine, METRICS_TABLE_NAME, 150)
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql(
+                f'SELECT attr_name, count() FROM {METRICS_TABLE_NAME} ORDER BY attr_name'
+            ).fetchall() == [('cpu', 50), ('load', 50), ('mem', 50)]
+    finally:
+        engine.dispose()
+
+
+def test_bulk_session(test_engine, test_metrics):
+    now = datetime.datetime(2023, 4, 12, 23, 55, 59, 342380)
+    session = qdbc.BulkSession(test_engine)
+    try:
+        session.add_all([
+            test_metrics(source=f'NODE{idx}', attr_name='load', attr_value=float(idx), ts=now)
+            for idx in range(30)
+        ])
+        assert session.bulk_pending == 30
+        assert not session.new
+        session.commit()
+        assert session.bulk_pending == 0
+        session.add(test_metrics(source='NODE30', attr_name='load', attr_value=30.0, ts=now))
+        session.rollback()
+        assert session.bulk_pending == 0
+        session.commit()
+    finally:
+        session.close()
+    assert wait_until_table_is_ready(test_engine, METRICS_TABLE_NAME, 30)
+
+
+def test_get_latest_partition(test_engine, test_metrics):
+    # two hourly partitions
+    timestamps = [datetime.datetime(2023, 4, 12, 22, 30), datetime.datetime(2023, 4, 12, 23, 55, 59, 342380)]
+    with test_engine.begin() as conn:
+        conn.execute(
+            sqla.insert(test_metrics.__table__),
+            [{'source': 'NODE0', 'attr_name': 'load', 'attr_value': 1.0, 'ts': ts} for ts in timestamps],
+        )
+    assert wait_until_table_is_ready(test_engine, METRICS_TABLE_NAME, len(timestamps))
+    inspector = sqla.inspect(test_engine)
+    assert inspector.get_latest_partition(METRICS_TABLE_NAME) == ('ts', timestamps[1])
+
+
+def test_designated_timestamps(test_engine, test_metrics):
+    qdbc.designated_timestamps.invalidate(test_engine.dialect.server)
+    assert test_engine.dialect.designated_timestamp(METRICS_TABLE_NAME) is None
+    # loaded when an engine first connects, and shared with those to the same server
+    engine = sqla.create_engine(test_engine.url)
+    try:
+        with engine.connect():
+            pass
+        assert engine.dialect.designated_timestamp(METRICS_TABLE_NAME) == 'ts'
+        assert test_engine.dialect.designated_timestamp(METRICS_TABLE_NAME.upper()) == 'ts'
+    finally:
+        engine.dispose()
+
+
+def test_sample_by_clause():
+    assert qdbc.SampleBy.create('15m').clause() == 'SAMPLE BY 15m ALIGN TO CALENDAR'
+    sample_by = qdbc.SampleBy.create('1h', fill=['prev', 0], time_zone="Europe/Berlin", offset='00:15')
+    assert sample_by.clause() == (
+        "SAMPLE BY 1h FILL(PREV, 0) ALIGN TO CALENDAR TIME ZONE 'Europe/Berlin' WITH OFFSET '00:15'"
+    )
+    sample_by = qdbc.SampleBy.create('1d', fill='linear', align_to='first observation')
+    assert sample_by.clause() == 'SAMPLE BY 1d FILL(LINEAR) ALIGN TO FIRST OBSERVATION'
+    sample_by = qdbc.SampleBy.create(
+        '1d',
+        fill='null',
+        from_=datetime.date(2023, 4, 12),
+        to=datetime.datetime(2023, 4, 13, 2, tzinfo=datetime.timezone(datetime.timedelta(hours=2))),
+    )
+    assert sample_by.clause() == (
+        "SAMPLE BY 1d FROM '2023-04-12' TO '2023-04-13T00:00:00.000000Z' FILL(NULL) ALIGN TO CALENDAR"
+    )
+    for kwargs in (
+        {'interval': '1 minute'},
+        {'interval': '0s'},
+        {'interval': '1m', 'fill': 'zero'},
+        {'interval': '1m', 'fill': True},
+        {'interval': '1m', 'align_to': 'start'},
+        {'interval': '1m', 'align_to': 'first observation', 'time_zone': 'UTC'},
+        {'interval': '1m', 'align_to': 'first observation', 'from_': '2023-04-12'},
+        {'interval': '1m', 'to': 20230412},
+    ):
+        with pytest.raises(sqla.exc.ArgumentError):
+            qdbc.SampleBy.create(**kwargs)
+
+
+def test_select_sample_by(test_metrics):
+    dialect = qdbc.QuestDBDialect()
+    query = (
+        qdbc.select(test_metrics.ts, test_metrics.source, sqla.func.avg(test_metrics.attr_value))
+        .where(test_metrics.attr_name == 'cpu')
+        .sample_by('1m', fill='prev', from_='2023-04-12', to='2023-04-13')
+        .order_by(test_metrics.ts)
+    )
+    assert ' '.join(str(query.compile(dialect=dialect)).split()) == (
+        f'SELECT {METRICS_TABLE_NAME}.ts, {METRICS_TABLE_NAME}.source, '
+        f'avg({METRICS_TABLE_NAME}.attr_value) AS avg_1 FROM {METRICS_TABLE_NAME} '
+        f'WHERE {METRICS_TABLE_NAME}.attr_name = %(attr_name_1)s '
+        "SAMPLE BY 1m FROM '2023-04-12' TO '2023-04-13' FILL(PREV) ALIGN TO CALENDAR "
+        f'ORDER BY {METRICS_TABLE_NAME}.ts'
+    )
+    # part of the statement cache key, dropped with None
+    assert query._generate_cache_key() != query.sample_by('1h')._generate_cache_key()
+    assert 'SAMPLE BY' not in str(query.sample_by(None).compile(dialect=dialect))
+    # the dialect's defaults apply
+    dialect = qdbc.QuestDBDialect(sample_by_time_zone='Europe/Berlin')
+    query = qdbc.select(sqla.func.count()).select_from(test_metrics).sample_by('1h')
+    assert str(query.compile(dialect=dialect)).endswith(
+        "SAMPLE BY 1h ALIGN TO CALENDAR TIME ZONE 'Europe/Berlin'"
+    )
+    no_ts = sqla.Table(
+        'no_ts', sqla.MetaData(), sqla.Column('x', qdbc.Double), qdbc.QDBTableEngine('no_ts', None)
+    )
+    # tables without QDBTableEngine are validated by the server, the compiled
+    # statement does not depend on the tables loaded from it
+    query = qdbc.select(sqla.func.count()).select_from(sqla.table('plain_no_ts')).sample_by('1h')
+    key = query._generate_cache_key().key
+    qdbc.designated_timestamps.update(dialect.server, [('plain_ts', 'ts'), ('plain_no_ts', None)])
+    try:
+        assert 'SAMPLE BY 1h' in str(query.compile(dialect=dialect))
+        assert query._generate_cache_key().key == key
+    finally:
+        qdbc.designated_timestamps.invalidate(dialect.server)
+    for query in (
+        qdbc.select(sqla.func.avg(no_ts.c.x)).sample_by('1m'),
+        qdbc.select(test_metrics.source, sqla.func.count()).group_by(test_metrics.source).sample_by('1m'),
+        qdbc.select(test_metrics.ts, no_ts.c.x).sample_by('1m'),
+    ):
+        with pytest.raises(sqla.exc.CompileError):
+            query.compile(dialect=dialect)
+
+
 def test_dialect_get_schema_names(test_engine):
     dialect = qdbc.QuestDBDialect()
     with test_engine.connect() as conn:
@@ -250,14 +481,93 @@ def test_functions(test_engine):
     with test_engine.connect() as conn:
         sql = sqla.text("SELECT name FROM functions()")
         expected = [row[0] for row in conn.execute(sql).fetchall()]
-        assert qdbc.get_functions_list() == expected
+        assert qdbc.get_functions_list(conn.connection.dbapi_connection) == expected
 
 
 def test_keywords(test_engine):
     with test_engine.connect() as conn:
         sql = sqla.text("SELECT keyword FROM keywords()")
         expected = [row[0] for row in conn.execute(sql).fetchall()]
-        assert qdbc.get_keywords_list() == expected
+        assert qdbc.get_keywords_list(conn.connection.dbapi_connection) == expected
+
+
+def test_keywords_registry(test_config, tmp_path):
+    conn = qdbc.connect(
+        host=test_config.host,
+        port=test_config.port,
+        user=test_config.username,
+        password=test_config.password,
+    )
+    try:
+        registry = qdbc.KeywordRegistry(cache_dir=str(tmp_path))
+        functions = registry.functions(conn)
+        assert isinstance(functions, frozenset)
+        assert registry.is_function('abs', conn)
+        assert registry.is_function('ABS', conn)
+        assert registry.is_keyword('SELECT', conn)
+        cache_files = list(tmp_path.iterdir())
+        assert len(cache_files) == 1
+        # kept per QuestDB build, not per the PostgreSQL version it reports
+        assert 'QuestDB' in cache_files[0].name
+
+        # a new process starts from the file, without round trips
+        content = json.loads(cache_files[0].read_text())
+        content['functions'].append('from_cache_file')
+        cache_files[0].write_text(json.dumps(content))
+        cold = qdbc.KeywordRegistry(cache_dir=str(tmp_path))
+        assert cold.functions(conn) == functions | {'from_cache_file'}
+    finally:
+        conn.close()
+
+
+def test_keywords_registry_load_failure(test_config):
+    conn = qdbc.connect(
+        host=test_config.host,
+        port=test_config.port,
+        user=test_config.username,
+        password=test_config.password,
+    )
+    try:
+        # without a connection, the built-in defaults, not another server's names
+        defaults = qdbc.get_functions_list()
+        assert 'timestamp_floor' in defaults
+        registry = qdbc.KeywordRegistry(retry_after=60)
+        with mock.patch.object(registry, '_load', return_value=None) as load:
+            assert list(registry.get('functions', conn).names) == defaults
+            assert list(registry.get('functions', conn).names) == defaults
+        assert load.call_count == 1  # not retried before retry_after
+
+        # a failure is not kept once retry_after is over
+        registry = qdbc.KeywordRegistry(retry_after=0)
+        with mock.patch.object(registry, '_load', return_value=None):
+            assert list(registry.get('functions', conn).names) == defaults
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT name FROM functions()')
+            expected = [row[0] for row in cursor.fetchall()]
+        assert list(registry.get('functions', conn).names) == expected
+    finally:
+        conn.close()
+
+
+def test_keywords_registry_load_error_rolls_back(test_config):
+    conn = qdbc.connect(
+        host=test_config.host,
+        port=test_config.port,
+        user=test_config.username,
+        password=test_config.password,
+    )
+    try:
+        registry = qdbc.KeywordRegistry()
+        queries = {'keywords': 'SELECT keyword FROM keywords()', 'functions': 'NOT SQL'}
+        with mock.patch.dict('questdb_connect.keywords_functions._QUERIES', queries):
+            assert registry._load(conn) is None
+        # the failed query does not leave an aborted transaction behind
+        assert conn.status == psycopg2.extensions.STATUS_READY
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            assert cursor.fetchone() == (1,)
+    finally:
+        conn.close()
 
 
 def test_limit_clause_basic(test_engine, test_model):
@@ -442,3 +752,301 @@ def test_limit_clause_with_binds_and_expressions(test_engine, test_model):
     finally:
         if session:
             session.close()
+
+
+def test_statement_cache(test_engine):
+    assert test_engine.dialect._supports_statement_cache
+    sql = "SELECT * FROM public.all_types_table WHERE col_int = :val"
+    text_clause = sqla.text(sql)
+    compiled = str(text_clause.compile(dialect=test_engine.dialect))
+    assert compiled == "SELECT * FROM all_types_table WHERE col_int = %(val)s"
+    assert text_clause.text == sql  # the clause is part of the cache key, it must not change
+
+    for type_class in qdbc.QUESTDB_TYPES:
+        assert type_class()._static_cache_key[0] == type_class
+    assert qdbc.Symbol()._static_cache_key != qdbc.Symbol(capacity=128)._static_cache_key
+    assert qdbc.Symbol(cache=True)._static_cache_key != qdbc.Symbol(cache=False)._static_cache_key
+
+    table = sqla.Table(ALL_TYPES_TABLE_NAME, sqla.MetaData(), sqla.Column('col_int', qdbc.Int))
+    key_1 = sqla.select(table).limit(5).offset(2)._generate_cache_key()
+    key_2 = sqla.select(table).limit(50).offset(20)._generate_cache_key()
+    assert key_1 == key_2  # limit and offset are bound parameters
+
+
+def test_stream_results(test_engine, test_model):
+    now = datetime.datetime(2023, 4, 12, 23, 55, 59, 342380)
+    num_rows = 10
+    session = Session(test_engine)
+    try:
+        session.bulk_save_objects([
+            test_model(col_int=idx, col_symbol='coconut', col_ts=now + datetime.timedelta(seconds=idx))
+            for idx in range(num_rows)
+        ])
+        session.commit()
+        assert wait_until_table_is_ready(test_engine, ALL_TYPES_TABLE_NAME, num_rows)
+
+        table = sqla.Table(ALL_TYPES_TABLE_NAME, sqla.MetaData(), autoload_with=test_engine)
+        with test_engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, max_row_buffer=3).execute(
+                sqla.select(table.c.col_int).order_by(table.c.col_int)
+            )
+            assert isinstance(result.cursor, qdbc.StreamingCursor)
+            assert result.cursor.itersize == 3
+            assert [row.col_int for row in result] == list(range(num_rows))
+
+            # fetchmany crosses page boundaries
+            result = conn.execution_options(stream_results=True, max_row_buffer=4).execute(
+                sqla.select(table.c.col_int).order_by(table.c.col_int)
+            )
+            assert [row.col_int for row in result.fetchmany(6)] == list(range(6))
+            assert [row.col_int for row in result.fetchall()] == list(range(6, num_rows))
+            assert result.cursor.rowcount == num_rows
+
+            # comments are stripped, a trailing one would swallow the page's LIMIT
+            result = conn.execution_options(stream_results=True, max_row_buffer=4).exec_driver_sql(
+                f'SELECT col_int FROM {ALL_TYPES_TABLE_NAME} ORDER BY col_int -- by col_int'
+            )
+            assert [row.col_int for row in result] == list(range(num_rows))
+
+            # without ORDER BY, the SELECT of a table is ordered by its designated timestamp
+            result = conn.execution_options(stream_results=True, max_row_buffer=4).execute(
+                sqla.select(table.c.col_int).where(table.c.col_symbol == 'coconut')
+            )
+            assert result.cursor.rowcount == 4
+            assert [row.col_int for row in result] == list(range(num_rows))
+
+            # otherwise pages could overlap, the result set is fetched in one go
+            with pytest.warns(RuntimeWarning, match='whole result set is fetched'):
+                result = conn.execution_options(stream_results=True, max_row_buffer=4).execute(
+                    sqla.select(table.c.col_int).distinct()
+                )
+            assert result.cursor.rowcount == num_rows
+            assert sorted(row.col_int for row in result) == list(range(num_rows))
+
+            # statements which cannot be paginated are fetched in one go
+            result = conn.execution_options(stream_results=True).execute(sqla.text('SHOW tables'))
+            assert ALL_TYPES_TABLE_NAME in {row.table_name for row in result}
+
+        rows = session.execute(
+            sqla.select(test_model).order_by(test_model.col_int).execution_options(yield_per=4)
+        ).scalars()
+        assert [model.col_int for model in rows] == list(range(num_rows))
+    finally:
+        if session:
+            session.close()
+
+
+def test_fetch_numpy_and_arrow(test_engine, test_model):
+    now = datetime.datetime(2023, 4, 12, 23, 55, 59, 342380)
+    num_rows = 6
+    session = Session(test_engine)
+    try:
+        session.bulk_save_objects([
+            test_model(
+                col_int=idx if idx % 3 else None,
+                col_double=idx * 0.5,
+                col_symbol='coconut' if idx % 2 else 'banana',
+                col_ts=now + datetime.timedelta(seconds=idx),
+            ) for idx in range(num_rows)
+        ])
+        session.commit()
+        assert wait_until_table_is_ready(test_engine, ALL_TYPES_TABLE_NAME, num_rows)
+    finally:
+        session.close()
+
+    query = f'select col_int, col_double, col_symbol, col_ts from {ALL_TYPES_TABLE_NAME} order by col_ts'
+    conn = test_engine.raw_connection()
+    try:
+        columns = conn.connection.fetch_numpy(query, symbols=['col_symbol'], batch_size=4)
+        assert columns['col_int'].dtype.name == 'int32'
+        assert columns['col_int'].tolist() == [-2147483648, 1, 2, -2147483648, 4, 5]
+        assert columns['col_double'].tolist() == [0.0, 0.5, 1.0, 1.5, 2.0, 2.5]
+        assert str(columns['col_ts'].dtype) == 'datetime64[us]'
+        assert columns['col_ts'][0] == now
+        assert isinstance(columns['col_symbol'], qdbc.DictionaryArray)
+        assert columns['col_symbol'].categories.tolist() == ['banana', 'coconut']
+        assert columns['col_symbol'].decode().tolist() == ['banana', 'coconut'] * 3
+
+        table = conn.connection.fetch_arrow(query, symbols=['col_symbol'])
+        assert table.num_rows == num_rows
+        assert table.column('col_int').null_count == 2
+        assert str(table.schema.field('col_symbol').type) == 'dictionary<values=string, indices=int32, ordered=0>'
+    finally:
+        conn.close()
+
+
+def test_result_cache(test_engine, test_metrics):
+    now = datetime.datetime(2023, 4, 12, 23, 55, 59, 342380)
+    engine = sqla.create_engine(test_engine.url, future=True, result_cache_bytes=1 << 20)
+    cache = engine.dialect.result_cache
+    query = sqla.text(f'SELECT source, attr_value FROM {METRICS_TABLE_NAME} WHERE attr_value > :value')
+    try:
+        with test_engine.begin() as conn:
+            conn.execute(sqla.insert(test_metrics), {'source': 'NODE0', 'attr_value': 0.5, 'ts': now})
+        assert wait_until_table_is_ready(test_engine, METRICS_TABLE_NAME, 1)
+        with engine.connect() as conn:
+            assert conn.execute(query, {'value': 0}).fetchall() == [('NODE0', 0.5)]
+            hits = cache.hits
+            assert conn.execute(query, {'value': 0}).fetchall() == [('NODE0', 0.5)]
+            assert cache.hits == hits + 1
+            assert len(cache) == 1
+
+        # a new WAL transaction invalidates the cached result set
+        with test_engine.begin() as conn:
+            conn.execute(sqla.insert(test_metrics), {'source': 'NODE1', 'attr_value': 1.5, 'ts': now})
+        assert wait_until_table_is_ready(test_engine, METRICS_TABLE_NAME, 2)
+        with engine.connect() as conn:
+            rows = conn.execute(query, {'value': 0}).fetchall()
+            assert sorted(rows) == [('NODE0', 0.5), ('NODE1', 1.5)]
+            assert cache.invalidations == 1
+    finally:
+        engine.dispose()
+
+
+def test_metadata_cache(test_engine):
+    engine = sqla.create_engine(test_engine.url, future=True, metadata_cache_ttl=60)
+    statements = []
+
+    def count_statements(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    sqla.event.listen(engine, 'before_cursor_execute', count_statements)
+    table_name = 'metadata_cache_Test'
+    metadata = sqla.MetaData()
+    table = sqla.Table(
+        table_name,
+        metadata,
+        sqla.Column('source', qdbc.Symbol),
+        sqla.Column('ts', qdbc.Timestamp),
+        qdbc.QDBTableEngine(table_name, 'ts', qdbc.PartitionBy.DAY, is_wal=True),
+    )
+    try:
+        with engine.connect() as conn:
+            assert not engine.dialect.has_table(conn, table_name)
+            assert not engine.dialect.has_table(conn, table_name)
+            engine.dialect.get_table_names(conn)
+            assert statements.count('SHOW tables') == 1
+        # DDL invalidates the cached table names
+        metadata.create_all(engine)
+        with engine.connect() as conn:
+            assert engine.dialect.has_table(conn, table_name)
+            assert engine.dialect.search_table_names(conn, 'METADATA_cache') == [table_name]
+            assert engine.dialect.search_table_names(conn, 'no_such_prefix') == []
+            assert statements.count('SHOW tables') == 2
+        table.drop(engine)
+        with engine.connect() as conn:
+            assert not engine.dialect.has_table(conn, table_name)
+            assert statements.count('SHOW tables') == 3
+    finally:
+        sqla.event.remove(engine, 'before_cursor_execute', count_statements)
+        with test_engine.begin() as conn:
+            conn.exec_driver_sql(f'DROP TABLE IF EXISTS "{table_name}"')
+        engine.dispose()
+
+
+def test_inspector_get_columns_metadata_cache(test_engine, test_metrics):
+    engine = sqla.create_engine(test_engine.url, future=True, metadata_cache_ttl=60)
+    statements = []
+
+    def count_statements(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    sqla.event.listen(engine, 'before_cursor_execute', count_statements)
+    try:
+        # the path of Superset and other inspector users
+        columns = sqla.inspect(engine).get_columns(METRICS_TABLE_NAME)
+        assert [(col['name'], type(col['type'])) for col in columns] == [
+            ('source', qdbc.Symbol),
+            ('attr_name', qdbc.Symbol),
+            ('attr_value', qdbc.Double),
+            ('ts', qdbc.Timestamp),
+        ]
+        assert sqla.inspect(engine).get_columns(METRICS_TABLE_NAME) == columns
+        assert len([statement for statement in statements if 'table_columns' in statement]) == 1
+    finally:
+        sqla.event.remove(engine, 'before_cursor_execute', count_statements)
+        engine.dispose()
+
+
+def test_pool_warm_up_and_liveness(test_engine):
+    engine = sqla.create_engine(test_engine.url, future=True, pool_size=3, max_overflow=0, warm_up=2)
+    try:
+        pool = engine.pool
+        assert isinstance(pool, qdbc.QDBPool)
+        assert pool.checkedin() == 2
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql('SELECT 1').scalar() == 1
+            assert pool.metrics().in_use == 1
+            dbapi_conn = conn.connection.dbapi_connection
+        assert qdbc.is_alive(dbapi_conn)
+        # the pooled connection is closed under our feet, as if by the server
+        with socket.socket(fileno=os.dup(dbapi_conn.fileno())) as sock:
+            sock.shutdown(socket.SHUT_RDWR)
+        assert not qdbc.is_alive(dbapi_conn)
+        for _ in range(2):
+            with engine.connect() as conn:
+                assert conn.exec_driver_sql('SELECT 1').scalar() == 1
+        metrics = pool.metrics()
+        assert metrics.checkouts == 3
+        assert metrics.liveness_failures == 1
+        assert metrics.in_use == 0
+        assert metrics.max_in_use == 1
+    finally:
+        engine.dispose()
+
+
+def test_is_alive_high_fd():
+    resource = pytest.importorskip('resource')
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    high_fd = 1500
+    if hard != resource.RLIM_INFINITY and hard <= high_fd:
+        pytest.skip('RLIMIT_NOFILE is too low for a file descriptor above 1024')
+    if soft != resource.RLIM_INFINITY and soft <= high_fd:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (high_fd + 1, hard))
+    local, remote = socket.socketpair()
+    try:
+        # beyond select.select's FD_SETSIZE, as in processes with many open files
+        os.dup2(local.fileno(), high_fd)
+        dbapi_conn = mock.Mock(closed=0, **{'fileno.return_value': high_fd})
+        assert qdbc.is_alive(dbapi_conn)
+        remote.close()
+        assert not qdbc.is_alive(dbapi_conn)
+    finally:
+        os.close(high_fd)
+        local.close()
+        remote.close()
+        resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+
+
+def test_async_engine(test_config, test_metrics):
+    pytest.importorskip('asyncpg')
+    engine = qdbc.create_async_engine(
+        test_config.host,
+        test_config.port,
+        test_config.username,
+        test_config.password,
+        pool_size=20,
+    )
+
+    async def query(idx):
+        async with engine.connect() as conn:
+            result = await conn.execute(sqla.text(f'SELECT {idx} FROM long_sequence(1)'))
+            return result.scalar()
+
+    async def reflect():
+        async with engine.connect() as conn:
+            metadata = sqla.MetaData()
+            await conn.run_sync(lambda sync_conn: metadata.reflect(sync_conn, only=[METRICS_TABLE_NAME]))
+            return metadata.tables[METRICS_TABLE_NAME]
+
+    async def run():
+        try:
+            results = await asyncio.gather(*(query(idx) for idx in range(40)))
+            return results, await reflect()
+        finally:
+            await engine.dispose()
+
+    results, table = asyncio.run(run())
+    assert results == list(range(40))
+    assert [col.name for col in table.columns] == ['source', 'attr_name', 'attr_value', 'ts']
+    assert table.engine.partition_by == qdbc.PartitionBy.HOUR
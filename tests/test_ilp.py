@@ -0,0 +1,245 @@
+import asyncio
+import datetime
+import gc
+import http.server
+import socket
+import threading
+import time
+
+import pytest
+import questdb_connect as qdbc
+import sqlalchemy as sqla
+
+from tests.conftest import METRICS_TABLE_NAME
+
+
+class RecordingSocketServer:
+    """Stand-in for QuestDB's ILP/TCP endpoint, records the wire bytes."""
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen(1)
+        self.port = self.sock.getsockname()[1]
+        self.received = bytearray()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        # one connection at a time, each sender connects anew
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            with conn:
+                while True:
+                    data = conn.recv(65536)
+                    if not data:
+                        break
+                    self.received += data
+
+    def wait_for(self, num_bytes, timeout=5.0):
+        deadline = time.time() + timeout
+        while len(self.received) < num_bytes and time.time() < deadline:
+            time.sleep(0.01)
+        return bytes(self.received)
+
+    def close(self):
+        self.sock.close()
+
+
+@pytest.fixture(name='ilp_server')
+def ilp_server_fixture():
+    server = RecordingSocketServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture(name='ilp_http_server')
+def ilp_http_server_fixture():
+    requests = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            requests.append((self.path, self.rfile.read(int(self.headers['Content-Length']))))
+            self.send_response(204)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, *_args):
+            pass
+
+    server = http.server.HTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.requests = requests
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def metrics_table():
+    return sqla.Table(
+        METRICS_TABLE_NAME,
+        sqla.MetaData(),
+        sqla.Column('source', qdbc.Symbol),
+        sqla.Column('attr_name', qdbc.Symbol),
+        sqla.Column('attr_value', qdbc.Double),
+        sqla.Column('attr_count', qdbc.Long),
+        sqla.Column('comment', qdbc.String),
+        sqla.Column('ts', qdbc.Timestamp),
+        qdbc.QDBTableEngine(METRICS_TABLE_NAME, 'ts', qdbc.PartitionBy.HOUR),
+    )
+
+
+def test_ilp_sender_encoding(ilp_server):
+    ts = datetime.datetime(2023, 4, 12, 23, 55, 59, 342380)
+    with qdbc.ILPSender('127.0.0.1', ilp_server.port) as sender:
+        sender.insert_rows(metrics_table(), [
+            {'source': 'NODE 0', 'attr_name': 'CPU', 'attr_value': 0.5, 'attr_count': 3,
+             'comment': 'say "hi"', 'ts': ts},
+            {'source': 'NODE1', 'attr_name': None, 'attr_value': float('nan'), 'ts': None},
+        ])
+        sender.row('other', symbols={'s': 'a,b'}, columns={'flag': True, 'n': 1}, at=ts)
+    expected = (
+        f'{METRICS_TABLE_NAME},source=NODE\\ 0,attr_name=CPU '
+        'attr_value=0.5,attr_count=3i,comment="say \\"hi\\"" 1681343759342380000\n'
+        f'{METRICS_TABLE_NAME},source=NODE1 attr_value=NaN\n'
+        'other,s=a\\,b flag=t,n=1i 1681343759342380000\n'
+    ).encode()
+    assert ilp_server.wait_for(len(expected)) == expected
+
+
+def test_ilp_sender_drops_encoders_with_table(ilp_server):
+    sender = qdbc.ILPSender('127.0.0.1', ilp_server.port)
+    table = metrics_table()
+    sender.insert_rows(table, [{'source': 'NODE0', 'attr_value': 0.5}])
+    assert len(sender._encoders) == 1
+    del table
+    gc.collect()
+    assert len(sender._encoders) == 0
+    sender.close()
+
+
+def test_asyncpg_sends_ilp_off_the_event_loop():
+    pytest.importorskip('asyncpg')
+    dialect = qdbc.QuestDBDialect_asyncpg()
+    sends = []
+
+    async def run():
+        # do_executemany runs in a greenlet, as it does under AsyncConnection
+        await sqla.util.greenlet_spawn(
+            dialect._run_ilp_send, lambda: sends.append(threading.get_ident())
+        )
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+    assert len(sends) == 1
+    assert sends[0] != loop_thread
+
+
+def test_ilp_sender_http(ilp_http_server):
+    sender = qdbc.ILPSender('127.0.0.1', ilp_http_server.server_port, protocol='http')
+    sender.row('t', columns={'x': 1})
+    sender.flush()
+    sender.row('t', columns={'x': 2})
+    sender.flush()
+    sender.flush()  # nothing buffered, nothing sent
+    sender.close()
+    assert ilp_http_server.requests == [('/write', b't x=1i\n'), ('/write', b't x=2i\n')]
+
+
+def test_executemany_insert_with_ilp(test_config, ilp_server):
+    engine = sqla.create_engine(
+        qdbc.connection_uri(
+            test_config.host,
+            test_config.port,
+            test_config.username,
+            test_config.password,
+            test_config.database,
+        ),
+        future=True,
+        ilp_port=ilp_server.port,
+    )
+    table = metrics_table()
+    ts = datetime.datetime(2023, 4, 12, 23, 55, 59, 342380)
+    try:
+        with engine.connect() as conn:
+            conn.execution_options(questdb_ilp=True).execute(sqla.insert(table), [
+                {'source': 'NODE0', 'attr_name': 'CPU', 'attr_value': 0.5, 'ts': ts},
+                {'source': 'NODE1', 'attr_name': 'RAM', 'attr_value': 1.5, 'ts': ts},
+            ])
+    finally:
+        engine.dispose()
+    expected = (
+        f'{METRICS_TABLE_NAME},source=NODE0,attr_name=CPU attr_value=0.5 1681343759342380000\n'
+        f'{METRICS_TABLE_NAME},source=NODE1,attr_name=RAM attr_value=1.5 1681343759342380000\n'
+    ).encode()
+    assert ilp_server.wait_for(len(expected)) == expected
+
+
+def test_write_dataframe(test_engine, test_metrics, ilp_server):
+    pd = pytest.importorskip('pandas')
+    frame = pd.DataFrame({
+        'source': pd.Categorical(['NODE 0', 'NODE1', None]),
+        'attr_name': ['CPU', None, 'RAM'],
+        'attr_value': [0.5, 1.5, float('nan')],
+        'ts': pd.to_datetime(['2023-04-12 23:55:59.342380'] * 3),
+    })
+    with qdbc.ILPSender('127.0.0.1', ilp_server.port) as sender:
+        # the table exists, its SYMBOL columns and designated timestamp are reflected
+        assert qdbc.write_dataframe(frame, METRICS_TABLE_NAME, test_engine, sender=sender) == 3
+    expected = (
+        f'{METRICS_TABLE_NAME},source=NODE\\ 0,attr_name=CPU attr_value=0.5 1681343759342380000\n'
+        f'{METRICS_TABLE_NAME},source=NODE1 attr_value=1.5 1681343759342380000\n'
+        f'{METRICS_TABLE_NAME},attr_name=RAM 1681343759342380000\n'
+    ).encode()
+    assert ilp_server.wait_for(len(expected)) == expected
+
+
+def test_write_dataframe_creates_table(test_engine, ilp_server):
+    pd = pytest.importorskip('pandas')
+    table_name = 'dataframe_table'
+    frame = pd.DataFrame({
+        'source': pd.Categorical(['NODE0']),
+        'attr_count': pd.array([3], dtype='int32'),
+        'ts': pd.to_datetime(['2023-04-12 23:55:59.342380']),
+    }).set_index('ts')
+    engine = sqla.create_engine(test_engine.url, future=True, ilp_port=ilp_server.port)
+    try:
+        qdbc.write_dataframe(frame, table_name, engine, 'ts', qdbc.PartitionBy.MONTH)
+        table = sqla.Table(table_name, sqla.MetaData(), autoload_with=engine)
+        assert [(col.name, type(col.type)) for col in table.columns] == [
+            ('ts', qdbc.Timestamp), ('source', qdbc.Symbol), ('attr_count', qdbc.Int)
+        ]
+        assert table.engine.ts_col_name == 'ts'
+        assert table.engine.partition_by == qdbc.PartitionBy.MONTH
+    finally:
+        with engine.begin() as conn:
+            conn.execute(sqla.text(f'DROP TABLE IF EXISTS {table_name}'))
+        engine.dispose()
+    expected = b'dataframe_table,source=NODE0 attr_count=3i 1681343759342380000\n'
+    assert ilp_server.wait_for(len(expected)) == expected
+
+
+def test_to_sql_method(test_engine, test_metrics, ilp_server):
+    pd = pytest.importorskip('pandas')
+    frame = pd.DataFrame({
+        'source': ['NODE0', 'NODE1', 'NODE2'],
+        'attr_value': [0.5, 1.5, 2.5],
+        'ts': pd.to_datetime(['2023-04-12 23:55:59.342380'] * 3),
+    })
+    engine = sqla.create_engine(test_engine.url, future=True, ilp_port=ilp_server.port)
+    try:
+        # each chunk is sent by its own call
+        rows = frame.to_sql(METRICS_TABLE_NAME, engine, if_exists='append', index=False,
+                            chunksize=2, method=qdbc.to_sql_method)
+    finally:
+        engine.dispose()
+    expected = ''.join(
+        f'{METRICS_TABLE_NAME},source=NODE{idx} attr_value={idx + 0.5} 1681343759342380000\n' for idx in range(3)
+    ).encode()
+    assert ilp_server.wait_for(len(expected)) == expected
+    assert rows == 3
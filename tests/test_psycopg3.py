@@ -0,0 +1,51 @@
+import datetime
+
+import pytest
+
+from tests.conftest import METRICS_TABLE_NAME, wait_until_table_is_ready
+
+psycopg3 = pytest.importorskip('questdb_connect.psycopg3')
+
+
+@pytest.fixture(name='pg3_conn')
+def pg3_conn_fixture(test_config):
+    conn = psycopg3.connect(
+        host=test_config.host,
+        port=test_config.port,
+        user=test_config.username,
+        password=test_config.password,
+        database=test_config.database,
+    )
+    yield conn
+    conn.close()
+
+
+def test_binary_results(pg3_conn):
+    with pg3_conn.cursor() as cursor:
+        assert cursor.format == psycopg3.psycopg.pq.Format.BINARY
+        cursor.execute(
+            "SELECT x, x * 1.5 d, cast('2023-04-12T23:55:59.342380Z' AS timestamp) ts "
+            'FROM long_sequence(2)'
+        )
+        assert cursor.fetchall() == [
+            (1, 1.5, datetime.datetime(2023, 4, 12, 23, 55, 59, 342380)),
+            (2, 3.0, datetime.datetime(2023, 4, 12, 23, 55, 59, 342380)),
+        ]
+
+
+def test_public_schema_and_pipeline(test_engine, test_metrics, pg3_conn):
+    now = datetime.datetime(2023, 4, 12, 23, 55, 59, 342380)
+    insert = f'INSERT INTO public.{METRICS_TABLE_NAME} (source, attr_name, attr_value, ts) VALUES (%s, %s, %s, %s)'
+    with pg3_conn.cursor() as cursor:
+        cursor.executemany(
+            insert,
+            [(f'NODE{idx}', 'load', float(idx), now) for idx in range(50)],
+        )
+    pg3_conn.execute_batch(
+        (insert, (f'NODE{idx}', 'mem', float(idx), now)) for idx in range(50)
+    )
+    pg3_conn.commit()
+    assert wait_until_table_is_ready(test_engine, METRICS_TABLE_NAME, 100)
+    with pg3_conn.cursor() as cursor:
+        cursor.execute(f'SELECT count() FROM public.{METRICS_TABLE_NAME} WHERE attr_name = %s', ('mem',))
+        assert cursor.fetchone() == (50,)
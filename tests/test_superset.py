@@ -2,10 +2,13 @@ import datetime
 from unittest import mock
 
 import pytest
+import questdb_connect as qdbc
+from qdb_superset.db_engine_specs import questdb as questdb_spec
 from qdb_superset.db_engine_specs.questdb import QuestDbEngineSpec
-from questdb_connect.types import QUESTDB_TYPES, Timestamp
-from sqlalchemy import column, literal_column
+from questdb_connect.types import QUESTDB_TYPES, Double, GeohashInt, Timestamp
+from sqlalchemy import column, func, literal_column, select, table
 from sqlalchemy.types import TypeEngine
+from superset.utils.core import GenericDataType
 
 
 def test_build_sqlalchemy_uri():
@@ -83,14 +86,155 @@ def test_get_column_spec():
         assert native_type != Timestamp or column_spec.is_dttm
 
 
+def test_get_column_spec_variants():
+    column_spec = QuestDbEngineSpec.get_column_spec("GEOHASH(5c)")
+    assert column_spec.sqla_type == GeohashInt
+    assert column_spec.generic_type == GenericDataType.STRING
+    assert QuestDbEngineSpec.get_column_spec("geohash(5c)") == column_spec
+    assert QuestDbEngineSpec.get_column_spec("GEOHASH(5c)") is column_spec
+    assert QuestDbEngineSpec.get_column_spec("double").generic_type == GenericDataType.NUMERIC
+    assert QuestDbEngineSpec.get_column_types("DOUBLE") == (Double, GenericDataType.NUMERIC)
+    assert QuestDbEngineSpec.get_column_spec("timestamp").is_dttm
+    assert QuestDbEngineSpec.get_column_spec(None) is None
+    assert QuestDbEngineSpec.get_column_types("") is None
+
+
 def test_get_sqla_column_type():
     for native_type in QUESTDB_TYPES:
         column_type = QuestDbEngineSpec.get_sqla_column_type(native_type.__visit_name__)
         assert isinstance(column_type, TypeEngine.__class__)
 
 
+def test_where_latest_partition():
+    inspector = mock.Mock()
+    database = mock.Mock(id=-1)
+    database.get_inspector_with_context = mock.MagicMock()
+    database.get_inspector_with_context.return_value.__enter__.return_value = inspector
+    query = select([literal_column("*")]).select_from(table("t")).limit(100)
+
+    def latest_partition_query(table_name):
+        qry = QuestDbEngineSpec.where_latest_partition(table_name, None, database, query)
+        if qry is None:
+            return None
+        sql = qry.compile(
+            dialect=qdbc.QuestDBDialect(), compile_kwargs={"literal_binds": True}
+        )
+        return " ".join(str(sql).split())
+
+    inspector.get_latest_partition.return_value = (
+        "ts",
+        datetime.datetime(2023, 4, 12, 23, 0, 0, 1),
+    )
+    assert latest_partition_query("hourly") == (
+        "SELECT * FROM t WHERE ts >= "
+        "TO_TIMESTAMP('2023-04-12T23:00:00.000001', 'yyyy-MM-ddTHH:mm:ss.SSSUUU') "
+        "LIMIT 100"
+    )
+    # the bounds are cached
+    latest_partition_query("hourly")
+    inspector.get_latest_partition.assert_called_once_with("hourly")
+    inspector.get_latest_partition.return_value = ("ts", None)
+    assert latest_partition_query("not_partitioned") is None
+    inspector.get_latest_partition.return_value = (None, None)
+    assert latest_partition_query("no_timestamp") is None
+
+
+def test_select_star_latest_partition():
+    inspector = mock.Mock()
+    database = mock.Mock(id=-2)
+    database.get_inspector_with_context = mock.MagicMock()
+    database.get_inspector_with_context.return_value.__enter__.return_value = inspector
+    dialect = qdbc.QuestDBDialect()
+    database.compile_sqla_query = lambda qry: str(
+        qry.compile(dialect=dialect, compile_kwargs={"literal_binds": True})
+    )
+    engine = mock.Mock(dialect=dialect)
+
+    def select_star(table_name, **kwargs):
+        sql = QuestDbEngineSpec.select_star(database, table_name, engine, **kwargs)
+        return " ".join(sql.split())
+
+    # not partitioned, the last rows by designated timestamp
+    inspector.get_latest_partition.return_value = ("ts", None)
+    assert select_star("not_partitioned") == "SELECT * FROM not_partitioned LIMIT -100"
+    assert select_star("not_partitioned", limit=10, latest_partition=False) == (
+        "SELECT * FROM not_partitioned LIMIT 10"
+    )
+    inspector.get_latest_partition.return_value = (None, None)
+    assert select_star("no_timestamp") == "SELECT * FROM no_timestamp LIMIT 100"
+    # the preview is not restricted when the partitions cannot be loaded
+    inspector.get_latest_partition.side_effect = RuntimeError("table_partitions()")
+    assert select_star("failing") == "SELECT * FROM failing LIMIT 100"
+    assert QuestDbEngineSpec.where_latest_partition("failing", None, database, select([])) is None
+    assert (-2, "failing") not in questdb_spec._LATEST_PARTITIONS
+
+
+def test_latest_partitions_expire():
+    inspector = mock.Mock()
+    inspector.get_latest_partition.return_value = ("ts", None)
+    database = mock.Mock(id=-3)
+    database.get_inspector_with_context = mock.MagicMock()
+    database.get_inspector_with_context.return_value.__enter__.return_value = inspector
+    with mock.patch("time.monotonic", return_value=0.0):
+        QuestDbEngineSpec.where_latest_partition("t1", None, database, select([]))
+    assert (-3, "t1") in questdb_spec._LATEST_PARTITIONS
+    # expired entries are evicted when another table is loaded
+    with mock.patch("time.monotonic", return_value=3600.0):
+        QuestDbEngineSpec.where_latest_partition("t2", None, database, select([]))
+    assert (-3, "t1") not in questdb_spec._LATEST_PARTITIONS
+    assert (-3, "t2") in questdb_spec._LATEST_PARTITIONS
+
+
 def test_get_allow_cost_estimate():
-    assert not QuestDbEngineSpec.get_allow_cost_estimate(extra=None)
+    assert QuestDbEngineSpec.get_allow_cost_estimate(extra=None)
+
+
+def test_estimate_statement_cost():
+    plans = {
+        "trades": [
+            ("DeferredSingleSymbolFilterPageFrame",),
+            ("    Index forward scan on: symbol deferred: true",),
+            ("      filter: symbol=1",),
+            ("    Interval forward scan on: trades",),
+            (
+                '      intervals: [("2023-04-12T00:00:00.000000Z","2023-04-12T23:59:59.999999Z")]',
+            ),
+        ],
+        "quotes": [
+            ("DataFrame",),
+            ("    Row forward scan",),
+            ("    Frame forward scan on: quotes",),
+        ],
+    }
+    partitions = [
+        (datetime.datetime(2023, 4, day, 0, 0, 1), datetime.datetime(2023, 4, day, 23))
+        for day in (11, 12, 13)
+    ]
+    cursor = mock.Mock()
+
+    def execute(sql, params=None):
+        if sql.startswith("EXPLAIN"):
+            cursor.fetchall.return_value = plans[sql.split()[-1]]
+        else:
+            cursor.fetchall.return_value = partitions
+
+    cursor.execute.side_effect = execute
+    raw_cost = [
+        QuestDbEngineSpec.estimate_statement_cost(statement, cursor)
+        for statement in ("SELECT * FROM trades;", "SELECT * FROM quotes")
+    ]
+    assert QuestDbEngineSpec.query_cost_formatter(raw_cost) == [
+        {
+            "Table trades": "interval scan [2023-04-12T00:00:00.000000Z, "
+            "2023-04-12T23:59:59.999999Z], 1 of 3 partitions",
+            "Symbol indexes": "symbol",
+        },
+        {
+            "Table quotes": "full scan, 3 of 3 partitions",
+            "Warning": "full scan of quotes",
+        },
+    ]
+    cursor.execute.assert_any_call("EXPLAIN SELECT * FROM trades")
 
 
 def test_get_view_names():
@@ -122,6 +266,74 @@ def test_time_ex_lowr_col_no_grain(superset_test_engine):
     assert "lower_case" == result
 
 
+def test_time_grain_sample_by(test_config):
+    # a server of its own, never connected, whose tables are set here
+    engine = qdbc.create_superset_engine(
+        test_config.host,
+        test_config.port,
+        test_config.username,
+        test_config.password,
+        "sample_by",
+        sample_by_time_zone="Europe/Berlin",
+    )
+    qdbc.designated_timestamps.update(
+        engine.dialect.server, [("metrics", "ts"), ("no_timestamp", None)]
+    )
+
+    def time_grain_query(table_name, time_grain, time_col="ts", having=False):
+        # outside of Superset's app, which time grain add-ons are configured in
+        with mock.patch.object(
+            QuestDbEngineSpec,
+            "get_time_grain_expressions",
+            return_value=QuestDbEngineSpec._time_grain_expressions,
+        ):
+            timestamp = QuestDbEngineSpec.get_timestamp_expr(
+                column(time_col), None, time_grain
+            ).label("__timestamp")
+        source = column("source").label("source")
+        qry = (
+            select([timestamp, source, func.avg(column("value")).label("avg")])
+            .select_from(table(table_name))
+            .group_by(timestamp, source)
+        )
+        if having:
+            qry = qry.having(func.avg(column("value")) > 0)
+        if time_grain != "P1W":
+            # compiled according to the designated timestamps, never cached
+            assert qry._generate_cache_key() is None
+        sql = qry.compile(engine, compile_kwargs={"literal_binds": True})
+        return " ".join(str(sql).split())
+
+    try:
+        assert time_grain_query("metrics", "PT1M") == (
+            "SELECT ts AS __timestamp, source AS source, avg(value) AS avg "
+            "FROM metrics SAMPLE BY 1m ALIGN TO CALENDAR TIME ZONE 'Europe/Berlin'"
+        )
+        assert time_grain_query("METRICS", "P1Y").startswith(
+            "SELECT ts AS __timestamp, source AS source"
+        )
+        # GROUP BY DATE_TRUNC otherwise
+        for args in (
+            ("metrics", "P1W"),
+            ("metrics", "PT1H", "other_ts"),
+            ("no_timestamp", "PT1H"),
+            ("unknown", "PT1H"),
+        ):
+            assert "GROUP BY DATE_TRUNC(" in time_grain_query(*args)
+        assert "GROUP BY DATE_TRUNC(" in time_grain_query("metrics", "PT1M", having=True)
+    finally:
+        qdbc.designated_timestamps.invalidate(engine.dialect.server)
+        engine.dispose()
+
+
+def test_execute_strips_comments():
+    cursor = mock.Mock()
+    QuestDbEngineSpec.execute(
+        cursor, "-- chart 7\nSELECT /*+ AVOID_HJ(a b) */ '--' AS s FROM public.a /* a */LIMIT 1"
+    )
+    cursor.execute.assert_called_once_with("\nSELECT /*+ AVOID_HJ(a b) */ '--' AS s FROM a  LIMIT 1")
+
+
 def test_execute_sql_statement(superset_test_engine) -> None:
     query = """
         select * from tables()
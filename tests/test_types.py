@@ -1,7 +1,12 @@
+import ipaddress
 import re
+import uuid
 
+import pytest
 import questdb_connect as qdbc
-from questdb_connect.common import quote_identifier
+import sqlalchemy as sqla
+from questdb_connect import common
+from questdb_connect.common import quote_identifier, remove_public_schema, strip_comments
 
 
 def test_resolve_type_from_name():
@@ -17,6 +22,55 @@ def test_resolve_type_from_name():
         assert isinstance(g_class(), qdbc.geohash_class(n))
 
 
+def test_resolve_type_from_name_variants():
+    assert qdbc.resolve_type_from_name('varchar') is qdbc.Varchar
+    assert qdbc.resolve_type_from_name('Timestamp') is qdbc.Timestamp
+    assert qdbc.resolve_type_from_name('SYMBOL CAPACITY 256 NOCACHE') is qdbc.Symbol
+    assert qdbc.resolve_type_from_name('symbol  capacity 128') is qdbc.Symbol
+    assert qdbc.resolve_type_from_name('GEOHASH(5c)') is qdbc.GeohashInt
+    assert qdbc.resolve_type_from_name('geohash(12C)') is qdbc.GeohashLong
+    assert qdbc.resolve_type_from_name('GEOHASH( 7b )') is qdbc.GeohashByte
+    assert qdbc.resolve_type_from_name('DOUBLE[]') is qdbc.DoubleArray
+    assert qdbc.resolve_type_from_name('double[][][]') is qdbc.DoubleArray
+    assert qdbc.resolve_type_from_name('DOUBLE[][][][][]') is qdbc.DoubleArray
+    for unknown in ('', None, 'GEOHASH(13c)', 'GEOHASH(0b)', 'INT[]', 'DECIMAL(10,2)'):
+        assert qdbc.resolve_type_from_name(unknown) is None
+    assert qdbc.Varchar.matches_type_name('VARCHAR') is qdbc.Varchar
+    assert qdbc.Varchar.matches_type_name('STRING') is None
+
+
+def test_type_from_name():
+    array = qdbc.type_from_name('DOUBLE[][]')
+    assert isinstance(array, qdbc.DoubleArray)
+    assert array.dimensions == 2
+    assert array.column_spec('x') == '"x" DOUBLE[][]'
+    # types unknown to this package are reflected as NullType, not an error
+    with pytest.warns(sqla.exc.SAWarning, match='DECIMAL'):
+        assert isinstance(qdbc.type_from_name('DECIMAL(10,2)'), sqla.types.NullType)
+
+
+def test_geohash_precision():
+    # reflected types carry the column's precision, not their container's
+    dialect = qdbc.QuestDBDialect()
+    for type_name, type_class, text, native in (
+        ('GEOHASH(12b)', qdbc.GeohashShort, '##010101010101', 0b010101010101),
+        ('GEOHASH(5c)', qdbc.GeohashInt, 'u33d8', 0b11010_00011_00011_01100_01000),
+        ('GEOHASH(3b)', qdbc.GeohashByte, '##101', 0b101),
+        ('GEOHASH(12c)', qdbc.GeohashLong, 'dfvgsj2vptwu', qdbc.GeohashLong().to_native('dfvgsj2vptwu')),
+    ):
+        type_ = qdbc.type_from_name(type_name)
+        assert type(type_) is type_class
+        assert type_.compile() == type_name
+        assert type_.column_spec('g') == f'"g" {type_name}'
+        assert type_.to_native(text) == native
+        assert type_.to_text(native) == text
+        native_type = type(type_)(native=True, bits=type_.bits)
+        assert native_type.result_processor(dialect, None)(text) == native
+        assert native_type.bind_processor(dialect)(native) == text
+    assert qdbc.type_from_name('GEOHASH(6c)').compile() == qdbc.GeohashInt().compile() == 'GEOHASH(6c)'
+    assert isinstance(qdbc.type_from_name('Symbol'), qdbc.Symbol)
+
+
 def test_symbol_type():
     # Test basic Symbol without parameters
     symbol = qdbc.Symbol()
@@ -121,6 +175,36 @@ def test_symbol_type_in_column():
             assert column.type.compile() == "SYMBOL CAPACITY 256 CACHE"
 
 
+def test_native_type_processors():
+    dialect = qdbc.QuestDBDialect()
+    values = [
+        (qdbc.UUID(native=True), uuid.UUID('6d5eb038-63d1-4971-8484-30c16e13de5b'),
+         '6d5eb038-63d1-4971-8484-30c16e13de5b'),
+        (qdbc.IPv4(native=True), ipaddress.IPv4Address('192.168.1.10'), '192.168.1.10'),
+        (qdbc.Long256(native=True), 2 ** 255 + 42, f'{2 ** 255 + 42:#x}'),
+        (qdbc.Long128(native=True), 2 ** 127 + 7, f'{2 ** 127 + 7:#x}'),
+        (qdbc.GeohashInt(native=True), 0b01100_01110_11011_01111_11000_11111, 'dfvgsz'),
+        (qdbc.GeohashInt(native=True, bits=25), 0b01100_01110_11011_01111_11000, 'dfvgs'),
+        (qdbc.GeohashByte(native=True), 0b1010_1010, '##10101010'),
+    ]
+    for type_, native, text in values:
+        bind = type_.bind_processor(dialect)
+        result = type_.result_processor(dialect, None)
+        assert bind(native) == text
+        assert bind(text) == text
+        assert bind(None) is None
+        assert result(text) == native
+        assert result(None) is None
+        assert type_.to_native_many([text, None, text]) == [native, None, native]
+        assert type_.to_text_many([native, None, text]) == [text, None, text]
+        # results stay text unless native=True
+        assert type(type_)().result_processor(dialect, None)(text) == text
+    assert qdbc.IPv4().bind_processor(dialect)(3232235786) == '192.168.1.10'
+    assert qdbc.Long128(native=True).result_processor(dialect, None)('00000000-0000-0000-0000-0000000000ff') == 255
+    with pytest.raises(TypeError):
+        qdbc.QDBNativeTypeMixin()
+
+
 def test_superset_default_mappings():
     default_column_type_mappings = (
         (re.compile("^BOOLEAN$", re.IGNORECASE), qdbc.Boolean),
@@ -158,3 +242,58 @@ def test_superset_default_mappings():
         assert matching_name == g_name
         g_class = qdbc.resolve_type_from_name(g_name)
         assert isinstance(g_class(), qdbc.geohash_class(n))
+
+
+def test_remove_public_schema():
+    assert remove_public_schema('SELECT * FROM public.t1 JOIN PUBLIC.t2') == 'SELECT * FROM t1 JOIN t2'
+    assert remove_public_schema('SELECT * FROM \'public\'.t1, "public".t2') == 'SELECT * FROM t1, t2'
+    # literals, quoted identifiers, comments and other identifiers are left alone
+    for query in (
+        "SELECT 'public.t', 'it''s public.t' FROM t",
+        'SELECT "public.col" FROM t',
+        'SELECT * FROM t -- public.t',
+        'SELECT * FROM t /* public.t */',
+        'SELECT * FROM mypublic.t',
+    ):
+        assert remove_public_schema(query) == query
+    assert remove_public_schema(
+        "SELECT 'public.' AS p FROM public.t /* public. */ WHERE s = 'public.'"
+    ) == "SELECT 'public.' AS p FROM t /* public. */ WHERE s = 'public.'"
+    assert remove_public_schema(None) is None
+
+
+def test_strip_comments():
+    assert strip_comments('-- chart 1\nSELECT * FROM public.t -- public.t\nLIMIT 1') == '\nSELECT * FROM t \nLIMIT 1'
+    assert strip_comments('SELECT a/* b */FROM "public".t /* unterminated') == 'SELECT a FROM t  '
+    # literals, quoted identifiers and hints are left alone
+    for query in (
+        "SELECT '--public.t', 'it''s /* public.t */' FROM t",
+        'SELECT "public.col", "a--b" FROM t',
+        'SELECT /*+ AVOID_HJ(a b) */ * FROM a JOIN b ON a.id = b.id',
+        'SELECT 5 - -3, 6 / 2 FROM mypublic.t',
+    ):
+        assert strip_comments(query) == query
+    assert strip_comments('SELECT * FROM public.t') == 'SELECT * FROM t'
+    assert strip_comments(None) is None
+
+
+def test_query_cache_is_bounded_by_size():
+    cache = common._QueryCache(str.upper, max_chars=800)
+    for idx in range(10):
+        assert cache(f'{idx:050d}') == f'{idx:050d}'
+    # least recently used queries are evicted past 800 chars
+    assert cache.nchars == 800
+    assert len(cache) == 8
+    assert cache('x' * 60) == 'X' * 60
+    assert len(cache) == 8  # larger than an eighth of the cache, not cached
+    cache.cache_clear()
+    assert cache.nchars == 0
+
+
+def test_server_capabilities_queries():
+    current = qdbc.ServerCapabilities()
+    assert current.table_attributes_select == 'designatedTimestamp, partitionBy, walEnabled FROM tables()'
+    assert current.table_columns_select == '"column", "type", "upsertKey" FROM table_columns'
+    older = qdbc.ServerCapabilities(tables_name_column='name', wal_column='', upsert_key_column='')
+    assert older.table_attributes_select == 'designatedTimestamp, partitionBy, false FROM tables()'
+    assert older.table_columns_select == '"column", "type", false FROM table_columns'